@@ -0,0 +1,124 @@
+import time
+
+from gurobipy import GRB
+
+from solve_instrumentation import instrumented_optimize, mip_gap
+
+'''
+# Anytime solve
+# Solves a model within a wall clock budget or until a target gap, and returns the best incumbent found
+# by then together with the best distinct solutions of the solution pool. The solve can be cancelled from
+# another thread through a threading.Event, and still returns what it found.
+'''
+
+statuses = {GRB.OPTIMAL: 'optimal', GRB.TIME_LIMIT: 'time_limit', GRB.INTERRUPTED: 'cancelled',
+            GRB.INFEASIBLE: 'infeasible', GRB.INF_OR_UNBD: 'infeasible_or_unbounded', GRB.UNBOUNDED: 'unbounded'}
+
+
+def solve_anytime(model, time_budget=None, target_gap=None, pool_size=1, search_pool=False, schedule_vars=None,
+                  cancel=None, recorder=None):
+    """
+    Optimizes the model for at most time_budget seconds of wall clock time or until the gap is at most
+    target_gap, and returns the result as a dict with
+    status: 'optimal' (within target_gap), 'time_limit', 'cancelled', 'infeasible', 'unbounded',
+    'infeasible_or_unbounded' (when presolve cannot tell which) or 'other'
+    objective, bound, gap: of the best incumbent (objective and gap None without one, gap math.inf for an
+    objective of 0, as Gurobi's MIPGap)
+    values: the values of the variables of the best incumbent, in model order (None without one)
+    pool: up to pool_size solutions, best first, each a dict with its objective, gap to the bound and values
+    runtime: the wall clock time of the call
+
+    Solutions of the pool are distinct on schedule_vars (e.g. the flights n.values()), all variables if None.
+    With search_pool Gurobi searches for the pool_size best solutions, which takes longer than keeping those
+    found on the way. cancel is a threading.Event: setting it stops the solve. recorder is a SolveRecorder.
+    The parameters changed on the model are restored on return.
+    """
+    start = time.perf_counter()
+    params = {'TimeLimit': None, 'MIPGap': None, 'PoolSolutions': None, 'PoolSearchMode': None}
+    for name in params:
+        params[name] = model.getParamInfo(name)[2]  # current value
+    if time_budget is not None:
+        model.Params.TimeLimit = time_budget
+    if target_gap is not None:
+        model.Params.MIPGap = target_gap
+    # Extra solutions, since those only differing outside schedule_vars are dropped
+    model.Params.PoolSolutions = pool_size if schedule_vars is None else max(10, 4 * pool_size)
+    if search_pool:
+        model.Params.PoolSearchMode = 2
+
+    def check_cancel(model, where):
+        if cancel.is_set():
+            model.terminate()
+
+    try:
+        instrumented_optimize(model, recorder, callback=check_cancel if cancel is not None else None)
+    finally:
+        for name, value in params.items():
+            model.setParam(name, value)
+
+    result = {'status': statuses.get(model.Status, 'other'), 'objective': None, 'gap': None, 'values': None,
+              'bound': model.ObjBound if model.IsMIP else model.ObjVal, 'pool': [], 'runtime': None}
+    if model.SolCount > 0:
+        result['objective'] = model.ObjVal
+        result['gap'] = mip_gap(result['bound'], model.ObjVal)
+        all_vars = model.getVars()
+        if schedule_vars is None:
+            schedule_vars = all_vars
+        seen = set()
+        for k in range(model.SolCount):  # best first
+            model.Params.SolutionNumber = k
+            schedule = tuple(round(v) for v in model.getAttr("Xn", schedule_vars))
+            if schedule in seen:
+                continue
+            seen.add(schedule)
+            objective = model.PoolObjVal
+            result['pool'].append({'objective': objective, 'values': model.getAttr("Xn", all_vars),
+                                   'gap': mip_gap(result['bound'], objective)})
+            if len(result['pool']) == pool_size:
+                break
+        model.Params.SolutionNumber = 0
+        result['values'] = result['pool'][0]['values']
+    result['runtime'] = time.perf_counter() - start
+    return result
+
+
+if __name__ == "__main__":
+    import threading
+
+    from network import build_network
+    from cost_tables import CostTables
+    from flights_model import build_flights_model
+    from mip_start import greedy_solution, set_start
+    from synthetic_instances import generate_instance
+
+    instance = generate_instance(5, 1, 10)
+    network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+    costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                       instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+    model, X, n, Z = build_flights_model(network, instance['demands_matrix'], instance['revenues_matrix'],
+                                         instance['table_index'], costs)
+    model.Params.OutputFlag = 0
+
+    def report(label, result):
+        objective = f"{result['objective']:.1f}" if result['objective'] is not None else "-"
+        print(f"{label}: {result['status']}, objective {objective}, bound {result['bound']:.1f}, "
+              f"{len(result['pool'])} schedules in {result['runtime']:.3f}s")
+        for k, solution in enumerate(result['pool']):
+            print(f"  {k}: objective {solution['objective']:.1f}, gap {solution['gap']:.2%}")
+
+    report("Budget 0.01s", solve_anytime(model, time_budget=0.01))
+    model.reset()
+    set_start(model, X, n, Z, network, greedy_solution(network, instance['demands_matrix'], instance['revenues_matrix'],
+                                                       instance['table_index'], costs))
+    report("Budget 0.01s from the greedy start", solve_anytime(model, time_budget=0.01))
+    model.reset()
+    report("Gap 1%, 5 best schedules", solve_anytime(model, target_gap=0.01, pool_size=5, search_pool=True,
+                                                      schedule_vars=list(n.values())))
+    model.reset()
+
+    # Cancelled from another thread
+    cancel = threading.Event()
+    timer = threading.Timer(0.005, cancel.set)
+    timer.start()
+    report("Cancelled after 5ms", solve_anytime(model, pool_size=3, cancel=cancel))
+    timer.cancel()
@@ -0,0 +1,68 @@
+'''
+# Base tables
+# The airports, distances and cost tables of the bundled instance (demands.txt and ticket_revenues.txt).
+# Importing this module has no side effects, unlike passenger_demands.py, which reads the data files.
+'''
+
+airports = ['M', 'T', 'W', 'V', 'H']
+hubs = ['T', 'M']  # airports passengers can connect through
+
+# Distance between airports in km
+distances = {
+    ('H', 'M'): 804,
+    ('H', 'T'): 1288,
+    ('M', 'T'): 507,
+    ('M', 'W'): 1818,
+    ('M', 'V'): 3682,
+    ('T', 'W'): 1504,
+    ('T', 'V'): 3345,
+    ('W', 'V'): 1864,
+}
+
+# Fuel price at departing airport
+fuel_prices = {
+    'H': 1.28,
+    'M': 1.17,
+    'T': 1.29,
+    'W': 1.19,
+    'V': 1.30,
+}
+
+# Landing fees at airports
+landing_fees = {
+    "Halifax": 11.29,
+    "Montreal": 11.64,
+    "Toronto": 18.97,
+    "Winnipeg": 7.50,
+    "Vancouver": 7.98,
+}
+
+# Airport Improvement Fee (AIF) per passenger for each airport
+aif_rates = {
+    "Halifax": 28,
+    "Montreal": 35,
+    "Toronto": 30,
+    "Winnipeg": 25,
+    "Vancouver": 25,
+}
+
+# City names used as keys of the landing fee and AIF tables
+city_names = {'H': 'Halifax', 'M': 'Montreal', 'T': 'Toronto', 'W': 'Winnipeg', 'V': 'Vancouver'}
+
+# Cities by table index are given by:
+table_index = {'H': 0, 'M': 1, 'T': 2, 'W': 3, 'V': 4}
+
+
+def load_instance(demands_path="demands.txt", revenues_path="ticket_revenues.txt"):
+    """
+    Returns the bundled instance as a dict with the keys of synthetic_instances.generate_instance, its demands
+    and ticket revenues read from the data files.
+    """
+    from data_loading import load_demands, load_revenues
+
+    table_airports = sorted(table_index, key=table_index.get)
+    demands_matrix, total_daily_demands = load_demands(demands_path, len(table_index), table_airports)
+    return {'airports': airports, 'hubs': hubs, 'distances': distances, 'fuel_prices': fuel_prices,
+            'city_names': city_names, 'landing_fees': landing_fees, 'aif_rates': aif_rates, 'table_index': table_index,
+            'demands_matrix': demands_matrix, 'total_daily_demands': total_daily_demands,
+            'revenues_matrix': load_revenues(revenues_path, len(table_index), table_airports)}
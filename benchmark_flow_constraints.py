@@ -0,0 +1,83 @@
+import time
+
+import gurobipy as gp
+from gurobipy import GRB
+from network import build_digraph, build_arc_index, build_network
+from synthetic_instances import generate_instance
+
+'''
+# Benchmark: building the flow conservation constraints
+# by scanning every arc for every node (old loop) vs the precomputed arc index, on the 5-city network
+# for more days and on synthetic networks of more airports
+'''
+
+def build_with_scan(arc_set, node_set, num_days):
+    """
+    Builds the flow conservation constraints the old way, splitting every arc for every node and day.
+    """
+    model = gp.Model("scan")
+    model.Params.OutputFlag = 0
+    X = model.addVars(arc_set, range(num_days), vtype=GRB.INTEGER, lb=0, name="x")
+    for day_num in range(num_days):
+        for v in node_set:
+            v_constraint = 0
+            for arc in arc_set:
+                if v == arc.split("-")[0]: # outgoing arc from v
+                    v_constraint += -1 * X[arc,day_num]
+                elif v == arc.split("-")[1]: # incoming arc to v
+                    v_constraint += X[arc,day_num]
+            model.addConstr(v_constraint == 0, name=f"flow_{v}_{day_num}")
+    model.update()
+    return model
+
+
+def build_with_index(arc_set, node_set, num_days):
+    """
+    Builds the same flow conservation constraints from the in-arc/out-arc index.
+    """
+    model = gp.Model("index")
+    model.Params.OutputFlag = 0
+    X = model.addVars(arc_set, range(num_days), vtype=GRB.INTEGER, lb=0, name="x")
+    out_arcs, in_arcs = build_arc_index(arc_set, node_set)
+    for day_num in range(num_days):
+        for v in node_set:
+            v_constraint = 0
+            for arc in out_arcs[v]: # outgoing arc from v
+                v_constraint += -1 * X[arc,day_num]
+            for arc in in_arcs[v]: # incoming arc to v
+                v_constraint += X[arc,day_num]
+            model.addConstr(v_constraint == 0, name=f"flow_{v}_{day_num}")
+    model.update()
+    return model
+
+
+def time_build(build, arc_set, node_set, num_days):
+    """
+    Returns the wall clock time (in seconds) taken by one call of the given builder.
+    """
+    start = time.perf_counter()
+    model = build(arc_set, node_set, num_days)
+    elapsed = time.perf_counter() - start
+    model.dispose()
+    return elapsed
+
+
+if __name__ == "__main__":
+    cities, arc_set, node_set = build_digraph()
+
+    print(f"{len(node_set)} nodes, {len(arc_set)} arcs")
+    print(f"{'days':>6} {'scan (s)':>10} {'index (s)':>10} {'speedup':>8}")
+    for num_days in [5, 30, 90, 365]:
+        scan_time = time_build(build_with_scan, arc_set, node_set, num_days)
+        index_time = time_build(build_with_index, arc_set, node_set, num_days)
+        print(f"{num_days:>6} {scan_time:>10.3f} {index_time:>10.3f} {scan_time / index_time:>7.1f}x")
+
+    print(f"\n{'airports':>8} {'nodes':>6} {'arcs':>6} {'days':>5} {'scan (s)':>10} {'index (s)':>10} {'speedup':>8}")
+    for num_airports in [5, 10, 20, 40]:
+        instance = generate_instance(num_airports, max(1, num_airports // 10), 1)
+        network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+        arc_set, node_set, num_days = network['arc_set'], network['node_set'], 5
+        scan_time = time_build(build_with_scan, arc_set, node_set, num_days)
+        index_time = time_build(build_with_index, arc_set, node_set, num_days)
+        print(f"{num_airports:>8} {len(node_set):>6} {len(arc_set):>6} {num_days:>5} {scan_time:>10.3f} "
+              f"{index_time:>10.3f} {scan_time / index_time:>7.1f}x")
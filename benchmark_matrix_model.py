@@ -0,0 +1,37 @@
+import time
+
+from network import build_network
+from cost_tables import CostTables
+from flights_model import build_flights_model, build_flights_model_matrix
+from synthetic_instances import generate_instance
+
+'''
+# Benchmark: building the model one constraint at a time vs in matrix form
+'''
+
+def time_build(build, network, instance, costs):
+    """
+    Returns the wall clock time (in seconds) taken to build and update the model with the given builder.
+    """
+    start = time.perf_counter()
+    model = build(network, instance['demands_matrix'], instance['revenues_matrix'],
+                  instance['table_index'], costs)[0]
+    model.update()
+    elapsed = time.perf_counter() - start
+    num_vars, num_constrs = model.NumVars, model.NumConstrs
+    model.dispose()
+    return elapsed, num_vars, num_constrs
+
+
+if __name__ == "__main__":
+    print(f"{'airports':>8} {'days':>5} {'vars':>9} {'constrs':>9} {'loop (s)':>9} {'matrix (s)':>10} {'speedup':>8}")
+    for num_airports, num_days in [(5, 5), (5, 365), (25, 30), (25, 365), (50, 30), (100, 5)]:
+        instance = generate_instance(num_airports, max(2, num_airports // 10), num_days)
+        network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+        costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                           instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+
+        loop_time, num_vars, num_constrs = time_build(build_flights_model, network, instance, costs)
+        matrix_time = time_build(build_flights_model_matrix, network, instance, costs)[0]
+        print(f"{num_airports:>8} {num_days:>5} {num_vars:>9} {num_constrs:>9} "
+              f"{loop_time:>9.2f} {matrix_time:>10.2f} {loop_time / matrix_time:>7.1f}x")
@@ -0,0 +1,64 @@
+import io
+import json
+import time
+
+import gurobipy as gp
+
+from network import build_network
+from cost_tables import CostTables
+from flights_model import build_flights_model
+from mip_start import greedy_solution, set_start
+from solve_instrumentation import SolveRecorder, instrumented_optimize
+from synthetic_instances import generate_instance
+
+'''
+# Benchmark: time to the first incumbent and gap at the time limit, with and without the greedy MIP start
+'''
+
+def solve_with_recorder(model, time_limit):
+    """
+    Returns the time of the first incumbent (None without one), and the profit and gap at the end of the solve.
+    """
+    stream = io.StringIO()
+    recorder = SolveRecorder(stream=stream, interval=0)
+    model.Params.TimeLimit = time_limit
+    instrumented_optimize(model, recorder)
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    first = min((e['runtime'] for e in events if e['event'] == 'progress' and e['incumbent'] is not None),
+                default=None)
+    summary = events[-1]
+    return first, summary['objective'], summary['gap']
+
+
+if __name__ == "__main__":
+    time_limit = 10
+    print(f"{'instance':>14} {'start':>6} {'heuristic':>13} {'heur (s)':>8} {'first inc (s)':>13} "
+          f"{'profit':>13} {'gap':>8}")
+    for num_airports, num_hubs, num_days, density in [(5, 1, 10, 1.0), (6, 2, 4, 0.5), (8, 2, 2, 0.3)]:
+        instance = generate_instance(num_airports, num_hubs, num_days, demand_density=density)
+        network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+        costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                           instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+        data = (network, instance['demands_matrix'], instance['revenues_matrix'], instance['table_index'], costs)
+        name = f"{num_airports}x{num_days} d={density}"
+
+        for use_start in (False, True):
+            model, X, n, Z = build_flights_model(*data)
+            model.Params.OutputFlag = 0
+            heuristic, heuristic_time = "-", 0.0
+            if use_start:
+                start = time.perf_counter()
+                solution = greedy_solution(*data)
+                set_start(model, X, n, Z, network, solution)
+                heuristic_time = time.perf_counter() - start
+                heuristic = f"{solution['profit']:.1f}"
+            try:
+                first, profit, gap = solve_with_recorder(model, time_limit)
+            except gp.GurobiError as error:  # e.g. a size-limited license
+                print(f"{name:>14} {str(use_start):>6} failed: {error}")
+                break
+            finally:
+                model.dispose()
+            first = f"{first + heuristic_time:.3f}" if first is not None else "-"
+            print(f"{name:>14} {str(use_start):>6} {heuristic:>13} {heuristic_time:>8.3f} {first:>13} "
+                  f"{profit:>13.1f} {gap:>8.2e}")
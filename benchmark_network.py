@@ -0,0 +1,26 @@
+import time
+import tracemalloc
+
+from network import build_network
+from synthetic_instances import generate_instance
+
+'''
+# Benchmark: building the flight network for growing numbers of airports
+'''
+
+if __name__ == "__main__":
+    print(f"{'airports':>8} {'hubs':>5} {'arcs':>8} {'nodes':>8} {'build (s)':>10} {'peak (MB)':>10} {'bytes/arc':>10}")
+    for num_airports in [5, 25, 50, 100, 150, 200]:
+        num_hubs = max(2, num_airports // 10)
+        instance = generate_instance(num_airports, num_hubs, num_days=1)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        num_arcs = len(network['arc_set'])
+        print(f"{num_airports:>8} {num_hubs:>5} {num_arcs:>8} {len(network['node_set']):>8} "
+              f"{elapsed:>10.3f} {peak / 1e6:>10.1f} {peak / num_arcs:>10.0f}")
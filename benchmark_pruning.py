@@ -0,0 +1,64 @@
+import time
+import tracemalloc
+
+from network import build_network
+from cost_tables import CostTables
+from flights_model import build_flights_model, build_flights_problem
+from solver_backends import solve_problem
+from synthetic_instances import generate_instance
+
+'''
+# Benchmark: model size, build time, build memory and solve time with and without the pairs that have no demand
+'''
+
+def measure_build(build, *args, **kwargs):
+    """
+    Returns what build returns, the time (in seconds) it took and the peak memory it allocated (in MiB).
+
+    The memory is measured in a second build, since tracing the allocations slows it down.
+    """
+    start = time.perf_counter()
+    built = build(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    build(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return built, elapsed, peak
+
+
+if __name__ == "__main__":
+    backend = "highs"  # no license limit on the model size
+    print(f"{'airports':>8} {'days':>5} {'density':>7} {'vars':>7} {'pruned':>7} {'rows':>7} {'pruned':>7} "
+          f"{'build (s)':>9} {'pruned (s)':>10} {'MiB':>6} {'pruned':>6} {'loop (s)':>8} {'pruned (s)':>10} "
+          f"{'solve (s)':>9} {'pruned (s)':>10} {'profit':>14}")
+    for num_airports, num_days in [(10, 7), (25, 3)]:
+        for density in [1.0, 0.3, 0.1]:
+            instance = generate_instance(num_airports, max(2, num_airports // 10), num_days, demand_density=density)
+            network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+            costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                               instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+            data = (network, instance['demands_matrix'], instance['revenues_matrix'], instance['table_index'], costs)
+
+            problem, build_time, build_memory = measure_build(build_flights_problem, *data)
+            pruned, pruned_time, pruned_memory = measure_build(build_flights_problem, *data, prune=True)
+            # The gurobipy model, built one constraint at a time (FLIGHTS_MODEL of passenger_demands.py)
+            loop_times = []
+            for prune in (False, True):
+                start = time.perf_counter()
+                model = build_flights_model(*data, prune=prune)[0]
+                model.update()
+                loop_times.append(time.perf_counter() - start)
+                model.dispose()
+
+            result = solve_problem(problem, backend, time_limit=60)
+            pruned_result = solve_problem(pruned, backend, time_limit=60)
+            if result['status'] == pruned_result['status'] == 'optimal':  # both within the default MIP gap, 1e-4
+                if abs(result['profit'] - pruned_result['profit']) > 2e-4 * abs(result['profit']):
+                    raise ValueError(f"pruning changed the profit: {pruned_result['profit']} vs {result['profit']}")
+            num_rows = sum(A.shape[0] for A, sense, rhs in problem['rows'])
+            num_pruned_rows = sum(A.shape[0] for A, sense, rhs in pruned['rows'])
+            print(f"{num_airports:>8} {num_days:>5} {density:>7.1f} {len(problem['obj']):>7} {len(pruned['obj']):>7} "
+                  f"{num_rows:>7} {num_pruned_rows:>7} {build_time:>9.3f} {pruned_time:>10.3f} "
+                  f"{build_memory:>6.1f} {pruned_memory:>6.1f} {loop_times[0]:>8.3f} {loop_times[1]:>10.3f} "
+                  f"{result['solve_time']:>9.2f} {pruned_result['solve_time']:>10.2f} {pruned_result['profit']:>14.1f}")
@@ -0,0 +1,229 @@
+import io
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+'''
+# Benchmark: how the build and solve of the flights model scale with the numbers of airports and days
+# Every point of the grid runs with each formulation: the gurobipy model of passenger_demands.py, built
+# one constraint at a time, and the matrix form. Every point runs in a fresh process, so that its peak
+# memory is its own. Each point is written as one JSON line to results_path, with the stage times in
+# seconds, the size of the model and the peak memory (resident set size, including the solver) at the
+# end of each stage.
+# compare_results reads two results files and lists the stages that got slower.
+'''
+
+airport_grid = [5, 25, 50, 100, 200]
+day_grid = [5, 30, 90, 365]
+solve_time_limit = 60  # seconds per solve
+results_path = "benchmark_results.jsonl"
+
+
+def peak_memory_mb():
+    """
+    Returns the peak resident set size of the current process in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes on macOS, KB on Linux
+
+
+def version_info():
+    """
+    Returns the git commit of the code and the versions of Python and the solvers.
+    """
+    import numpy as np
+    import scipy
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    info = {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__, 'scipy': scipy.__version__}
+    try:
+        import gurobipy as gp
+        info['gurobi'] = ".".join(str(k) for k in gp.gurobi.version())
+    except ImportError:
+        info['gurobi'] = None
+    return info
+
+
+formulations = ['model', 'matrix']
+
+
+def run_point(num_airports, num_days, backend='gurobi', time_limit=solve_time_limit, formulation='model'):
+    """
+    Runs every stage for one point of the grid. Returns its result row.
+
+    formulation 'model' builds the model of passenger_demands.py one constraint at a time with gurobipy
+    (flights_model.build_flights_model, gurobi backend only), and 'matrix' the problem in matrix form
+    (flights_model.build_flights_problem), given to the solver of the backend.
+    """
+    from data_loading import load_demands, load_revenues
+    from network import build_network
+    from cost_tables import CostTables
+    from flights_model import build_flights_model, build_flights_problem
+    from synthetic_instances import generate_instance, write_instance_files
+
+    if formulation not in formulations:
+        raise ValueError(f"unknown formulation {formulation!r}, expected one of {formulations}")
+    if formulation == 'model' and backend != 'gurobi':
+        raise ValueError("the 'model' formulation is built with gurobipy, use the 'gurobi' backend")
+
+    row = {'airports': num_airports, 'days': num_days, 'backend': backend, 'formulation': formulation,
+           'times': {}, 'peak_mb': {}}
+
+    def stage(name, start):
+        row['times'][name] = time.perf_counter() - start
+        row['peak_mb'][name] = peak_memory_mb()
+
+    instance = generate_instance(num_airports, max(2, num_airports // 10), num_days)
+    with tempfile.TemporaryDirectory() as data_dir:
+        demands_path = os.path.join(data_dir, "demands.txt")
+        revenues_path = os.path.join(data_dir, "ticket_revenues.txt")
+        write_instance_files(instance, demands_path, revenues_path)
+        del instance['demands_matrix']
+
+        start = time.perf_counter()
+        demands_matrix = load_demands(demands_path, num_cities=num_airports)[0]
+        revenues_matrix = load_revenues(revenues_path, num_cities=num_airports)
+        stage('parse', start)
+
+    start = time.perf_counter()
+    network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+    costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                       instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+    stage('graph', start)
+    row['arcs'] = len(network['arc_set'])
+    data = (network, demands_matrix, revenues_matrix, instance['table_index'], costs)
+
+    if backend == 'gurobi':
+        import gurobipy as gp
+        from flights_model import build_gurobi_model
+        from solve_instrumentation import SolveRecorder, instrumented_optimize
+
+        try:
+            if formulation == 'model':
+                start = time.perf_counter()
+                model = build_flights_model(*data)[0]
+                model.update()
+                stage('constraints', start)  # and the solver model, built together
+            else:
+                start = time.perf_counter()
+                problem = build_flights_problem(*data)
+                stage('constraints', start)
+                start = time.perf_counter()
+                model = build_gurobi_model(problem)[0]
+                model.update()
+                stage('solver_model', start)
+                del problem
+            del data, demands_matrix
+            row['variables'], row['constraints'], row['nonzeros'] = model.NumVars, model.NumConstrs, model.NumNZs
+            model.Params.OutputFlag = 0
+            model.Params.TimeLimit = time_limit
+
+            # Presolve runs inside optimize, until the first LP or MIP callback of the recorder
+            events = io.StringIO()
+            start = time.perf_counter()
+            instrumented_optimize(model, SolveRecorder(stream=events))
+            solve_time = time.perf_counter() - start
+            phases = {line['phase']: line['seconds'] for line in map(json.loads, events.getvalue().splitlines())
+                      if line['event'] == 'phase'}
+            row['times']['presolve'] = phases.get('presolve', model.Runtime)  # no callback: solved in presolve
+            row['times']['solve'] = solve_time - row['times']['presolve']
+            row['peak_mb']['solve'] = peak_memory_mb()
+            row['status'] = model.Status
+            row['profit'] = model.ObjVal if model.SolCount > 0 else None
+            row['gap'] = model.MIPGap if model.SolCount > 0 else None
+
+            presolved = model.presolve()  # for its size only, after the timings
+            row['presolved_variables'], row['presolved_constraints'] = presolved.NumVars, presolved.NumConstrs
+            presolved.dispose()
+            model.dispose()
+        except gp.GurobiError as error:  # e.g. a size-limited Gurobi license, the build times are still recorded
+            row['error'] = str(error)
+    else:
+        from solver_backends import solve_problem
+
+        start = time.perf_counter()
+        problem = build_flights_problem(*data)
+        stage('constraints', start)
+        row['variables'] = len(problem['obj'])
+        row['constraints'] = sum(A.shape[0] for A, sense, rhs in problem['rows'])
+        row['nonzeros'] = sum(A.nnz for A, sense, rhs in problem['rows'])
+        del data, demands_matrix
+
+        result = solve_problem(problem, backend, time_limit=time_limit)
+        row['times']['solver_model'] = result['build_time']
+        row['times']['solve'] = result['solve_time']  # HiGHS does not report its presolve separately
+        row['peak_mb']['solve'] = peak_memory_mb()
+        row['status'], row['profit'], row['gap'] = result['status'], result['profit'], result['gap']
+    return row
+
+
+def run_grid(airports=airport_grid, days=day_grid, backend='gurobi', time_limit=solve_time_limit,
+             path=results_path, formulations=formulations):
+    """
+    Runs every point of the grid with each formulation (only 'matrix' without the gurobi backend), one
+    process at a time, and appends the rows to the results file.
+    """
+    if backend != 'gurobi':
+        formulations = [formulation for formulation in formulations if formulation != 'model']
+    run = {'run': time.strftime("%Y-%m-%dT%H:%M:%S"), **version_info()}
+    ctx = mp.get_context("spawn")
+    rows = []
+    for num_airports in airports:
+        for num_days in days:
+            for formulation in formulations:
+                with ctx.Pool(1) as pool:  # a fresh process for every point
+                    row = {**run, **pool.apply(run_point, (num_airports, num_days, backend, time_limit, formulation))}
+                with open(path, "a") as f:
+                    f.write(json.dumps(row) + "\n")
+                rows.append(row)
+                times = " ".join(f"{name} {seconds:.2f}s" for name, seconds in row['times'].items())
+                print(f"{num_airports:>4} airports {num_days:>4} days {formulation:>6}: {row.get('variables', '-')} vars, "
+                      f"{times}, peak {max(row['peak_mb'].values()):.0f} MB {row.get('error', '')}")
+    return rows
+
+
+def compare_results(old_path, new_path, threshold=1.2):
+    """
+    Returns (airports, days, backend, formulation, stage, old time, new time) for every stage at least
+    threshold times slower in the last run of new_path than in the last run of old_path.
+    """
+    def last_run(path):
+        with open(path, "r") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        latest = rows[-1]['run']
+        # Rows written before the formulation option timed the matrix form
+        return {(row['airports'], row['days'], row['backend'], row.get('formulation', 'matrix')): row
+                for row in rows if row['run'] == latest}
+
+    old_rows, new_rows = last_run(old_path), last_run(new_path)
+    slower = []
+    for point, new_row in new_rows.items():
+        old_row = old_rows.get(point)
+        if old_row is None:
+            continue
+        for name, new_time in new_row['times'].items():
+            old_time = old_row['times'].get(name)
+            if old_time is not None and new_time > threshold * max(old_time, 1e-3):
+                slower.append((*point, name, old_time, new_time))
+    return slower
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        # python benchmark_scaling.py old_results.jsonl new_results.jsonl
+        for num_airports, num_days, backend, formulation, name, old_time, new_time in compare_results(sys.argv[1],
+                                                                                                     sys.argv[2]):
+            print(f"{num_airports} airports, {num_days} days ({backend}, {formulation}): {name} "
+                  f"{old_time:.2f}s -> {new_time:.2f}s")
+    else:
+        run_grid()
@@ -0,0 +1,32 @@
+import time
+
+from sensitivity_analysis import FLIGHTS_MODEL, sensitivity_analysis_fuel_costs
+
+'''
+# Benchmark: fuel price sensitivity analysis solved price by price (from scratch or incrementally)
+# vs as the scenarios of a single multi-scenario model
+'''
+
+if __name__ == "__main__":
+    FLIGHTS_MODEL.Params.OutputFlag = 0
+    fuel_price_range = {c: [1.00, 1.05, 1.10, 1.15, 1.20, 1.25, 1.30, 1.40, 1.50] for c in ['H', 'M', 'T', 'W', 'V']}
+    num_scenarios = sum(len(prices) for prices in fuel_price_range.values())
+
+    all_results = {}
+    print(f"{num_scenarios} scenarios")
+    print(f"{'mode':>15} {'total (s)':>10} {'per scenario (s)':>17}")
+    for mode, options in [("sequential", {}), ("incremental", {"incremental": True}),
+                          ("multi-scenario", {"multi_scenario": True})]:
+        start = time.perf_counter()
+        all_results[mode] = sensitivity_analysis_fuel_costs(FLIGHTS_MODEL, fuel_price_range, **options)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:>15} {elapsed:>10.2f} {elapsed / num_scenarios:>17.4f}")
+
+    # Largest relative difference in profit from the sequential results
+    for mode in ["incremental", "multi-scenario"]:
+        worst = 0
+        for city, results in all_results["sequential"].items():
+            for expected, result in zip(results, all_results[mode][city]):
+                if expected["Profit"] is not None and result["Profit"] is not None:
+                    worst = max(worst, abs(result["Profit"] - expected["Profit"]) / abs(expected["Profit"]))
+        print(f"{mode}: largest relative profit difference from sequential {worst:.2e}")
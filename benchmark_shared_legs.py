@@ -0,0 +1,42 @@
+import time
+
+import numpy as np
+
+from network import build_network
+from cost_tables import CostTables
+from flights_model import build_flights_problem
+from solver_backends import backends, solve_problem
+from synthetic_instances import generate_instance
+
+'''
+# Benchmark: flights by arc (every arc its own planes) against flights by physical leg (shared by the arcs)
+# Flights by leg also count the second legs of connections against the fleet, which flights by arc do not
+'''
+
+if __name__ == "__main__":
+    print(f"{'airports':>8} {'days':>5} {'flights by':>10} {'int vars':>8} {'n vars':>7} {'backend':>8} "
+          f"{'status':>10} {'profit':>14} {'flights':>8} {'build (s)':>9} {'solve (s)':>9}")
+    for num_airports, num_days in [(5, 5), (10, 7), (15, 3), (25, 3)]:
+        instance = generate_instance(num_airports, max(2, num_airports // 10), num_days)
+        network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+        costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                           instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+        for shared_legs in (False, True):
+            start = time.perf_counter()
+            problem = build_flights_problem(network, instance['demands_matrix'], instance['revenues_matrix'],
+                                            instance['table_index'], costs, shared_legs=shared_legs)
+            problem_time = time.perf_counter() - start
+            num_n = problem.get('num_legs', problem['num_arcs']) * num_days
+            label = f"{num_airports:>8} {num_days:>5} {'leg' if shared_legs else 'arc':>10} {len(problem['obj']):>8} {num_n:>7}"
+
+            for backend in backends:
+                try:
+                    result = solve_problem(problem, backend, time_limit=60)
+                except Exception as error:  # e.g. a size-limited Gurobi license
+                    print(f"{label} {backend:>8} failed: {str(error)[:60]}")
+                    continue
+                has_solution = result['profit'] is not None
+                profit = f"{result['profit']:.1f}" if has_solution else "-"
+                flights = f"{int(np.sum(result['n']))}" if has_solution else "-"
+                print(f"{label} {backend:>8} {result['status']:>10} {profit:>14} {flights:>8} "
+                      f"{problem_time + result['build_time']:>9.3f} {result['solve_time']:>9.2f}")
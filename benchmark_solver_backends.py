@@ -0,0 +1,35 @@
+import time
+
+from network import build_network
+from cost_tables import CostTables
+from flights_model import build_flights_problem
+from solver_backends import backends, solve_problem
+from synthetic_instances import generate_instance
+
+'''
+# Benchmark: build and solve time of the same model with every solver backend
+'''
+
+if __name__ == "__main__":
+    print(f"{'airports':>8} {'days':>5} {'vars':>7} {'backend':>8} {'status':>10} {'profit':>14} "
+          f"{'build (s)':>9} {'solve (s)':>9}")
+    for num_airports, num_days in [(5, 5), (5, 30), (10, 7), (25, 7)]:
+        instance = generate_instance(num_airports, max(2, num_airports // 10), num_days)
+        network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+        costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                           instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+
+        start = time.perf_counter()
+        problem = build_flights_problem(network, instance['demands_matrix'], instance['revenues_matrix'],
+                                        instance['table_index'], costs)
+        problem_time = time.perf_counter() - start
+
+        for backend in backends:
+            try:
+                result = solve_problem(problem, backend, time_limit=120)
+            except Exception as error:  # e.g. a size-limited Gurobi license
+                print(f"{num_airports:>8} {num_days:>5} {len(problem['obj']):>7} {backend:>8} failed: {error}")
+                continue
+            profit = f"{result['profit']:.1f}" if result['profit'] is not None else "-"
+            print(f"{num_airports:>8} {num_days:>5} {len(problem['obj']):>7} {backend:>8} {result['status']:>10} "
+                  f"{profit:>14} {problem_time + result['build_time']:>9.3f} {result['solve_time']:>9.2f}")
@@ -0,0 +1,212 @@
+import time
+
+import numpy as np
+
+import gurobipy as gp
+from gurobipy import GRB
+
+'''
+# Itinerary (path) formulation solved by column generation
+# Flights are variables of the physical legs (network.build_leg_network), shared by every passenger
+# on the leg, and passengers are variables of itineraries: sequences of up to max_legs legs from their
+# origin to their destination, connecting at any airport (or only at the given connection airports).
+# The master LP starts with the direct itineraries. Each round, the itinerary of every origin,
+# destination and day with the largest reduced cost is found by a hop-limited longest path over the
+# legs, weighted by the duals of the capacity and profit constraints, and added if its reduced cost is
+# positive. When no itinerary prices out, the itineraries found are made integer and the restricted MIP
+# solved (price-then-branch).
+# A passenger pays the ticket price of their origin and destination once, and the AIF of every leg
+# flown. As in the arc model, the flights of a leg must be covered by the leg's ticket price times its
+# passengers, so the reduced cost of an itinerary is a sum over its legs and the pricing a longest path.
+'''
+
+def solve_column_generation(legs, demands_matrix, revenues_matrix, table_index, costs, plane_capacity=211,
+                            max_legs=2, connections=None, max_iterations=100, time_limit=None, tolerance=1e-6):
+    """
+    Solves the itinerary formulation by column generation, then the MIP over the itineraries generated.
+
+    legs is the network of build_leg_network and costs its CostTables. connections lists the airports
+    passengers may connect at (all airports when None). With max_legs=2 the pricing is exact, so the final
+    LP value bounds the profit of any plan; with longer itineraries non-simple paths are skipped and the
+    bound is approximate. time_limit (s) applies to the MIP.
+
+    Returns a dict with the profit of the MIP (None without a solution), the LP bound, the gap, the
+    number of itineraries generated, the itineraries flown as (airports, day, passengers) and one row per
+    pricing round.
+    """
+    cities = legs['cities']
+    city_id = {c: k for k, c in enumerate(cities)}
+    num_cities = len(cities)
+    num_days = len(demands_matrix)
+    num_legs = len(legs['arc_set'])
+    leg_from = np.array([city_id[legs['arc_leg'][arc][0]] for arc in legs['arc_set']], dtype=np.int64)
+    leg_to = np.array([city_id[legs['arc_leg'][arc][1]] for arc in legs['arc_set']], dtype=np.int64)
+    leg_of = {(i, j): k for k, (i, j) in enumerate(zip(leg_from, leg_to))}
+    fare = np.array([revenues_matrix[table_index[depart]][table_index[arrive]]
+                     for depart, arrive in legs['arc_leg'].values()], dtype=float)
+    flight_cost = costs.fuel + costs.landing  # per flight on each leg
+    value = fare - costs.aif  # per passenger on each leg, in its profit constraint
+
+    # Demands by day and (origin, destination), in the order of cities
+    positions = [table_index[c] for c in cities]
+    demands = np.asarray(demands_matrix)[:, positions][:, :, positions]
+    ticket_price = np.asarray(revenues_matrix, dtype=float)[positions][:, positions]
+    connecting = np.full(num_cities, connections is None)
+    for c in connections or []:
+        connecting[city_id[c]] = True
+
+    model = gp.Model("Itineraries")
+    model.Params.OutputFlag = 0
+    model.ModelSense = GRB.MAXIMIZE
+    n = model.addVars(num_legs, num_days, lb=0, name="n")
+    Z = model.addVars(num_cities, num_days + 1, lb=0, name="Z")
+    for k in range(num_legs):
+        for day_num in range(num_days):
+            n[k, day_num].Obj = -flight_cost[k]
+
+    # Passengers of each itinerary are added as columns of these rows
+    demand_rows = {}
+    for day_num, i, j in zip(*np.nonzero(demands)):
+        demand_rows[i, j, day_num] = model.addLConstr(gp.LinExpr(), GRB.LESS_EQUAL, float(demands[day_num, i, j]),
+                                                      name=f"demand_{cities[i]}_{cities[j]}_{day_num}")
+    capacity_rows = {}
+    profit_rows = {}
+    for k, arc in enumerate(legs['arc_set']):
+        for day_num in range(num_days):
+            capacity_rows[k, day_num] = model.addLConstr(-plane_capacity * n[k, day_num], GRB.LESS_EQUAL, 0,
+                                                         name=f"capacity_{arc}_{day_num}")
+            profit_rows[k, day_num] = model.addLConstr(flight_cost[k] * n[k, day_num], GRB.LESS_EQUAL, 0,
+                                                       name=f"profit_{arc}_{day_num}")
+
+    # Enough planes - every leg is flown by the fleet
+    for c in range(num_cities):
+        out_legs = np.flatnonzero(leg_from == c)
+        in_legs = np.flatnonzero(leg_to == c)
+        for day_num in range(num_days):
+            out_flights = gp.quicksum(n[k, day_num] for k in out_legs)
+            in_flights = gp.quicksum(n[k, day_num] for k in in_legs)
+            model.addLConstr(Z[c, day_num] >= out_flights, name=f"planes_{cities[c]}_{day_num}")
+            model.addLConstr(Z[c, day_num] + in_flights - out_flights == Z[c, day_num + 1],
+                             name=f"fleet_{cities[c]}_{day_num}")
+
+    y = {}  # passengers by (itinerary as a tuple of legs, day)
+
+    def add_itinerary(path, day_num):
+        rows = [demand_rows[leg_from[path[0]], leg_to[path[-1]], day_num]]
+        rows += [capacity_rows[k, day_num] for k in path] + [profit_rows[k, day_num] for k in path]
+        coeffs = [1] + [1] * len(path) + [-value[k] for k in path]
+        origin, destination = leg_from[path[0]], leg_to[path[-1]]
+        obj = ticket_price[origin, destination] - costs.aif[list(path)].sum()
+        y[path, day_num] = model.addVar(lb=0, obj=obj, column=gp.Column(coeffs, rows))
+
+    # Start from the direct flights
+    for (i, j, day_num) in demand_rows:
+        if (i, j) in leg_of:
+            add_itinerary((leg_of[i, j],), day_num)
+
+    iterations = []
+    demand_keys = list(demand_rows)
+    for iteration in range(max_iterations):
+        start = time.perf_counter()
+        model.optimize()
+        if model.Status != GRB.OPTIMAL:
+            raise ValueError(f"the master LP could not be solved (status {model.Status})")
+        lp_value = model.ObjVal
+
+        demand_dual = np.zeros((num_days, num_cities, num_cities))
+        for (i, j, day_num), pi in zip(demand_keys, model.getAttr("Pi", [demand_rows[key] for key in demand_keys])):
+            demand_dual[day_num, i, j] = pi
+        capacity_dual = np.array(model.getAttr("Pi", list(capacity_rows.values()))).reshape(num_legs, num_days)
+        profit_dual = np.array(model.getAttr("Pi", list(profit_rows.values()))).reshape(num_legs, num_days)
+
+        num_added = 0
+        for day_num in range(num_days):
+            # Reduced cost of an itinerary: its ticket price minus the dual of its demand row, plus its leg weights
+            weight = np.full((num_cities, num_cities), -np.inf)
+            weight[leg_from, leg_to] = value * profit_dual[:, day_num] - costs.aif - capacity_dual[:, day_num]
+            connecting_weight = np.where(connecting[:, None], weight, -np.inf)
+
+            best = [weight]  # best[h - 1][i, j]: largest weight of an itinerary of h legs from i to j
+            via = [None]  # via[h - 1][i, j]: the airport before j on that itinerary
+            for _ in range(1, max_legs):
+                candidates = best[-1][:, :, None] + connecting_weight[None, :, :]
+                via.append(candidates.argmax(axis=1))
+                best.append(candidates.max(axis=1))
+
+            reduced_cost = np.stack(best) + (ticket_price - demand_dual[day_num])[None, :, :]
+            num_hops = reduced_cost.argmax(axis=0)
+            best_reduced_cost = reduced_cost.max(axis=0)
+            for i, j in zip(*np.nonzero((best_reduced_cost > tolerance) & (demands[day_num] > 0))):
+                stops = [j]
+                for h in range(num_hops[i, j], 0, -1):
+                    stops.append(via[h][i, stops[-1]])
+                stops.append(i)
+                stops.reverse()
+                if len(set(stops)) < len(stops):
+                    continue  # visits an airport twice
+                path = tuple(leg_of[a, b] for a, b in zip(stops[:-1], stops[1:]))
+                if (path, day_num) not in y:
+                    add_itinerary(path, day_num)
+                    num_added += 1
+
+        iterations.append({"Iteration": iteration, "LP Value": lp_value, "Columns Added": num_added,
+                           "Time": time.perf_counter() - start})
+        if num_added == 0:
+            break
+
+    # Price-then-branch: the MIP over the itineraries generated
+    all_vars = list(n.values()) + list(Z.values()) + list(y.values())
+    model.setAttr("VType", all_vars, [GRB.INTEGER] * len(all_vars))
+    if time_limit is not None:
+        model.Params.TimeLimit = time_limit
+    model.optimize()
+
+    result = {'lp_bound': lp_value, 'profit': None, 'gap': None, 'columns': len(y), 'itineraries': [],
+              'iterations': iterations}
+    if model.SolCount > 0:
+        result['profit'] = model.ObjVal
+        result['gap'] = (lp_value - model.ObjVal) / max(abs(lp_value), 1)
+        keys = list(y)
+        for (path, day_num), passengers in zip(keys, model.getAttr("X", [y[key] for key in keys])):
+            if passengers > 0.5:
+                airports = tuple(cities[leg_from[k]] for k in path) + (cities[leg_to[path[-1]]],)
+                result['itineraries'].append((airports, day_num, round(passengers)))
+    model.dispose()
+    return result
+
+
+if __name__ == "__main__":
+    from network import build_network, build_leg_network
+    from cost_tables import CostTables
+    from flights_model import build_flights_model
+    from synthetic_instances import generate_instance
+
+    for num_airports, num_hubs, num_days in [(5, 2, 3), (8, 2, 2)]:
+        instance = generate_instance(num_airports, num_hubs, num_days)
+        data = (instance['demands_matrix'], instance['revenues_matrix'], instance['table_index'])
+        tables = (instance['fuel_prices'], instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+
+        # Arc formulation, with its commodity-specific arcs (its connecting passengers pay both legs' ticket
+        # prices, so its profit is not directly comparable when there are connections)
+        network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+        start = time.perf_counter()
+        model = build_flights_model(network, *data, CostTables(network, instance['distances'], *tables))[0]
+        model.Params.OutputFlag = 0
+        try:
+            model.optimize()
+            arc_result = f"profit {model.ObjVal:.1f} with {model.NumVars} variables"
+        except gp.GurobiError as error:  # e.g. a size-limited license
+            arc_result = f"{model.NumVars} variables, not solved: {error}"
+        print(f"\n{num_airports} airports, {num_days} days")
+        print(f"Arc formulation: {arc_result} in {time.perf_counter() - start:.2f}s")
+        model.dispose()
+
+        # Itinerary formulation, connections at the hubs only and anywhere
+        legs = build_leg_network(instance['airports'], instance['distances'])
+        leg_costs = CostTables(legs, instance['distances'], *tables)
+        for connections in [instance['hubs'], None]:
+            start = time.perf_counter()
+            result = solve_column_generation(legs, *data, leg_costs, connections=connections)
+            print(f"Column generation ({'hubs' if connections else 'any airport'}): profit {result['profit']:.1f}, "
+                  f"LP bound {result['lp_bound']:.1f}, gap {result['gap']:.2%}, {result['columns']} itineraries, "
+                  f"{len(result['iterations'])} rounds in {time.perf_counter() - start:.2f}s")
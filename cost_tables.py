@@ -0,0 +1,77 @@
+import numpy as np
+
+'''
+# Cost coefficients of every arc, computed once and kept in arrays indexed by arc id
+'''
+
+class CostTables:
+    """
+    Fuel cost per flight, landing fee per flight and AIF per passenger of every arc.
+
+    fuel, landing and aif are arrays indexed by network['arc_id'] (0 for sink arcs). The input tables
+    are kept by reference: after changing an entry (e.g. fuel_prices['T'] = 1.5) call refresh(), which
+    only recomputes the arcs that depend on the entries that changed.
+    """
+
+    def __init__(self, network, distances, fuel_prices, landing_fees, aif_rates, city_names,
+                 fuel_consumption_per_km=2.86, mtow_tons=142.88):
+        self.tables = {'fuel_prices': fuel_prices, 'landing_fees': landing_fees, 'aif_rates': aif_rates}
+        self.city_names = city_names  # landing fees and AIF rates are keyed by city name
+        self.fuel_consumption_per_km = fuel_consumption_per_km  # B767 fuel burn per km
+        self.mtow_tons = mtow_tons  # B767 maximum take-off weight, landing fees are charged per ton
+
+        num_arcs = len(network['arc_set'])
+        self.distance = np.zeros(num_arcs)
+        self.fuel = np.zeros(num_arcs)
+        self.landing = np.zeros(num_arcs)
+        self.aif = np.zeros(num_arcs)
+
+        # Arcs depending on each input entry, keyed by (table, city)
+        self.dependent_arcs = {}
+        for arc, (depart, arrive) in network['arc_leg'].items():
+            k = network['arc_id'][arc]
+            self.distance[k] = distances.get((depart, arrive), 0) or distances.get((arrive, depart), 0)
+            self.dependent_arcs.setdefault(('fuel_prices', depart), []).append(k)
+            self.dependent_arcs.setdefault(('landing_fees', arrive), []).append(k)
+            self.dependent_arcs.setdefault(('aif_rates', depart), []).append(k)
+        for key in self.dependent_arcs:
+            self.dependent_arcs[key] = np.array(self.dependent_arcs[key], dtype=np.int64)
+
+        self.used_values = {}  # value of each input entry the arrays were computed with
+        for key in self.dependent_arcs:
+            self.recompute(key)
+
+    def current_value(self, key):
+        """
+        Returns the current value of an input entry, 0 if the city is missing from the table.
+        """
+        table, city = key
+        if table == 'fuel_prices':
+            return self.tables[table].get(city, 0)
+        return self.tables[table].get(self.city_names.get(city, ""), 0)
+
+    def recompute(self, key):
+        """
+        Recomputes the coefficients of the arcs depending on one input entry.
+        """
+        value = self.current_value(key)
+        arcs = self.dependent_arcs[key]
+        table = key[0]
+        if table == 'fuel_prices':
+            self.fuel[arcs] = self.distance[arcs] * self.fuel_consumption_per_km * value
+        elif table == 'landing_fees':
+            self.landing[arcs] = value * self.mtow_tons
+        else:
+            self.aif[arcs] = value
+        self.used_values[key] = value
+
+    def refresh(self):
+        """
+        Recomputes the arcs whose inputs changed since the last refresh. Returns the ids of those arcs.
+        """
+        changed = [key for key in self.dependent_arcs if self.current_value(key) != self.used_values[key]]
+        for key in changed:
+            self.recompute(key)
+        if not changed:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate([self.dependent_arcs[key] for key in changed]))
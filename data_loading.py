@@ -0,0 +1,161 @@
+import json
+
+import numpy as np
+
+'''
+# Reading the data files
+# demands.txt: one matrix of passenger demands per day (row = departing city, column = arriving city,
+#              in table_index order), each day followed by a line "end"
+# ticket_revenues.txt: one matrix of ticket prices
+# Both can also be converted to binary .npy files (int32, days x origin x destination for the demands),
+# with the airport codes of the rows/columns in a small JSON header next to them ("<file>.npy.json").
+# The loaders memory-map .npy files, so the model builders read slices without copying the data.
+'''
+
+def parse_row(line, path, line_num, num_cities):
+    """
+    Returns the integers of one comma separated row, checking their format and count.
+    """
+    row = []
+    for entry in line.split(","):
+        entry = entry.strip()
+        if not entry.isdigit():
+            raise ValueError(f"{path}, line {line_num}: {entry!r} is not a non-negative integer")
+        row.append(int(entry))
+    if num_cities is not None and len(row) != num_cities:
+        raise ValueError(f"{path}, line {line_num}: expected {num_cities} values, found {len(row)}")
+    return row
+
+
+def iter_demand_days(path, num_cities=None):
+    """
+    Yields the demands matrix of each day in the file, reading one line at a time.
+
+    Any number of days is accepted. The number of cities is taken from the first row when num_cities
+    is not given, and every day must be a num_cities x num_cities matrix closed by "end".
+    """
+    day_demands_matrix = []
+    with open(path, "r") as f:
+        for line_num, line in enumerate(f, start=1):
+            line = line.strip()
+            if line == "":
+                continue
+            if line == "end":  # End of data for this day
+                if num_cities is None or len(day_demands_matrix) != num_cities:
+                    raise ValueError(f"{path}, line {line_num}: expected {num_cities} rows for the day, "
+                                     f"found {len(day_demands_matrix)}")
+                yield day_demands_matrix
+                day_demands_matrix = []
+            else:
+                row = parse_row(line, path, line_num, num_cities)
+                if num_cities is None:
+                    num_cities = len(row)
+                if len(day_demands_matrix) == num_cities:
+                    raise ValueError(f"{path}, line {line_num}: more than {num_cities} rows before \"end\"")
+                day_demands_matrix.append(row)
+    if day_demands_matrix:
+        raise ValueError(f"{path}: the last day is not closed by \"end\"")
+
+
+def load_demands(path, num_cities=None, airports=None):
+    """
+    Returns the list of daily demands matrices in the file and the total number of passengers of each day.
+
+    For a .npy file the demands are a read-only memory-mapped array of shape (days, cities, cities), and
+    airports (the city codes in table_index order) must match its header.
+    """
+    if path.endswith(".npy"):
+        demands_matrix = load_npy(path, num_cities, ndim=3, airports=airports)[0]
+        return demands_matrix, demands_matrix.sum(axis=(1, 2)).tolist()
+
+    demands_matrix = []         # list of daily demands matrices
+    total_daily_demands = []    # list of total number of passengers flying by day
+    for day_demands_matrix in iter_demand_days(path, num_cities):
+        demands_matrix.append(day_demands_matrix)
+        total_daily_demands.append(sum(sum(row) for row in day_demands_matrix))
+    return demands_matrix, total_daily_demands
+
+
+def load_revenues(path, num_cities=None, airports=None):
+    """
+    Returns the matrix of ticket revenues in the file. For a .npy file airports must match its header.
+    """
+    if path.endswith(".npy"):
+        return load_npy(path, num_cities, ndim=2, airports=airports)[0].tolist()  # small enough to keep as lists
+
+    revenues_matrix = []
+    with open(path, "r") as f:
+        for line_num, line in enumerate(f, start=1):
+            line = line.strip()
+            if line == "":
+                continue
+            row = parse_row(line, path, line_num, num_cities)
+            if num_cities is None:
+                num_cities = len(row)
+            revenues_matrix.append(row)
+    if len(revenues_matrix) != num_cities:
+        raise ValueError(f"{path}: expected {num_cities} rows, found {len(revenues_matrix)}")
+    return revenues_matrix
+
+
+'''
+# Binary store
+'''
+
+def write_header(npy_path, airports, kind):
+    """
+    Writes the JSON header of a .npy file: the airport codes of its rows/columns, in table_index order.
+    """
+    with open(npy_path + ".json", "w") as f:
+        json.dump({"kind": kind, "airports": list(airports)}, f)
+
+
+def convert_demands_to_npy(txt_path, npy_path, airports):
+    """
+    Converts a demands text file to a .npy file of shape (days, cities, cities) and its header.
+
+    airports lists the city codes in the order of the rows/columns of the text file. The days are
+    streamed into the output file, so the text file is never held in memory.
+    """
+    num_cities = len(airports)
+    num_days = sum(1 for _ in iter_demand_days(txt_path, num_cities))
+    demands = np.lib.format.open_memmap(npy_path, mode="w+", dtype=np.int32, shape=(num_days, num_cities, num_cities))
+    for day_num, day_demands_matrix in enumerate(iter_demand_days(txt_path, num_cities)):
+        demands[day_num] = day_demands_matrix
+    demands.flush()
+    del demands
+    write_header(npy_path, airports, "demands")
+
+
+def convert_revenues_to_npy(txt_path, npy_path, airports):
+    """
+    Converts a ticket revenues text file to a .npy file of shape (cities, cities) and its header.
+    """
+    np.save(npy_path, np.array(load_revenues(txt_path, len(airports)), dtype=np.int32))
+    write_header(npy_path, airports, "revenues")
+
+
+def load_npy(npy_path, num_cities=None, ndim=3, airports=None):
+    """
+    Memory-maps a .npy file written by the converters. Returns the array and the airport codes of its header.
+
+    airports is the expected list of airport codes, in the order of the rows/columns (table_index order).
+    """
+    expected_airports = airports
+    data = np.load(npy_path, mmap_mode="r")
+    with open(npy_path + ".json", "r") as f:
+        airports = json.load(f)["airports"]
+    if data.ndim != ndim or any(size != len(airports) for size in data.shape[-2:]):
+        raise ValueError(f"{npy_path}: shape {data.shape} does not match the {len(airports)} airports of its header")
+    if num_cities is not None and len(airports) != num_cities:
+        raise ValueError(f"{npy_path}: expected {num_cities} airports, found {len(airports)}")
+    if expected_airports is not None and list(expected_airports) != airports:
+        raise ValueError(f"{npy_path}: the airports of its header {airports} are not {list(expected_airports)}")
+    return data, airports
+
+
+if __name__ == "__main__":
+    # Convert the data files of passenger_demands.py (cities in table_index order)
+    airports = ['H', 'M', 'T', 'W', 'V']
+    convert_demands_to_npy("demands.txt", "demands.npy", airports)
+    convert_revenues_to_npy("ticket_revenues.txt", "ticket_revenues.npy", airports)
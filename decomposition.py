@@ -0,0 +1,303 @@
+import math
+import multiprocessing as mp
+import os
+import time
+
+from flights_model import build_flights_model
+from rolling_horizon import solve_rolling_horizon
+
+'''
+# Lagrangian decomposition by day
+# Only the fleet balance constraints (Z[c, d] + arriving - leaving flights == Z[c, d + 1]) link the days.
+# They are moved into the objective with one multiplier per city and day, which leaves one independent
+# subproblem per day (its flows, capacities, profit constraints and planes Z[c, d] >= leaving flights).
+# The subproblems are solved in a pool of worker processes and the multipliers updated by subgradient
+# steps until the gap between the Lagrangian bound and the best plan found is small enough. Each
+# iteration's daily plans are repaired into a plan the fleet can fly: the days are solved again in order,
+# starting from the planes left by the day before and flying at most the flights of the daily plans.
+# With a free starting fleet (as in the full model) planes cost nothing and the days are independent,
+# so the first iteration is optimal; the multipliers matter once initial_fleet fixes the starting planes.
+# Limitation: the subgradient steps close the bound slowly. On the 5 airport, 7 day demo with a fixed
+# fleet the bound is still 0.8% above the optimum after 300 iterations (13s), and the best plan is the
+# rolling horizon's, while the full model solves in 0.05s; no step scale or patience tried did better.
+# It is only worth it for horizons too long to solve as one model, with a gap target of a few percent.
+'''
+
+_worker = {}  # state of the current worker process
+
+
+def _init_worker(network, demands_matrix, revenues_matrix, table_index, costs, plane_capacity, fleet_bound, threads):
+    """
+    Keeps the instance in the worker. The day subproblems are built on first use.
+    """
+    _worker.update(network=network, demands_matrix=demands_matrix, revenues_matrix=revenues_matrix,
+                   table_index=table_index, costs=costs, plane_capacity=plane_capacity, fleet_bound=fleet_bound,
+                   threads=threads, days={})
+
+
+def _day_model(day_num):
+    """
+    Returns the subproblem of one day: the model of that day alone, without its fleet balance constraints.
+    """
+    if day_num not in _worker['days']:
+        network = _worker['network']
+        model, X, n, Z = build_flights_model(network, _worker['demands_matrix'][day_num:day_num + 1],
+                                             _worker['revenues_matrix'], _worker['table_index'], _worker['costs'],
+                                             _worker['plane_capacity'])
+        model.Params.OutputFlag = 0
+        model.Params.Threads = _worker['threads']
+        model.update()
+        model.remove([model.getConstrByName(f"fleet_{c}_0") for c in network['cities']])
+        for c in network['cities']:
+            Z[c, 0].UB = _worker['fleet_bound']
+            Z[c, 1].UB = 0  # the next day's planes belong to the next subproblem
+        fleet_arcs = [arc for arc in network['arc_leg'] if arc not in network['layover_arcs']]
+        n_vars = [n[arc, 0] for arc in fleet_arcs]
+        _worker['days'][day_num] = (model, X, n_vars, Z, fleet_arcs, model.getAttr("Obj", n_vars))
+    return _worker['days'][day_num]
+
+
+def _solve_days(tasks):
+    """
+    Solves the subproblems of the given days with their multipliers.
+
+    A task is (day, multipliers of the day, multipliers of the previous day, planes at the start of the day
+    or None). Returns, by day, the Lagrangian objective, the profit, the planes Z and the flights leaving
+    and arriving at each city (None when the subproblem has no solution).
+    """
+    network = _worker['network']
+    cities = network['cities']
+    results = []
+    for day_num, multipliers, previous_multipliers, fleet in tasks:
+        model, X, n_vars, Z, fleet_arcs, base_obj = _day_model(day_num)
+
+        # The multiplier of fleet_{c}_{d} counts +1 per flight arriving at c and -1 per flight leaving c
+        obj = [coeff + multipliers[network['arc_leg'][arc][1]] - multipliers[network['arc_leg'][arc][0]]
+               for arc, coeff in zip(fleet_arcs, base_obj)]
+        model.setAttr("Obj", n_vars, obj)
+        for c in cities:
+            Z[c, 0].Obj = multipliers[c] - previous_multipliers[c]
+            if fleet is not None:
+                Z[c, 0].LB = Z[c, 0].UB = fleet[c]
+        model.optimize()
+        if model.SolCount == 0:
+            results.append((day_num, None))
+            continue
+
+        flights = dict(zip(fleet_arcs, (round(value) for value in model.getAttr("X", n_vars))))
+        leaving = {c: 0 for c in cities}
+        arriving = {c: 0 for c in cities}
+        for arc, count in flights.items():
+            depart, arrive = network['arc_leg'][arc]
+            leaving[depart] += count
+            arriving[arrive] += count
+        planes = {c: round(Z[c, 0].X) for c in cities}
+        profit = model.ObjVal - sum(Z[c, 0].Obj * planes[c] for c in cities) \
+            - sum(multipliers[c] * (arriving[c] - leaving[c]) for c in cities)
+        results.append((day_num, {'Objective': model.ObjVal, 'Profit': profit, 'Z': planes, 'Flights': flights,
+                                  'Leaving': leaving, 'Arriving': arriving}))
+    return results
+
+
+def _repair_days(flights_by_day, initial_fleet):
+    """
+    Returns the profit of a plan the fleet can fly, made from the daily plans, or None.
+
+    The days are solved in order, each with its original objective, the planes left by the day before
+    as its starting fleet and at most the flights of its daily plan (flights_by_day, by fleet arc).
+    """
+    network = _worker['network']
+    cities = network['cities']
+    fleet = dict(initial_fleet)
+    profit = 0
+    for day_num, flights in enumerate(flights_by_day):
+        model, X, n_vars, Z, fleet_arcs, base_obj = _day_model(day_num)
+        model.setAttr("Obj", n_vars, base_obj)
+        model.setAttr("UB", n_vars, [flights[arc] for arc in fleet_arcs])
+        for c in cities:
+            Z[c, 0].Obj = 0
+            Z[c, 0].LB = Z[c, 0].UB = fleet[c]
+        model.optimize()
+        if model.SolCount == 0:
+            profit = None
+        else:
+            profit += model.ObjVal
+            for arc, count in zip(fleet_arcs, model.getAttr("X", n_vars)):
+                depart, arrive = network['arc_leg'][arc]
+                fleet[depart] -= round(count)
+                fleet[arrive] += round(count)
+
+        # Back to the bounds of the subproblem
+        model.setAttr("UB", n_vars, [float('inf')] * len(n_vars))
+        for c in cities:
+            Z[c, 0].LB = 0
+            Z[c, 0].UB = _worker['fleet_bound']
+        if profit is None:
+            return None
+    return profit
+
+
+def fleet_feasible_profit(days, cities, initial_fleet=None):
+    """
+    Returns the profit of the daily plans if their flights can be flown with the fleet, else None.
+
+    With no initial fleet the smallest starting fleet that covers every day is used.
+    """
+    fleet = {}
+    for c in cities:
+        # Planes needed at the start so that the planes at c never drop below the day's leaving flights
+        balance = 0
+        needed = 0
+        for day in days:
+            needed = max(needed, day['Leaving'][c] - balance)
+            balance += day['Arriving'][c] - day['Leaving'][c]
+        fleet[c] = needed if initial_fleet is None else initial_fleet[c]
+        if fleet[c] < needed:
+            return None
+    return sum(day['Profit'] for day in days)
+
+
+def solve_lagrangian(network, demands_matrix, revenues_matrix, table_index, costs, initial_fleet=None,
+                     plane_capacity=211, gap=1e-3, max_iterations=300, num_workers=None, threads_per_worker=1,
+                     step_scale=2.0, patience=20, primal_window=3):
+    """
+    Solves the Lagrangian relaxation of the fleet balance constraints by subgradient optimization.
+
+    Stops when the relative gap between the bound and the best plan found is below `gap`, or after
+    max_iterations. With an initial_fleet (planes by city) the first plan comes from a rolling horizon with
+    windows of primal_window days (overlapping by one day), and every iteration repairs its daily plans into
+    a plan the fleet can fly. The steps are Polyak steps towards the best plan's profit, scaled by
+    step_scale, which is halved (and the multipliers reset to those of the best bound) when the bound has
+    not improved for `patience` iterations. The bound only approaches the optimum slowly near the end, and
+    may stay above it (the relaxation's duality gap), so with a fixed fleet the loop can end at
+    max_iterations above `gap`: converged is then False.
+
+    Returns a dict with the upper bound, the best profit found (None if none is known), the gap, whether
+    the gap was reached (converged, False when max_iterations stopped the loop) and one row per iteration
+    with its bound, best profit, step and time.
+    """
+    cities = network['cities']
+    num_days = len(demands_matrix)
+    if initial_fleet is not None:
+        fleet_bound = sum(initial_fleet.values())  # the fleet is conserved
+    else:
+        # A plan never needs more planes than passengers, as a flight carries at least one to be worth flying
+        fleet_bound = int(sum(sum(sum(row) for row in day) for day in demands_matrix))
+
+    best_profit = None
+    if initial_fleet is not None:
+        best_profit = solve_rolling_horizon(network, demands_matrix, revenues_matrix, table_index, costs,
+                                            window=primal_window, overlap=min(1, primal_window - 1),
+                                            plane_capacity=plane_capacity,
+                                            initial_fleet=initial_fleet)['profit']
+
+    multipliers = [{c: 0.0 for c in cities} for _ in range(num_days)]
+    best_multipliers = [dict(day) for day in multipliers]
+    no_multipliers = {c: 0.0 for c in cities}
+    converged = False
+    upper_bound = math.inf
+    iterations = []
+    stalled = 0
+
+    num_workers = min(num_workers or os.cpu_count(), num_days)
+    chunk_size = max(1, math.ceil(num_days / num_workers))
+    ctx = mp.get_context("spawn")  # Gurobi environments cannot be shared with forked processes
+    with ctx.Pool(num_workers, initializer=_init_worker,
+                  initargs=(network, demands_matrix, revenues_matrix, table_index, costs, plane_capacity,
+                            fleet_bound, threads_per_worker)) as pool:
+        for iteration in range(max_iterations):
+            start = time.perf_counter()
+            tasks = [(d, multipliers[d], multipliers[d - 1] if d > 0 else no_multipliers,
+                      initial_fleet if d == 0 else None) for d in range(num_days)]
+            chunks = [tasks[k:k + chunk_size] for k in range(0, num_days, chunk_size)]
+            days = dict(result for rows in pool.map(_solve_days, chunks) for result in rows)
+            if any(day is None for day in days.values()):
+                raise ValueError("a day subproblem has no solution")
+            days = [days[d] for d in range(num_days)]
+
+            # Planes at the end of the horizon only appear in the last fleet balance, with bound [0, fleet_bound]
+            bound = sum(day['Objective'] for day in days) \
+                + sum(max(0, -multipliers[-1][c]) * fleet_bound for c in cities)
+            restart = False
+            if upper_bound - bound > 1e-6 * abs(bound):
+                upper_bound = bound
+                best_multipliers = [dict(day) for day in multipliers]
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled >= patience:
+                    step_scale /= 2
+                    stalled = 0
+                    restart = True
+
+            profit = fleet_feasible_profit(days, cities, initial_fleet)
+            if profit is None and initial_fleet is not None:
+                profit = pool.apply(_repair_days, ([day['Flights'] for day in days], initial_fleet))
+            if profit is not None and (best_profit is None or profit > best_profit):
+                best_profit = profit
+
+            # Subgradient of the relaxed constraints Z[c, d] + arriving - leaving - Z[c, d + 1]
+            subgradient = []
+            for d, day in enumerate(days):
+                for c in cities:
+                    next_planes = days[d + 1]['Z'][c] if d + 1 < num_days else \
+                        (fleet_bound if multipliers[-1][c] < 0 else 0)
+                    subgradient.append(day['Z'][c] + day['Arriving'][c] - day['Leaving'][c] - next_planes)
+            norm = sum(g * g for g in subgradient)
+
+            relative_gap = math.inf if best_profit is None else (upper_bound - best_profit) / max(abs(upper_bound), 1)
+            target = best_profit if best_profit is not None else 0.95 * upper_bound
+            step = step_scale * (bound - target) / norm if norm > 0 else 0
+            iterations.append({"Iteration": iteration, "Bound": bound, "Best Profit": best_profit,
+                               "Gap": relative_gap, "Step": step, "Time": time.perf_counter() - start})
+            if relative_gap <= gap:
+                converged = True
+                break
+            if norm == 0:  # the daily plans already balance the fleet, but the gap was not reached
+                break
+            if restart:  # take the next step from the multipliers of the best bound
+                multipliers = [dict(day) for day in best_multipliers]
+                continue
+
+            # Move the multipliers against the subgradient (the dual is minimized)
+            k = 0
+            for d in range(num_days):
+                for c in cities:
+                    multipliers[d][c] -= step * subgradient[k]
+                    k += 1
+
+    return {'upper_bound': upper_bound, 'profit': best_profit, 'gap': iterations[-1]["Gap"],
+            'converged': converged, 'iterations': iterations}
+
+
+if __name__ == "__main__":
+    from network import build_network
+    from cost_tables import CostTables
+    from synthetic_instances import generate_instance
+
+    instance = generate_instance(5, 1, 7)
+    network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+    costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                       instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+    data = (network, instance['demands_matrix'], instance['revenues_matrix'], instance['table_index'], costs)
+
+    for initial_fleet in [None, {c: 2 for c in network['cities']}]:
+        # Full model for reference
+        start = time.perf_counter()
+        model, X, n, Z = build_flights_model(*data)
+        model.Params.OutputFlag = 0
+        if initial_fleet is not None:
+            for c in network['cities']:
+                Z[c, 0].LB = Z[c, 0].UB = initial_fleet[c]
+        model.optimize()
+        print(f"\nStarting fleet {initial_fleet or 'free'}: full model {model.ObjVal:.1f} "
+              f"in {time.perf_counter() - start:.2f}s")
+        model.dispose()
+
+        start = time.perf_counter()
+        # A gap of a few percent, which the subgradient steps reach (see the limitation above)
+        result = solve_lagrangian(*data, initial_fleet=initial_fleet, gap=0.02)
+        print(f"Decomposition: bound {result['upper_bound']:.1f}, best plan {result['profit']:.1f}, "
+              f"gap {result['gap']:.2%} after {len(result['iterations'])} iterations "
+              f"({'converged' if result['converged'] else 'not converged'}) "
+              f"in {time.perf_counter() - start:.2f}s")
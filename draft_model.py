@@ -1,80 +1,27 @@
 
 import gurobipy as gp
 from gurobipy import GRB
+from data_loading import load_demands, load_revenues
+from network import build_digraph, build_arc_index
 
 '''
 Processing data
 '''
-# File containing passenger demands (days are separated by: "end")
-f_demands = open("demands.txt", "r")
-demand_data = f_demands.readlines()
-f_demands.close()
-
-# File containing ticket revenues data
-f_revenues = open("ticket_revenues.txt", "r")
-rev_data = f_revenues.readlines()
-f_revenues.close()
-
 # Cities by table index are given by:
 table_index = {'H':0, 'M':1, 'T':2, 'W':3, 'V':4}
 
-# Reading the demands data
-day_total = 0               # total number of passengers flying in one day
-total_daily_demands = []    # list of total number of passengers flying by day
-day_demands_matrix = []     # matrix of passenger demands for one day
-demands_matrix = []         # list of daily demands matrices
-for line_num in range(0, len(demand_data)):
-    row = demand_data[line_num].split(",")
-    if row == ["end\n"] or row == ["end"]:   # end of the data for this day
-        demands_matrix.append(day_demands_matrix)
-        day_demands_matrix = []
-        total_daily_demands.append(day_total)
-        day_total=0
-    else:
-        row = list(map(lambda x: int(x), row))
-        day_total += sum(row)
-        day_demands_matrix.append(row)
-
-# Reading the revenue data
-revenues_matrix = []
-for line_num in range(0, len(rev_data)):
-    row = rev_data[line_num].split(",")
-    revenues_matrix.append(list(map(lambda x: int(x), row)))
+# Passenger demands (days are separated by: "end"), any number of days
+demands_matrix, total_daily_demands = load_demands("demands.txt", num_cities=len(table_index))
+num_days = len(demands_matrix)
+
+# Ticket revenues data
+revenues_matrix = load_revenues("ticket_revenues.txt", num_cities=len(table_index))
 
 '''
 # Building the digraph
 '''
-cities = ['V', 'W', 'T', 'M', 'H']
-arc_set = [] + ['T*-H', 'M*-H']  # form: each arc (i,j) is a string: "i-j"  
-for i in cities:
-    arc_set.append(i + '-' + 't')
-    for j in cities:
-        if i != j:
-            if i == 'T' or i == 'M':
-                arc_set.append(i + j + '-' + j)
-                arc_set.append(i + j + '-' + 't')
-            elif i == 'V' or i == 'W':
-                if j == 'H':
-                    arc_set.append(i + j + '-' + 'T*') 
-                    arc_set.append(i + j + '-' + 'M*')
-                    arc_set.append(i + j + '-' + 't')
-                else:
-                    arc_set.append(i + j + '-' + j)
-                    arc_set.append(i + j + '-' +'t')
-            else: #i = 'H'
-                if j == 'T' or j == 'M':
-                    arc_set.append('H' + j + '-' + j)
-                    arc_set.append(i + j + '-' + 't')
-                elif j == 'W' or j == 'V': 
-                    arc_set.append('H' + j + '-' + 'T*'), arc_set.append('T*' + '-' + j)
-                    arc_set.append('H' + j + '-' + 'M*'), arc_set.append('M*' + '-' + j)
-                    arc_set.append(i + j + '-' + 't')
-
-node_set = cities.copy() + ['T*', 'M*', 't']
-for i in cities:
-    for j in cities:
-        if i != j:
-            node_set.append(i + j)
+cities, arc_set, node_set = build_digraph()
+out_arcs, in_arcs = build_arc_index(arc_set, node_set)  # arcs leaving/entering each node
 
 
 '''
@@ -83,8 +30,8 @@ for i in cities:
 FLIGHTS_MODEL = gp.Model("Passenger_Demands")
 
 # Variables - by arc and day
-X = FLIGHTS_MODEL.addVars(arc_set, [0,1,2,3,4], vtype=GRB.CONTINUOUS, lb=0, ub=float('inf'), name="x")
-n = FLIGHTS_MODEL.addVars(arc_set, [0, 1, 2, 3, 4], vtype=GRB.INTEGER, lb=0, name="n") # This is the total number of flights flying from city i to j on day k
+X = FLIGHTS_MODEL.addVars(arc_set, range(num_days), vtype=GRB.CONTINUOUS, lb=0, ub=float('inf'), name="x")
+n = FLIGHTS_MODEL.addVars(arc_set, range(num_days), vtype=GRB.INTEGER, lb=0, name="n") # This is the total number of flights flying from city i to j on day k
 
 # Parameters
 plane_capacity = 211 # aribitray plane capcity 
@@ -95,7 +42,7 @@ DepartureCost = 500  # Arbitrary departure cost per flight Vary from place to pl
 
 # Objective function
 obj_fn = 0
-for day_num in range(0,5):
+for day_num in range(num_days):
     for arc in arc_set:
         depart = arc.split("-")[0][0]
         arrive = arc.split("-")[1][0]
@@ -111,7 +58,7 @@ FLIGHTS_MODEL.setObjective(obj_fn, GRB.MAXIMIZE)
 
 
 # Flow conservation constraints - by node and day
-for day_num in range(0,5):
+for day_num in range(num_days):
     for v in node_set:
         v_demand = 0
         if v == 't': # the sink node
@@ -124,17 +71,16 @@ for day_num in range(0,5):
             v_demand = -1 * demands_matrix[day_num][table_index[depart]][table_index[arrive]]
 
         v_constraint = 0
-        for arc in arc_set:
-            if v == arc.split("-")[0]: # outgoing arc from v
-                v_constraint += -1 * X[arc,day_num]
-            elif v == arc.split("-")[1]: # incoming arc to v
-                v_constraint += X[arc,day_num]
+        for arc in out_arcs[v]: # outgoing arc from v
+            v_constraint += -1 * X[arc,day_num]
+        for arc in in_arcs[v]: # incoming arc to v
+            v_constraint += X[arc,day_num]
     
         FLIGHTS_MODEL.addConstr(v_constraint == v_demand, name=v+str(day_num)) # flow conservation constraints
 
 
 # Flow conservation - ensure those on layovers make their destination
-for day_num in range(0,5):
+for day_num in range(num_days):
     FLIGHTS_MODEL.addConstr(X['VH-T*', day_num] + X['WH-T*', day_num] == X['T*-H', day_num])
     FLIGHTS_MODEL.addConstr(X['VH-M*', day_num] + X['WH-M*', day_num] == X['M*-H', day_num])
     FLIGHTS_MODEL.addConstr(X['HV-T*', day_num] == X['T*-V', day_num])
@@ -144,7 +90,7 @@ for day_num in range(0,5):
 
 
 # Capacity constraints
-for day_num in range(0, 5):
+for day_num in range(num_days):
     for arc in arc_set:
         if 't' not in arc:  # Ignore sink arcs
             FLIGHTS_MODEL.addConstr(
@@ -153,7 +99,7 @@ for day_num in range(0, 5):
             )
 
 # Profit constraints
-for day_num in range(0, 5):
+for day_num in range(num_days):
     for arc in arc_set:
         if 't' not in arc:  # Ignore sink arcs
             ticket_price = revenues_matrix[table_index[arc.split("-")[0][0]]][table_index[arc.split("-")[1][0]]]
@@ -169,7 +115,7 @@ FLIGHTS_MODEL.optimize()
 
 
 # Test to confirm:
-for day_num in range(0,5):
+for day_num in range(num_days):
     for arc in arc_set:
         if (len(arc.split("-")[0])==2) and (arc.split("-")[1] == 't'):
             print("X[" + arc + ", " + str(day_num) + "] = " + str(X[arc, day_num].X))
@@ -0,0 +1,378 @@
+import numpy as np
+import scipy.sparse as sp
+
+try:
+    import gurobipy as gp
+    from gurobipy import GRB
+except ImportError:  # only build_flights_problem can be used, solved with solver_backends.solve_highs
+    gp = None
+
+from model_tightening import compute_bounds
+
+'''
+# Building the model one constraint at a time
+'''
+
+def build_flights_model(network, demands_matrix, revenues_matrix, table_index, costs, plane_capacity=211,
+                        prune=False):
+    """
+    Builds the passenger flights model with one gurobipy variable and constraint per arc, node and day.
+
+    costs is the CostTables of the network (fuel, landing and AIF coefficients by arc id).
+
+    Returns the model and the variables X (passengers), n (flights) indexed by (arc, day)
+    and Z (planes at each airport at the start of each day) indexed by (city, day).
+
+    With prune=True the arcs carrying no demand on a day (model_tightening.compute_bounds) get no variables
+    that day, nor the flight arcs flights, and the constraints left empty are not added: X and n then only
+    have the keys of the arcs and days that can be flown, the others being zero.
+    """
+    cities = network['cities']
+    arc_set = network['arc_set']
+    arc_id = network['arc_id']
+    arc_leg = network['arc_leg']
+    supply_nodes = network['supply_nodes']
+    num_days = len(demands_matrix)
+    days = list(range(num_days))
+
+    model = gp.Model("Passenger_Demands")
+
+    keys = [(arc, day_num) for arc in arc_set for day_num in days]
+    if prune:  # only the arcs and days carrying demand, flights only on the flight arcs
+        x_ub = compute_bounds(network, demands_matrix, table_index, plane_capacity)[0]
+        keys = [(arc, day_num) for arc, day_num in keys if x_ub[arc_id[arc], day_num] > 0]
+        n_keys = [(arc, day_num) for arc, day_num in keys if arc in arc_leg]
+    else:
+        n_keys = keys
+
+    # Variables - by arc and day
+    X = model.addVars(keys, vtype=GRB.INTEGER, lb=0, ub=float('inf'), name="x") # Passenger flows
+    n = model.addVars(n_keys, vtype=GRB.INTEGER, lb=0, name="n") # Number of flights on the arc each day
+    Z = model.addVars(cities, range(num_days + 1), vtype=GRB.INTEGER, lb=0, name="Z") # Number of planes at an airport at start of each day
+
+    # Objective
+    obj_fn = 0
+    for day_num in days:
+        for arc, (depart, arrive) in arc_leg.items():
+            if (arc, day_num) not in X:  # pruned
+                continue
+            k = arc_id[arc]
+            revenue = revenues_matrix[table_index[depart]][table_index[arrive]] * X[arc, day_num]
+            cost = (costs.fuel[k] + costs.landing[k]) * n[arc, day_num] + costs.aif[k] * X[arc, day_num]
+            obj_fn += revenue - cost
+    model.setObjective(obj_fn, GRB.MAXIMIZE)
+
+    # Flow conservation constraints - by node and day
+    for day_num in days:
+        day_total = sum(sum(row) for row in demands_matrix[day_num])
+        for v in network['node_set']:
+            if v == 't': # the sink node
+                v_demand = day_total
+            elif v in supply_nodes: # a supply node
+                depart, arrive = supply_nodes[v]
+                v_demand = -1 * demands_matrix[day_num][table_index[depart]][table_index[arrive]]
+            else: # a destination or layover node
+                v_demand = 0
+
+            out_vars = [X[arc, day_num] for arc in network['out_arcs'][v] if (arc, day_num) in X]
+            in_vars = [X[arc, day_num] for arc in network['in_arcs'][v] if (arc, day_num) in X]
+            if not out_vars and not in_vars and v_demand == 0:  # every arc of the node pruned
+                continue
+            v_constraint = 0
+            for x in out_vars: # outgoing arc from v
+                v_constraint += -1 * x
+            for x in in_vars: # incoming arc to v
+                v_constraint += x
+            model.addConstr(v_constraint == v_demand, name=f"flow_{v}_{day_num}")
+
+    # Flow conservation - ensure those on layovers make their destination
+    for day_num in days:
+        for layover_arc, arriving_arcs in network['layover_arcs'].items():
+            if (layover_arc, day_num) not in X:  # and so are the arcs arriving at the hub
+                continue
+            model.addConstr(gp.quicksum(X[arc, day_num] for arc in arriving_arcs if (arc, day_num) in X)
+                            == X[layover_arc, day_num], name=f"layover_{layover_arc}_{day_num}")
+
+    # Capacity and profit constraints
+    for day_num in days:
+        for arc, (depart, arrive) in arc_leg.items():
+            if (arc, day_num) not in n:
+                continue
+            model.addConstr(X[arc, day_num] <= plane_capacity * n[arc, day_num],
+                            name=f"capacity_{arc}_{day_num}")
+
+            k = arc_id[arc]
+            ticket_price = revenues_matrix[table_index[depart]][table_index[arrive]]
+            operating_cost = (costs.fuel[k] + costs.landing[k]) * n[arc, day_num] + costs.aif[k] * X[arc, day_num]
+            model.addConstr(operating_cost <= ticket_price * X[arc, day_num],
+                            name=f"profit_{arc}_{day_num}")
+
+    # Enough planes - the second leg of a layover is not counted against the fleet
+    for day_num in days:
+        out_flights = {c: 0 for c in cities}
+        in_flights = {c: 0 for c in cities}
+        for arc, (depart, arrive) in arc_leg.items():
+            if arc in network['layover_arcs'] or (arc, day_num) not in n:
+                continue
+            out_flights[depart] += n[arc, day_num]
+            in_flights[arrive] += n[arc, day_num]
+        for c in cities:
+            model.addConstr(Z[c, day_num] >= out_flights[c], name=f"planes_{c}_{day_num}")
+            model.addConstr(Z[c, day_num] + in_flights[c] - out_flights[c] == Z[c, day_num + 1],
+                            name=f"fleet_{c}_{day_num}")
+
+    return model, X, n, Z
+
+
+'''
+# Building the model in matrix form
+'''
+
+def build_incidence_matrices(network):
+    """
+    Returns the sparse matrices describing the network, with one column per arc (in arc_set order).
+
+    node_arc: node-arc incidence matrix, +1 where the arc enters the node and -1 where it leaves
+    layover: one row per layover arc "h*-j", +1 for the arcs bringing passengers for j into h, -1 for "h*-j"
+    fleet_out / fleet_in: one row per city, 1 for the flights leaving / arriving at the city
+    """
+    arc_id = network['arc_id']
+    node_id = {v: k for k, v in enumerate(network['node_set'])}
+    city_id = {c: k for k, c in enumerate(network['cities'])}
+    num_arcs = len(network['arc_set'])
+
+    rows, cols, vals = [], [], []
+    for arc, k in arc_id.items():
+        tail, head = arc.split("-")
+        rows += [node_id[tail], node_id[head]]
+        cols += [k, k]
+        vals += [-1, 1]
+    node_arc = sp.csr_matrix((vals, (rows, cols)), shape=(len(node_id), num_arcs))
+
+    rows, cols, vals = [], [], []
+    for r, (layover_arc, arriving_arcs) in enumerate(network['layover_arcs'].items()):
+        for arc in arriving_arcs:
+            rows.append(r)
+            cols.append(arc_id[arc])
+            vals.append(1)
+        rows.append(r)
+        cols.append(arc_id[layover_arc])
+        vals.append(-1)
+    layover = sp.csr_matrix((vals, (rows, cols)), shape=(len(network['layover_arcs']), num_arcs))
+
+    out_rows, in_rows, fleet_cols = [], [], []
+    for arc, (depart, arrive) in network['arc_leg'].items():
+        if arc in network['layover_arcs']:
+            continue
+        out_rows.append(city_id[depart])
+        in_rows.append(city_id[arrive])
+        fleet_cols.append(arc_id[arc])
+    ones = np.ones(len(fleet_cols))
+    fleet_out = sp.csr_matrix((ones, (out_rows, fleet_cols)), shape=(len(city_id), num_arcs))
+    fleet_in = sp.csr_matrix((ones, (in_rows, fleet_cols)), shape=(len(city_id), num_arcs))
+
+    return node_arc, layover, fleet_out, fleet_in
+
+
+def add_rows(problem, sizes, parts, sense, rhs, block_columns=None):
+    """
+    Adds the constraints [parts] (sense) rhs to problem['rows'], with one part per block of variables of the
+    given sizes (e.g. X, n and Z), None standing for a block of zeros.
+
+    block_columns keeps only the given columns of each block (None for all of them), dropping the rows
+    left empty, which must then hold at zero.
+    """
+    num_rows = rhs.shape[0]
+    blocks = [part if part is not None else sp.csr_matrix((num_rows, size)) for part, size in zip(parts, sizes)]
+    if block_columns is not None:
+        blocks = [block if columns is None else block.tocsc()[:, columns]
+                  for block, columns in zip(blocks, block_columns)]
+    A = sp.hstack(blocks, format='csr')
+    if block_columns is not None:
+        nonempty = np.diff(A.indptr) > 0
+        empty_rhs = rhs[~nonempty]  # 0 (sense) rhs must hold for the rows dropped
+        if ((sense == '=' and np.any(empty_rhs != 0)) or (sense == '<' and np.any(empty_rhs < 0))
+                or (sense == '>' and np.any(empty_rhs > 0))):
+            raise ValueError("the problem is infeasible: a constraint over pruned variables cannot hold")
+        if not np.any(nonempty):
+            return
+        A, rhs = A[nonempty], rhs[nonempty]
+    problem['rows'].append((A, sense, rhs))
+
+
+def add_fleet_rows(problem, sizes, fleet_out, fleet_in, num_days, block_columns=None):
+    """
+    Adds the fleet constraints to a problem whose blocks of variables (sizes) are X, n and Z: Z[c, day] covers
+    the flights leaving c, and Z[c, day + 1] is what is left plus the arrivals. fleet_out / fleet_in have one
+    row per city and one column per row of n, 1 for the flights leaving / arriving at the city.
+    block_columns is that of add_rows.
+    """
+    num_cities = fleet_out.shape[0]
+    days_eye = sp.identity(num_days, format='csr')
+    start_of_day = sp.hstack([days_eye, sp.csr_matrix((num_days, 1))])
+    end_of_day = sp.hstack([sp.csr_matrix((num_days, 1)), days_eye])
+    cities_eye = sp.identity(num_cities, format='csr')
+    z_start = sp.kron(cities_eye, start_of_day, format='csr')
+    z_end = sp.kron(cities_eye, end_of_day, format='csr')
+    n_out = sp.kron(fleet_out, days_eye, format='csr')
+    n_in = sp.kron(fleet_in, days_eye, format='csr')
+    num_rows = num_cities * num_days
+    add_rows(problem, sizes, [None, -n_out, z_start], '>', np.zeros(num_rows), block_columns)
+    add_rows(problem, sizes, [None, n_in - n_out, z_start - z_end], '=', np.zeros(num_rows), block_columns)
+
+
+def build_flights_problem(network, demands_matrix, revenues_matrix, table_index, costs, plane_capacity=211,
+                          shared_legs=False, prune=False):
+    """
+    Returns the model of build_flights_model in matrix form, independent of the solver.
+
+    Takes the same inputs. The variables are one vector: X, then n (both flattened arc by arc,
+    arc * num_days + day, with arcs indexed by network['arc_id']), then Z (city * (num_days + 1) + day,
+    with cities in network['cities'] order). All are non-negative integers. The problem is a dict with
+    obj: objective coefficients (maximized)
+    rows: list of (A, sense, rhs), one per group of constraints, sense being '<', '=' or '>'
+    num_arcs, num_days, num_cities: to reshape the solution into X, n and Z
+
+    With shared_legs, n counts the flights of each physical leg (departure, arrival) instead of each arc:
+    every arc flying the leg shares its planes, so the capacity and profit constraints are by leg and day,
+    and every flight counts against the fleet. The fleet then differs from that of the model by arc, where
+    the flights of a layover arc "h*-j" (the second leg of a connection) use no plane, since a leg's planes
+    cannot be split between its layover and direct arcs: with shared legs Z counts more flights, and the
+    profits of the two options differ by this as well as by the shared planes. n is then flattened leg by
+    leg, and the problem also has legs: the (departure, arrival) of each leg, and num_legs.
+
+    With prune=True the variables that are zero because their origin-destination pairs have no demand that
+    day are left out as the constraints are assembled: the passengers of an arc carrying no demand
+    (model_tightening.compute_bounds), and its flights (or those of a leg none of whose arcs carry demand),
+    which would make a loss. So are the constraints left empty: the flow conservation of the supply nodes
+    with no demand, the layover constraints with no arriving passengers and the capacity and profit
+    constraints of the arcs. problem['columns'] then holds the position of every remaining variable in the
+    vector above, of length problem['num_vars'], so that solutions can be mapped back to every arc
+    (solver_backends.split_solution).
+    """
+    arc_id = network['arc_id']
+    cities = network['cities']
+    num_arcs = len(network['arc_set'])
+    num_days = len(demands_matrix)
+    days_eye = sp.identity(num_days, format='csr')
+
+    # Coefficients of the flight arcs
+    flight_ids = np.array([arc_id[arc] for arc in network['arc_leg']], dtype=np.int64)
+    ticket_price = np.array([revenues_matrix[table_index[depart]][table_index[arrive]]
+                             for (depart, arrive) in network['arc_leg'].values()], dtype=float)
+    flight_cost = costs.fuel[flight_ids] + costs.landing[flight_ids]  # per flight
+    aif = costs.aif[flight_ids]  # per passenger
+
+    # Columns of n: the flight arcs, or the legs they fly (flight_of maps the flight arcs to them)
+    if shared_legs:
+        legs = list(dict.fromkeys(network['arc_leg'].values()))
+        leg_id = {leg: k for k, leg in enumerate(legs)}
+        leg_of_flight = np.array([leg_id[leg] for leg in network['arc_leg'].values()], dtype=np.int64)
+        num_n_rows = len(legs)
+    else:
+        leg_of_flight = flight_ids
+        num_n_rows = num_arcs
+    flight_of = sp.csr_matrix((np.ones(len(flight_ids)), (leg_of_flight, flight_ids)), shape=(num_n_rows, num_arcs))
+    n_cost = np.zeros(num_n_rows)
+    n_cost[leg_of_flight] = flight_cost  # the same for every arc of a leg
+
+    num_x = num_arcs * num_days
+    num_n = num_n_rows * num_days
+    num_z = len(cities) * (num_days + 1)
+
+    block_columns = None  # the columns kept of X, n and Z
+    if prune:
+        x_keep = compute_bounds(network, demands_matrix, table_index, plane_capacity)[0] > 0
+        n_keep = flight_of @ x_keep.astype(float) > 0  # a flight arc (or leg) with an arc carrying demand
+        block_columns = (np.flatnonzero(x_keep.reshape(-1)), np.flatnonzero(n_keep.reshape(-1)), None)
+
+    # Objective
+    x_obj = np.zeros((num_arcs, num_days))
+    x_obj[flight_ids, :] = (ticket_price - aif)[:, None]
+    n_obj = np.repeat(-n_cost, num_days)
+    obj = np.concatenate([x_obj.reshape(-1), n_obj, np.zeros(num_z)])
+    problem = {'obj': obj, 'rows': [], 'num_arcs': num_arcs, 'num_days': num_days, 'num_cities': len(cities)}
+    if prune:
+        columns = np.concatenate([block_columns[0], num_x + block_columns[1], num_x + num_n + np.arange(num_z)])
+        problem.update(obj=obj[columns], columns=columns, num_vars=len(obj))
+    if shared_legs:
+        problem['legs'] = legs
+        problem['num_legs'] = len(legs)
+
+    node_arc, layover, fleet_out, fleet_in = build_incidence_matrices(network)
+    if shared_legs:  # every flight of a leg uses a plane
+        city_id = {c: k for k, c in enumerate(cities)}
+        ones = np.ones(len(legs))
+        fleet_out = sp.csr_matrix((ones, ([city_id[depart] for depart, arrive in legs], np.arange(len(legs)))),
+                                  shape=(len(cities), len(legs)))
+        fleet_in = sp.csr_matrix((ones, ([city_id[arrive] for depart, arrive in legs], np.arange(len(legs)))),
+                                 shape=(len(cities), len(legs)))
+    else:
+        fleet_out = fleet_out @ flight_of.T
+        fleet_in = fleet_in @ flight_of.T
+
+    sizes = (num_x, num_n, num_z)
+
+    # Flow conservation constraints - supply nodes send their demand, the sink receives the day's total
+    demands = np.asarray(demands_matrix)  # no copy for memory-mapped demands
+    node_demand = np.zeros((len(network['node_set']), num_days))
+    for k, v in enumerate(network['node_set']):
+        if v == 't':
+            node_demand[k, :] = demands.sum(axis=(1, 2))
+        elif v in network['supply_nodes']:
+            depart, arrive = network['supply_nodes'][v]
+            node_demand[k, :] = -demands[:, table_index[depart], table_index[arrive]]
+    add_rows(problem, sizes, [sp.kron(node_arc, days_eye, format='csr'), None, None], '=', node_demand.reshape(-1),
+             block_columns)
+
+    # Flow conservation - ensure those on layovers make their destination
+    if layover.shape[0] > 0:
+        add_rows(problem, sizes, [sp.kron(layover, days_eye, format='csr'), None, None], '=',
+                 np.zeros(layover.shape[0] * num_days), block_columns)
+
+    # Capacity and profit constraints on the flight arcs (or legs), every day
+    flights_with_arcs = np.unique(leg_of_flight)
+    n_select = sp.kron(sp.identity(num_n_rows, format='csr')[flights_with_arcs], days_eye, format='csr')
+    x_select = sp.kron(flight_of[flights_with_arcs], days_eye, format='csr')
+    x_value = sp.csr_matrix((ticket_price - aif, (leg_of_flight, flight_ids)), shape=(num_n_rows, num_arcs))
+    num_rows = n_select.shape[0]
+    add_rows(problem, sizes, [x_select, -plane_capacity * n_select, None], '<', np.zeros(num_rows), block_columns)
+    add_rows(problem, sizes, [-sp.kron(x_value[flights_with_arcs], days_eye, format='csr'),
+                              sp.diags(np.repeat(n_cost[flights_with_arcs], num_days)) @ n_select, None], '<',
+             np.zeros(num_rows), block_columns)
+
+    # Enough planes - Z[c, day] covers the departures, and Z[c, day + 1] is what is left plus arrivals
+    add_fleet_rows(problem, sizes, fleet_out, fleet_in, num_days, block_columns)
+
+    return problem
+
+
+def build_gurobi_model(problem):
+    """
+    Returns a Gurobi model of a problem from build_flights_problem and the MVar of all its variables.
+
+    Variables and constraints are left unnamed, since generating the names costs as much as the build.
+    """
+    model = gp.Model("Passenger_Demands")
+    all_vars = model.addMVar(len(problem['obj']), vtype=GRB.INTEGER, lb=0)
+    model.setObjective(problem['obj'] @ all_vars, GRB.MAXIMIZE)
+    for A, sense, rhs in problem['rows']:
+        model.addMConstr(A, all_vars, sense, rhs)
+    return model, all_vars
+
+
+def build_flights_model_matrix(network, demands_matrix, revenues_matrix, table_index, costs, plane_capacity=211):
+    """
+    Builds the same model as build_flights_model, adding every group of constraints with one sparse matrix.
+
+    Takes the same inputs. Returns the model and the MVars X, n of shape (arcs, days), indexed by
+    network['arc_id'], and Z of shape (cities, days + 1), indexed by position in network['cities'].
+    """
+    problem = build_flights_problem(network, demands_matrix, revenues_matrix, table_index, costs, plane_capacity)
+    model, all_vars = build_gurobi_model(problem)
+    num_arcs, num_days = problem['num_arcs'], problem['num_days']
+    num_x = num_arcs * num_days
+    X = all_vars[:num_x].reshape(num_arcs, num_days)
+    n = all_vars[num_x:2 * num_x].reshape(num_arcs, num_days)
+    Z = all_vars[2 * num_x:].reshape(problem['num_cities'], num_days + 1)
+    return model, X, n, Z
@@ -0,0 +1,325 @@
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import socket
+import threading
+import time
+
+'''
+# Job server
+# A long-lived process taking planning runs (a demands file, a ticket revenues file and cost changes)
+# over a Unix socket. Jobs are queued and solved by a pool of worker processes, at most one job per
+# worker at a time. Each worker keeps the network, the cost tables, the files it has parsed and its last
+# model between jobs, so a job only pays for what changed. Every request and reply is one line of JSON:
+#   {"op": "submit", "job": {"demands": "demands.txt", "revenues": "ticket_revenues.txt", ...}} -> {"id": ...}
+#   {"op": "status", "id": ...}, {"op": "cancel", "id": ...}, {"op": "result", "id": ..., "wait": true}
+# A job's optional keys are fuel_prices, landing_fees, aif_rates (entries replacing those of the base
+# tables), plane_capacity, time_budget and target_gap (see anytime_solve.solve_anytime).
+'''
+
+job_keys = {'demands', 'revenues', 'fuel_prices', 'landing_fees', 'aif_rates', 'plane_capacity', 'time_budget',
+            'target_gap'}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+_worker = {}  # state of the current worker process
+
+
+def _init_worker(base, threads):
+    """
+    Builds the network and cost tables of the base instance in the worker.
+    """
+    from network import build_network
+    from cost_tables import CostTables
+
+    network = build_network(base['airports'], base['hubs'], base['distances'])
+    tables = {name: dict(base[name]) for name in ('fuel_prices', 'landing_fees', 'aif_rates')}
+    _worker.update(base=base, threads=threads, network=network, files={}, model=None, model_key=None,
+                   costs=CostTables(network, base['distances'], tables['fuel_prices'], tables['landing_fees'],
+                                    tables['aif_rates'], base['city_names']))
+
+
+def _load(path, parse):
+    """
+    Returns the contents of a data file, parsed again only when the file changed.
+    """
+    stamp = os.stat(path).st_mtime_ns
+    if path not in _worker['files'] or _worker['files'][path][0] != stamp:
+        _worker['files'][path] = (stamp, parse(path))
+    return _worker['files'][path][1]
+
+
+def _run_job(spec, cancel):
+    """
+    Solves one job in the worker and returns its result. cancel is a Manager Event set to stop the solve.
+    """
+    from data_loading import load_demands, load_revenues
+    from flights_model import build_flights_model
+    from anytime_solve import solve_anytime
+    from solution_export import solution_arrays, solution_table
+
+    start = time.perf_counter()
+    base = _worker['base']
+    network = _worker['network']
+    costs = _worker['costs']
+    num_cities = len(base['table_index'])
+    airports = sorted(base['table_index'], key=base['table_index'].get)
+    demands_matrix = _load(spec['demands'], lambda path: load_demands(path, num_cities, airports)[0])
+    revenues_matrix = _load(spec['revenues'], lambda path: load_revenues(path, num_cities, airports))
+
+    # Base costs with the job's changes, then the arcs whose costs changed
+    for name, table in costs.tables.items():
+        table.clear()
+        table.update(base[name])
+        table.update(spec.get(name, {}))
+    costs.refresh()
+
+    # The last model is solved again when nothing changed, otherwise a new one is built
+    plane_capacity = spec.get('plane_capacity', 211)
+    model_key = json.dumps([spec['demands'], _worker['files'][spec['demands']][0], spec['revenues'],
+                            _worker['files'][spec['revenues']][0], plane_capacity,
+                            [costs.tables[name] for name in sorted(costs.tables)]], sort_keys=True)
+    if _worker['model_key'] != model_key:
+        if _worker['model'] is not None:
+            _worker['model'][0].dispose()
+        # Forget the disposed model first, so that a failed build leaves no model to reuse
+        _worker['model'] = _worker['model_key'] = None
+        built = build_flights_model(network, demands_matrix, revenues_matrix, base['table_index'], costs,
+                                    plane_capacity)
+        built[0].Params.OutputFlag = 0
+        built[0].Params.Threads = _worker['threads']
+        _worker['model'], _worker['model_key'] = built, model_key
+    model, X, n, Z = _worker['model']
+    build_time = time.perf_counter() - start
+
+    # The manager's event is polled from a thread, not from the Gurobi callback
+    local_cancel = threading.Event()
+    done = threading.Event()
+
+    def watch():
+        while not done.is_set():
+            if cancel.wait(0.1):
+                local_cancel.set()
+                return
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        result = solve_anytime(model, spec.get('time_budget'), spec.get('target_gap'), cancel=local_cancel)
+    finally:
+        done.set()
+        watcher.join()
+
+    flown = None
+    if result['values'] is not None:
+        passengers, flights = solution_arrays(X, n, network, len(demands_matrix), result['values'])
+        table = solution_table(network, passengers, flights, revenues_matrix, base['table_index'], costs)
+        flown = {name: column.tolist() for name, column in table.items()}
+    return {'status': result['status'], 'profit': result['objective'], 'bound': result['bound'],
+            'gap': result['gap'], 'flown': flown, 'build_time': build_time, 'solve_time': result['runtime'],
+            'worker': os.getpid()}
+
+
+class JobServer:
+    """
+    Queues jobs and runs them on num_workers worker processes.
+
+    base is the instance every job starts from, with the keys of synthetic_instances.generate_instance
+    (airports, hubs, distances, fuel_prices, landing_fees, aif_rates, city_names, table_index). At most
+    keep_finished finished jobs are kept, the oldest being forgotten first.
+    """
+
+    def __init__(self, base, num_workers=2, threads_per_worker=1, keep_finished=1000):
+        self.base = base
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.keep_finished = keep_finished
+        self.jobs = {}
+        self.ids = itertools.count(1)
+
+    async def start(self):
+        # Gurobi environments cannot be shared with forked processes, so the workers are spawned
+        ctx = mp.get_context("spawn")
+        self.manager = ctx.Manager()
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.num_workers, mp_context=ctx, initializer=_init_worker,
+                                                           initargs=(self.base, self.threads_per_worker))
+        self.queue = asyncio.Queue()
+        self.runners = [asyncio.create_task(self.run_jobs()) for _ in range(self.num_workers)]
+
+    async def stop(self):
+        for runner in self.runners:
+            runner.cancel()
+        for job in self.jobs.values():
+            if job['state'] == 'running':
+                job['cancel'].set()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.manager.shutdown()
+
+    def submit(self, spec):
+        """
+        Queues a job and returns its id.
+        """
+        if not isinstance(spec, dict):
+            raise ValueError(f"a job is a JSON object, not {type(spec).__name__}")
+        unknown = set(spec) - job_keys
+        if unknown:
+            raise ValueError(f"unknown job keys {sorted(unknown)}, expected some of {sorted(job_keys)}")
+        for key in ('demands', 'revenues'):
+            if key not in spec:
+                raise ValueError(f"the job has no {key!r} file")
+            if not isinstance(spec[key], str) or not os.path.exists(spec[key]):
+                raise ValueError(f"no such file: {spec[key]!r}")
+        if 'plane_capacity' in spec and not (_is_number(spec['plane_capacity']) and spec['plane_capacity'] > 0):
+            raise ValueError(f"plane_capacity must be a positive number, not {spec['plane_capacity']!r}")
+        for key in ('time_budget', 'target_gap'):
+            if spec.get(key) is not None and not (_is_number(spec[key]) and spec[key] >= 0):
+                raise ValueError(f"{key} must be a non-negative number, not {spec[key]!r}")
+        for name in ('fuel_prices', 'landing_fees', 'aif_rates'):
+            entries = spec.get(name, {})
+            if not isinstance(entries, dict):
+                raise ValueError(f"{name} must be an object of entries, not {type(entries).__name__}")
+            for entry, value in entries.items():
+                if entry not in self.base[name]:
+                    raise ValueError(f"unknown {name} entry {entry!r}, expected some of {sorted(self.base[name])}")
+                if not (_is_number(value) and value >= 0):
+                    raise ValueError(f"the {name} entry {entry!r} must be a non-negative number, not {value!r}")
+        job_id = str(next(self.ids))
+        self.jobs[job_id] = {'state': 'queued', 'spec': spec, 'result': None, 'error': None,
+                             'submitted': time.time(), 'started': None, 'finished': None,
+                             'cancel': self.manager.Event(), 'done': asyncio.Event()}
+        self.queue.put_nowait(job_id)
+        return job_id
+
+    def job(self, job_id):
+        if not isinstance(job_id, str) or job_id not in self.jobs:
+            raise ValueError(f"unknown job {job_id!r}")
+        return self.jobs[job_id]
+
+    def status(self, job_id):
+        """
+        Returns the state of a job (queued, running, done, failed or cancelled) and its times.
+        """
+        job = self.job(job_id)
+        return {'id': job_id, 'state': job['state'], 'submitted': job['submitted'], 'started': job['started'],
+                'finished': job['finished']}
+
+    def cancel(self, job_id):
+        """
+        Cancels a job: a queued job never runs, a running job stops with the best plan found so far.
+        """
+        job = self.job(job_id)
+        if job['state'] == 'queued':
+            self.finish(job_id, 'cancelled')
+        elif job['state'] == 'running':
+            job['cancel'].set()
+        return self.status(job_id)
+
+    async def result(self, job_id, wait=False):
+        """
+        Returns the status of a job with its result (None until it is finished) and error message.
+        """
+        job = self.job(job_id)
+        if wait:
+            await job['done'].wait()
+        return dict(self.status(job_id), result=job['result'], error=job['error'])
+
+    def finish(self, job_id, state, result=None, error=None):
+        job = self.jobs[job_id]
+        job.update(state=state, result=result, error=error, finished=time.time())
+        job['done'].set()
+        finished = [k for k, j in self.jobs.items() if j['finished'] is not None]
+        for old_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[old_id]
+
+    async def run_jobs(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id = await self.queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job['state'] != 'queued':  # cancelled while queued
+                continue
+            job.update(state='running', started=time.time())
+            try:
+                result = await loop.run_in_executor(self.pool, _run_job, job['spec'], job['cancel'])
+            except Exception as error:
+                self.finish(job_id, 'failed', error=f"{type(error).__name__}: {error}")
+            else:
+                self.finish(job_id, 'cancelled' if result['status'] == 'cancelled' else 'done', result)
+
+    async def handle(self, message):
+        """
+        Returns the reply to one request.
+        """
+        try:
+            if not isinstance(message, dict):
+                raise ValueError(f"a request is a JSON object, not {type(message).__name__}")
+            op = message.get('op')
+            if op == 'submit':
+                return {'ok': True, 'id': self.submit(message.get('job', {}))}
+            if op == 'status':
+                return dict(self.status(message.get('id')), ok=True)
+            if op == 'cancel':
+                return dict(self.cancel(message.get('id')), ok=True)
+            if op == 'result':
+                return dict(await self.result(message.get('id'), message.get('wait', False)), ok=True)
+            raise ValueError(f"unknown op {op!r}, expected submit, status, cancel or result")
+        except ValueError as error:
+            return {'ok': False, 'error': str(error)}
+
+    async def serve_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    reply = await self.handle(json.loads(line))
+                except json.JSONDecodeError as error:
+                    reply = {'ok': False, 'error': f"invalid JSON: {error}"}
+                writer.write((json.dumps(reply) + "\n").encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path):
+        """
+        Serves requests on a Unix socket until cancelled.
+        """
+        await self.start()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(self.serve_client, path=socket_path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+def request(socket_path, message):
+    """
+    Sends one request to a job server and returns its reply (a blocking client, e.g. for scripts).
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile("rw") as stream:
+            stream.write(json.dumps(message) + "\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+if __name__ == "__main__":
+    import base_tables
+
+    base = {name: getattr(base_tables, name) for name in ('airports', 'hubs', 'distances', 'fuel_prices',
+                                                          'landing_fees', 'aif_rates', 'city_names', 'table_index')}
+    socket_path = "job_server.sock"
+    print(f"Serving on {socket_path}")
+    try:
+        asyncio.run(JobServer(base).serve(socket_path))
+    except KeyboardInterrupt:
+        pass
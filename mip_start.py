@@ -0,0 +1,130 @@
+import numpy as np
+
+'''
+# Greedy MIP start for the flights model
+# Every origin-destination demand is routed whole on its most profitable itinerary (the direct arc or one
+# of its hubs, valuing each leg at its ticket price less the AIF and the cost of a full plane per
+# passenger), or left unserved if none makes a profit. Flights are ceil(passengers / plane capacity).
+# Loads that would break a profit constraint (a plane flying mostly empty) are cut to full planes or to
+# zero, and the planes at each airport on the first day are the fewest that let every day's flights leave.
+'''
+
+def greedy_solution(network, demands_matrix, revenues_matrix, table_index, costs, plane_capacity=211):
+    """
+    Returns a feasible solution of build_flights_model: a dict with its profit and the arrays X, n
+    (arcs, days), indexed by network['arc_id'], and Z (cities, days + 1) in network['cities'] order.
+    """
+    arc_id = network['arc_id']
+    cities = network['cities']
+    demands = np.asarray(demands_matrix, dtype=float)
+    num_days = demands.shape[0]
+    num_arcs = len(network['arc_set'])
+
+    # Per passenger and per flight value of every flight arc
+    value = np.zeros(num_arcs)
+    flight_cost = costs.fuel + costs.landing
+    for arc, (depart, arrive) in network['arc_leg'].items():
+        k = arc_id[arc]
+        value[k] = revenues_matrix[table_index[depart]][table_index[arrive]] - costs.aif[k]
+    margin = value - flight_cost / plane_capacity  # per passenger on a full plane
+
+    # Route each demand on its best itinerary: the arc out of the supply node, and the layover arc after a hub
+    x = np.zeros((num_arcs, num_days))
+    first_legs = {}  # layover arc -> arriving arcs used
+    for v, (i, j) in network['supply_nodes'].items():
+        best_arcs, best_margin = None, 0
+        for arc in network['out_arcs'][v]:
+            head = arc.split("-")[1]
+            if head == 't':
+                continue
+            arcs = [arc] if head == j else [arc, head + '-' + j]  # direct, or through the hub head = "h*"
+            itinerary_margin = sum(margin[arc_id[a]] for a in arcs)
+            if itinerary_margin > best_margin:
+                best_arcs, best_margin = arcs, itinerary_margin
+        if best_arcs is None:
+            continue
+        demand = demands[:, table_index[i], table_index[j]]
+        for a in best_arcs:
+            x[arc_id[a]] += demand
+        if len(best_arcs) == 2:
+            first_legs.setdefault(best_arcs[1], []).append(arc_id[best_arcs[0]])
+
+    def unprofitable(k):
+        # Days on which the arc breaks its profit constraint with ceil(x / capacity) flights
+        return value[k] * x[k] < flight_cost[k] * np.ceil(x[k] / plane_capacity) - 1e-6
+
+    def full_planes(k, load):
+        # The largest load up to `load` flown on full planes at a profit, 0 if a full plane makes a loss
+        if value[k] * plane_capacity < flight_cost[k]:
+            return np.zeros_like(load)
+        return np.floor(load / plane_capacity) * plane_capacity
+
+    # Cut the loads breaking a profit constraint, until none does (loads only go down)
+    layover_ids = {arc_id[arc]: arc for arc in network['layover_arcs']}
+    first_leg_of = {k: arc_id[layover_arc] for layover_arc, arcs in first_legs.items() for k in arcs}
+    flight_ids = [arc_id[arc] for arc in network['arc_leg']]
+    changed = True
+    while changed:
+        changed = False
+        for k in flight_ids:
+            days = np.flatnonzero(unprofitable(k))
+            if len(days) == 0:
+                continue
+            changed = True
+            cut = x[k, days] - full_planes(k, x[k, days])
+            if k in layover_ids:  # take the passengers off the smallest first legs
+                for day_num, amount in zip(days, cut):
+                    for first in sorted(first_legs[layover_ids[k]], key=lambda a: x[a, day_num]):
+                        taken = min(amount, x[first, day_num])
+                        x[first, day_num] -= taken
+                        x[k, day_num] -= taken
+                        amount -= taken
+            else:
+                x[k, days] -= cut
+                if k in first_leg_of:
+                    x[first_leg_of[k], days] -= cut
+
+    # Sink arcs: unserved passengers from each supply node, and every arrival at each airport
+    for v, (i, j) in network['supply_nodes'].items():
+        served = sum(x[arc_id[arc]] for arc in network['out_arcs'][v] if not arc.endswith('-t'))
+        x[arc_id[v + '-t']] = demands[:, table_index[i], table_index[j]] - served
+    for c in cities:
+        x[arc_id[c + '-t']] = sum(x[arc_id[arc]] for arc in network['in_arcs'][c])
+
+    n = np.zeros_like(x)
+    n[flight_ids] = np.ceil(x[flight_ids] / plane_capacity)
+
+    # Planes: start each airport with the fewest planes that cover every day's departures
+    city_id = {c: k for k, c in enumerate(cities)}
+    out_flights = np.zeros((len(cities), num_days))
+    in_flights = np.zeros((len(cities), num_days))
+    for arc, (depart, arrive) in network['arc_leg'].items():
+        if arc in network['layover_arcs']:
+            continue  # not counted against the fleet
+        out_flights[city_id[depart]] += n[arc_id[arc]]
+        in_flights[city_id[arrive]] += n[arc_id[arc]]
+    before_day = np.concatenate([np.zeros((len(cities), 1)), np.cumsum(in_flights - out_flights, axis=1)], axis=1)
+    first_day = np.maximum((out_flights - before_day[:, :num_days]).max(axis=1), 0)
+    z = first_day[:, None] + before_day
+
+    profit = float((value[flight_ids, None] * x[flight_ids]).sum() - (flight_cost[flight_ids, None] * n[flight_ids]).sum())
+    return {'profit': profit, 'X': x, 'n': n, 'Z': z}
+
+
+def set_start(model, X, n, Z, network, solution):
+    """
+    Sets a solution from greedy_solution as the MIP start (Start attributes) of a model of build_flights_model
+    (tupledicts, pruned or not) or build_flights_model_matrix (MVars).
+    """
+    if hasattr(X, 'shape'):  # MVars
+        X.Start = solution['X']
+        n.Start = solution['n']
+        Z.Start = solution['Z']
+        return
+    num_days = solution['X'].shape[1]
+    arc_id = network['arc_id']
+    for variables, values in ((X, solution['X']), (n, solution['n'])):
+        model.setAttr("Start", list(variables.values()),
+                      [float(values[arc_id[arc], day_num]) for arc, day_num in variables])
+    z_keys = [(c, day_num) for c in network['cities'] for day_num in range(num_days + 1)]
+    model.setAttr("Start", [Z[key] for key in z_keys], solution['Z'].reshape(-1).tolist())
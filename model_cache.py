@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+from gurobipy import GRB
+
+from solve_instrumentation import instrumented_optimize
+
+'''
+# On-disk cache of the optimal solutions of models
+# Entries are keyed by a hash of every input of the model: the network, the demands, the ticket
+# revenues, the fuel/landing/AIF coefficients and the plane capacity, so that a hit needs neither the
+# model nor its build. Each entry holds the optimal solution of the model (<key>.sol) and a small
+# summary of its inputs (<key>.npy) used to find the nearest cached solution of a model with the same
+# variables, which is given to the solver as a MIP start. The least recently used entries are removed
+# when the cache is too large.
+'''
+
+def input_key(formulation, network, demands_matrix, revenues_matrix, costs, plane_capacity):
+    """
+    Returns the cache key of a model, the key of its structure (models with the same structure have the
+    same variables) and the summary of its inputs.
+
+    formulation names the model builder, so that different models of the same inputs get different keys.
+    """
+    structure = hashlib.sha256()
+    structure.update(json.dumps([formulation, network['arc_set'], network['cities'], len(demands_matrix)]).encode())
+
+    key = structure.copy()
+    key.update(json.dumps(plane_capacity).encode())
+    total_demands = 0
+    for day_demands_matrix in demands_matrix:  # one day at a time, for memory-mapped demands
+        day_demands = np.asarray(day_demands_matrix, dtype=np.int64)
+        key.update(day_demands.tobytes())
+        total_demands = total_demands + day_demands
+    revenues = np.asarray(revenues_matrix, dtype=np.float64)
+    for array in (revenues, costs.fuel, costs.landing, costs.aif):
+        key.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+
+    signature = np.concatenate([np.ravel(total_demands), revenues.ravel(), costs.fuel, costs.landing, costs.aif])
+    return key.hexdigest(), structure.hexdigest(), signature
+
+
+class ModelCache:
+    """
+    Optimal solutions of models stored in cache_dir, at most max_bytes in total.
+
+    The index (index.json) records the structure, profit, size and last use of every entry.
+    """
+
+    def __init__(self, cache_dir=".model_cache", max_bytes=512 * 2**20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r") as f:
+                self.index = json.load(f)
+
+    def path(self, key, extension):
+        return os.path.join(self.cache_dir, key + extension)
+
+    def save_index(self):
+        temp_path = self.index_path + f".{os.getpid()}"
+        with open(temp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(temp_path, self.index_path)  # readers never see a partly written index
+
+    def lookup(self, key):
+        """
+        Returns the index entry of the key (marking it as used), or None if it is not cached.
+        """
+        entry = self.index.get(key)
+        if entry is None or not os.path.exists(self.path(key, ".sol")):
+            return None
+        entry["last_used"] = time.time()
+        self.save_index()
+        return entry
+
+    def read_solution(self, key):
+        """
+        Returns the cached solution of the key by variable name.
+        """
+        values = {}
+        with open(self.path(key, ".sol"), "r") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                name, value = line.rsplit(None, 1)
+                values[name] = float(value)
+        return values
+
+    def nearest(self, structure, signature):
+        """
+        Returns the key of the cached model with the same structure whose inputs are closest, or None.
+        """
+        best_key, best_distance = None, float('inf')
+        for key, entry in self.index.items():
+            if entry["structure"] != structure or not os.path.exists(self.path(key, ".npy")):
+                continue
+            distance = np.abs(np.load(self.path(key, ".npy")) - signature).sum()
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key
+
+    def store(self, key, structure, signature, model):
+        """
+        Writes the solution of the model, then evicts the least recently used entries over max_bytes.
+        """
+        model.write(self.path(key, ".sol"))
+        np.save(self.path(key, ".npy"), signature)
+        size = sum(os.path.getsize(self.path(key, extension)) for extension in (".sol", ".npy"))
+        self.index[key] = {"structure": structure, "profit": model.ObjVal, "bytes": size, "last_used": time.time()}
+
+        total = sum(entry["bytes"] for entry in self.index.values())
+        for old_key in sorted(self.index, key=lambda k: self.index[k]["last_used"]):
+            if total <= self.max_bytes or old_key == key:
+                break
+            total -= self.index.pop(old_key)["bytes"]
+            for extension in (".mps", ".sol", ".npy"):  # .mps: the models written by earlier versions
+                if os.path.exists(self.path(old_key, extension)):
+                    os.remove(self.path(old_key, extension))
+        self.save_index()
+
+
+def solve_cached(build, key, structure, signature, cache, recorder=None):
+    """
+    Returns the profit of a model, the values of its variables by name and whether they came from the cache.
+
+    build returns the model, and is only called on a miss: on a hit the model is neither built nor
+    solved. On a miss the nearest cached solution with the same structure is used as a MIP start, and
+    the optimal solution is added to the cache. The profit is None (and the values None) when the model
+    has no solution. A recorder (solve_instrumentation.SolveRecorder) records the solve, or the cache hit.
+    """
+    entry = cache.lookup(key)
+    if entry is not None:
+        if recorder is not None:
+            recorder.emit('cache_hit', key=key, objective=entry["profit"])
+        return entry["profit"], cache.read_solution(key), True
+
+    model = build()
+    near_key = cache.nearest(structure, signature)
+    if near_key is not None:
+        model.read(cache.path(near_key, ".sol"))  # sets the Start of the variables
+    instrumented_optimize(model, recorder)
+    if model.SolCount == 0:
+        return None, None, False
+    if model.Status == GRB.OPTIMAL:
+        cache.store(key, structure, signature, model)
+    all_vars = model.getVars()
+    return model.ObjVal, dict(zip(model.getAttr("VarName", all_vars), model.getAttr("X", all_vars))), False
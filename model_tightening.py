@@ -0,0 +1,129 @@
+import math
+
+import numpy as np
+
+'''
+# Bounds from the demands and tightening of the flights model
+# Passengers on an arc can never exceed the demand of the origin-destination pairs using it, flights
+# on an arc are at most that demand over the plane capacity (rounded up), and the planes at an airport
+# at most the flights that ever leave it plus those that arrived before the day. When an arc's demand
+# is below the plane capacity, its capacity constraint X <= capacity * n is also tightened to
+# X <= demand * n, which is what strengthens the LP relaxation.
+'''
+
+def compute_bounds(network, demands_matrix, table_index, plane_capacity=211):
+    """
+    Returns the upper bounds of X and n, arrays (arcs, days) indexed by network['arc_id'], and of Z,
+    an array (cities, days + 1) in network['cities'] order.
+    """
+    arc_id = network['arc_id']
+    cities = network['cities']
+    demands = np.asarray(demands_matrix, dtype=float)
+    num_days = demands.shape[0]
+    x_ub = np.zeros((len(network['arc_set']), num_days))
+
+    for arc, k in arc_id.items():
+        tail, head = arc.split("-")
+        if tail in network['supply_nodes']:  # "ij-j", "ij-h*" and "ij-t" carry passengers from i to j
+            i, j = network['supply_nodes'][tail]
+            x_ub[k] = demands[:, table_index[i], table_index[j]]
+        elif head == 't':  # "i-t": passengers arriving at i
+            x_ub[k] = demands[:, :, table_index[tail]].sum(axis=1)
+    for layover_arc, arriving_arcs in network['layover_arcs'].items():  # "h*-j": passengers connecting at h
+        x_ub[arc_id[layover_arc]] = sum(x_ub[arc_id[arc]] for arc in arriving_arcs)
+
+    n_ub = np.zeros_like(x_ub)
+    flight_ids = np.array([arc_id[arc] for arc in network['arc_leg']], dtype=np.int64)
+    n_ub[flight_ids] = np.ceil(x_ub[flight_ids] / plane_capacity)
+
+    # Planes are free, so some optimal plan starts with the smallest fleet that flies it: at most the flights
+    # ever leaving the airport, plus the flights that arrived before the day
+    city_id = {c: k for k, c in enumerate(cities)}
+    out_flights = np.zeros((len(cities), num_days))
+    in_flights = np.zeros((len(cities), num_days))
+    for arc, (depart, arrive) in network['arc_leg'].items():
+        if arc in network['layover_arcs']:
+            continue  # not counted against the fleet
+        out_flights[city_id[depart]] += n_ub[arc_id[arc]]
+        in_flights[city_id[arrive]] += n_ub[arc_id[arc]]
+    z_ub = out_flights.sum(axis=1)[:, None] + np.concatenate([np.zeros((len(cities), 1)),
+                                                             np.cumsum(in_flights, axis=1)], axis=1)
+    return x_ub, n_ub, z_ub
+
+
+def tighten_model(model, X, n, Z, network, demands_matrix, table_index, plane_capacity=211):
+    """
+    Applies the bounds of compute_bounds to a model of build_flights_model (pruned or not) and tightens its
+    capacity constraints. Returns the number of capacity constraints tightened.
+    """
+    x_ub, n_ub, z_ub = compute_bounds(network, demands_matrix, table_index, plane_capacity)
+    arc_id = network['arc_id']
+    num_days = x_ub.shape[1]
+    for variables, ub in ((X, x_ub), (n, n_ub)):
+        model.setAttr("UB", list(variables.values()), [float(ub[arc_id[arc], day_num]) for arc, day_num in variables])
+    z_keys = [(c, day_num) for c in network['cities'] for day_num in range(num_days + 1)]
+    model.setAttr("UB", [Z[key] for key in z_keys], z_ub.reshape(-1).tolist())
+
+    model.update()
+    capacity_constrs = {}
+    for constr in model.getConstrs():
+        name = constr.ConstrName
+        if name.startswith("capacity_"):
+            arc, day_num = name[len("capacity_"):].rsplit("_", 1)
+            capacity_constrs[arc, int(day_num)] = constr
+
+    num_tightened = 0
+    for arc in network['arc_leg']:
+        k = network['arc_id'][arc]
+        for day_num in range(num_days):
+            if x_ub[k, day_num] < plane_capacity and (arc, day_num) in capacity_constrs:
+                model.chgCoeff(capacity_constrs[arc, day_num], n[arc, day_num], -math.ceil(x_ub[k, day_num]))
+                num_tightened += 1
+    return num_tightened
+
+
+if __name__ == "__main__":
+    import time
+
+    from network import build_network
+    from cost_tables import CostTables
+    from flights_model import build_flights_model
+    from synthetic_instances import generate_instance
+
+    def lp_bound_and_solve(model):
+        model.update()
+        relaxed = model.relax()
+        relaxed.Params.OutputFlag = 0
+        relaxed.optimize()
+        lp_bound = relaxed.ObjVal
+        relaxed.dispose()
+        start = time.perf_counter()
+        model.optimize()
+        return lp_bound, model.ObjVal, time.perf_counter() - start
+
+    print(f"{'instance':>16} {'tightened':>9} {'LP bound':>13} {'LP tight':>13} {'MIP':>13} "
+          f"{'LP gap':>9} {'tight gap':>9} {'solve (s)':>9} {'tight (s)':>9}")
+    for num_airports, num_days, seed in [(5, 5, 0), (5, 5, 1), (6, 3, 0), (4, 10, 0)]:
+        instance = generate_instance(num_airports, 1, num_days, seed=seed)
+        network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+        costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                           instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+        data = (network, instance['demands_matrix'], instance['revenues_matrix'], instance['table_index'], costs)
+
+        model = build_flights_model(*data)[0]
+        model.Params.OutputFlag = 0
+        lp_bound, profit, solve_time = lp_bound_and_solve(model)
+        model.dispose()
+
+        model, X, n, Z = build_flights_model(*data)
+        model.Params.OutputFlag = 0
+        num_tightened = tighten_model(model, X, n, Z, network, instance['demands_matrix'], instance['table_index'])
+        tight_bound, tight_profit, tight_time = lp_bound_and_solve(model)
+        model.dispose()
+        if abs(tight_profit - profit) > 1e-6 * abs(profit):
+            raise ValueError(f"the tightened model has a different optimum: {tight_profit} vs {profit}")
+
+        name = f"{num_airports}x{num_days} seed {seed}"
+        print(f"{name:>16} {num_tightened:>9} {lp_bound:>13.1f} {tight_bound:>13.1f} {profit:>13.1f} "
+              f"{(lp_bound - profit) / profit:>8.2%} {(tight_bound - profit) / profit:>8.2%} "
+              f"{solve_time:>9.3f} {tight_time:>9.3f}")
@@ -0,0 +1,155 @@
+'''
+# Building the digraph
+'''
+
+def build_digraph():
+    """
+    Builds the arc and node sets of the V/W/T/M/H flight network.
+    """
+    cities = ['V', 'W', 'T', 'M', 'H']
+    arc_set = [] + ['T*-H', 'M*-H']  # form: each arc (i,j) is a string: "i-j"
+
+    for i in cities:
+        arc_set.append(i + '-' + 't')
+        for j in cities:
+            if i != j:
+                if i == 'T' or i == 'M':
+                    arc_set.append(i + j + '-' + j)
+                    arc_set.append(i + j + '-' + 't')
+                elif i == 'V' or i == 'W':
+                    if j == 'H':
+                        arc_set.append(i + j + '-' + 'T*')
+                        arc_set.append(i + j + '-' + 'M*')
+                        arc_set.append(i + j + '-' + 't')
+                    else:
+                        arc_set.append(i + j + '-' + j)
+                        arc_set.append(i + j + '-' + 't')
+                else: #i = 'H'
+                    if j == 'T' or j == 'M':
+                        arc_set.append('H' + j + '-' + j)
+                        arc_set.append(i + j + '-' + 't')
+                    elif j == 'W' or j == 'V':
+                        arc_set.append('H' + j + '-' + 'T*'), arc_set.append('T*' + '-' + j)
+                        arc_set.append('H' + j + '-' + 'M*'), arc_set.append('M*' + '-' + j)
+                        arc_set.append(i + j + '-' + 't')
+
+    node_set = cities.copy() + ['T*', 'M*', 't']
+    for i in cities:
+        for j in cities:
+            if i != j:
+                node_set.append(i + j)
+
+    return cities, arc_set, node_set
+
+
+def build_arc_index(arc_set, node_set):
+    """
+    Returns the outgoing and incoming arcs of every node, computed in one pass over the arcs.
+    """
+    out_arcs = {v: [] for v in node_set}
+    in_arcs = {v: [] for v in node_set}
+    for arc in arc_set:
+        tail, head = arc.split("-")
+        out_arcs[tail].append(arc)
+        in_arcs[head].append(arc)
+    return out_arcs, in_arcs
+
+
+def build_network(airports, hubs, distances):
+    """
+    Builds the flight network for any list of airports.
+
+    Every ordered pair of airports (i, j) gets a supply node "ij" with an arc to the sink "t"
+    (passengers that are not flown). If the distances table has a route between i and j the pair
+    gets a direct arc "ij-j", otherwise it connects through every hub h with routes i-h and h-j
+    using the arcs "ij-h*" and "h*-j". Airport codes must all have the same length so that the
+    supply node names stay unique.
+    """
+    code_length = len(airports[0])
+    for city in airports:
+        if len(city) != code_length:
+            raise ValueError(f"Airport codes must all have the same length, got {city!r}")
+        if city == 't' or '*' in city or '-' in city:
+            raise ValueError(f"Invalid airport code {city!r}")
+    for h in hubs:
+        if h not in airports:
+            raise ValueError(f"Hub {h!r} is not in the list of airports")
+
+    # Routes that can be flown directly, in both directions
+    routes = set()
+    for (i, j) in distances:
+        routes.add((i, j))
+        routes.add((j, i))
+
+    layover_node = {h: h + '*' for h in hubs}
+    node_set = list(airports) + [layover_node[h] for h in hubs] + ['t']
+    arc_set = []
+    supply_nodes = {}   # supply node -> (origin, destination)
+    arc_leg = {}        # arc -> (departure city, arrival city) of the flight it uses, sink arcs excluded
+    layover_arcs = {}   # layover arc "h*-j" -> arcs "ij-h*" bringing passengers for j into h
+
+    for i in airports:
+        arc_set.append(i + '-' + 't')
+        for j in airports:
+            if i == j:
+                continue
+            v = i + j
+            node_set.append(v)
+            supply_nodes[v] = (i, j)
+            if (i, j) in routes:
+                arc = v + '-' + j
+                arc_set.append(arc)
+                arc_leg[arc] = (i, j)
+            else:
+                for h in hubs:
+                    if h == i or h == j or (i, h) not in routes or (h, j) not in routes:
+                        continue
+                    arc = v + '-' + layover_node[h]
+                    arc_set.append(arc)
+                    arc_leg[arc] = (i, h)
+                    second_leg = layover_node[h] + '-' + j
+                    if second_leg not in layover_arcs:
+                        arc_set.append(second_leg)
+                        arc_leg[second_leg] = (h, j)
+                        layover_arcs[second_leg] = []
+                    layover_arcs[second_leg].append(arc)
+            arc_set.append(v + '-' + 't')
+
+    out_arcs, in_arcs = build_arc_index(arc_set, node_set)
+
+    return {
+        'cities': list(airports),
+        'hubs': list(hubs),
+        'arc_set': arc_set,
+        'arc_id': {arc: k for k, arc in enumerate(arc_set)},  # position of each arc in arc_set
+        'node_set': node_set,
+        'out_arcs': out_arcs,
+        'in_arcs': in_arcs,
+        'supply_nodes': supply_nodes,
+        'layover_nodes': [layover_node[h] for h in hubs],
+        'arc_leg': arc_leg,
+        'layover_arcs': layover_arcs,
+    }
+
+
+def build_leg_network(airports, distances):
+    """
+    Builds the network of flight legs: one arc "i-j" per route in the distances table, in each direction.
+
+    Has the keys of build_network used by CostTables (cities, arc_set, arc_id, arc_leg), so the same
+    cost tables can be computed by leg. Used by the itinerary (path) formulation in column_generation.py.
+    """
+    arc_set = []
+    arc_leg = {}
+    for i in airports:
+        for j in airports:
+            if i != j and ((i, j) in distances or (j, i) in distances):
+                arc = i + '-' + j
+                arc_set.append(arc)
+                arc_leg[arc] = (i, j)
+    return {
+        'cities': list(airports),
+        'arc_set': arc_set,
+        'arc_id': {arc: k for k, arc in enumerate(arc_set)},
+        'arc_leg': arc_leg,
+    }
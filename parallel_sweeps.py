@@ -0,0 +1,151 @@
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+'''
+# Parallel scenario sweeps
+# Each worker process builds the base model once (by importing sensitivity_analysis) and re-solves it
+# for its share of the scenarios. A scenario is one row of fuel prices, landing fees and AIF rates,
+# one column per city and table, read by the workers from shared memory.
+'''
+
+cost_columns = ['fuel_prices', 'landing_fees', 'aif_rates']
+
+
+def scenario_grid(cities, base_costs, fuel_price_range=None, landing_fee_range=None, aif_rate_range=None):
+    """
+    Returns every combination (cartesian product) of the given values as an array of scenarios.
+
+    base_costs is (fuel_prices, landing_fees, aif_rates) keyed by city code, and gives the value of
+    every city and table missing from the ranges. Each row holds the fuel prices of the cities, then
+    their landing fees, then their AIF rates.
+    """
+    ranges = [fuel_price_range or {}, landing_fee_range or {}, aif_rate_range or {}]
+    columns = []
+    for table_range, base in zip(ranges, base_costs):
+        for c in cities:
+            columns.append(table_range.get(c, [base[c]]))
+    return np.array(list(itertools.product(*columns)), dtype=np.float64)
+
+
+_worker = {}  # state of the current worker process
+
+
+def _init_worker(shm_name, shape, cities, threads):
+    """
+    Builds the base model in the worker and attaches the scenarios in shared memory.
+    """
+    import sensitivity_analysis  # builds the model of passenger_demands.py
+
+    model = sensitivity_analysis.FLIGHTS_MODEL
+    model.Params.OutputFlag = 0
+    model.Params.Threads = threads
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker['shm'] = shm  # keep the block mapped while the worker is alive
+    _worker['scenarios'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker['cities'] = list(cities)  # the column order of the scenarios
+    _worker['sa'] = sensitivity_analysis
+    _worker['profit_constrs'] = sensitivity_analysis.get_profit_constraints(model)
+    _worker['all_vars'] = model.getVars()
+
+
+def _solve_scenarios(scenario_ids):
+    """
+    Solves the given scenarios, updating the worker's model in place between them.
+    """
+    sa = _worker['sa']
+    model = sa.FLIGHTS_MODEL
+    cities = _worker['cities']
+    if cities != sa.network['cities']:  # checked here, since a pool restarts workers failing to start
+        raise ValueError(f"the scenarios are by city {cities}, the model by city {sa.network['cities']}")
+    city_names = sa.cost_tables.city_names
+    tables = sa.cost_tables.tables
+    all_vars = _worker['all_vars']
+
+    rows = []
+    for s in scenario_ids:
+        values = _worker['scenarios'][s]
+        for t, table in enumerate(cost_columns):
+            for k, c in enumerate(cities):
+                key = c if table == 'fuel_prices' else city_names[c]
+                tables[table][key] = float(values[t * len(cities) + k])
+        changed_arcs = [sa.arc_set[k] for k in sa.cost_tables.refresh()]
+        sa.update_arc_costs(model, _worker['profit_constrs'], changed_arcs)
+        if model.SolCount > 0:
+            model.setAttr("Start", all_vars, model.getAttr("X", all_vars))
+
+        model.optimize()
+        profit = model.ObjVal if model.SolCount > 0 else None
+        rows.append((int(s), profit, model.Status, model.MIPGap if model.SolCount > 0 else None,
+                     model.Runtime, os.getpid()))
+    return rows
+
+
+def run_sweep(scenarios, cities, num_workers=None, chunk_size=8, threads_per_worker=1):
+    """
+    Solves every scenario (rows of scenario_grid) in a pool of worker processes.
+
+    cities is the order of the columns of the scenarios, which must be that of the model's network (the
+    airports of base_tables), or the workers raise ValueError.
+
+    Returns one row per scenario, in scenario order, with the cost inputs, the profit (None when no
+    solution was found), the Gurobi status, the MIP gap, the solve time and the worker's pid.
+    """
+    num_workers = num_workers or os.cpu_count()
+    shm = shared_memory.SharedMemory(create=True, size=max(scenarios.nbytes, 1))
+    try:
+        shared = np.ndarray(scenarios.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = scenarios
+
+        chunks = [range(k, min(k + chunk_size, len(scenarios))) for k in range(0, len(scenarios), chunk_size)]
+        # Gurobi environments cannot be shared with forked processes, so the workers are spawned
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(num_workers, initializer=_init_worker,
+                      initargs=(shm.name, scenarios.shape, cities, threads_per_worker)) as pool:
+            solved = [row for rows in pool.imap_unordered(_solve_scenarios, chunks) for row in rows]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    table = []
+    for s, profit, status, gap, solve_time, pid in sorted(solved):
+        row = {'scenario': s}
+        for t, name in enumerate(cost_columns):
+            for k, c in enumerate(cities):
+                row[f"{name}_{c}"] = scenarios[s, t * len(cities) + k]
+        row.update({'profit': profit, 'status': status, 'gap': gap, 'solve_time': solve_time, 'worker': pid})
+        table.append(row)
+    return table
+
+
+def write_results_csv(table, path):
+    """
+    Writes the rows returned by run_sweep to a CSV file.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(table[0].keys()))
+        writer.writeheader()
+        writer.writerows(table)
+
+
+if __name__ == "__main__":
+    from base_tables import airports as cities, fuel_prices, landing_fees, aif_rates, city_names
+
+    base_costs = (fuel_prices,
+                  {c: landing_fees[city_names[c]] for c in cities},
+                  {c: aif_rates[city_names[c]] for c in cities})
+
+    # Every combination of the fuel prices of the five cities
+    fuel_price_range = {c: [1.00, 1.10, 1.30, 1.50] for c in cities}
+    scenarios = scenario_grid(cities, base_costs, fuel_price_range=fuel_price_range)
+
+    start = time.perf_counter()
+    table = run_sweep(scenarios, cities)
+    print(f"Solved {len(table)} scenarios in {time.perf_counter() - start:.1f}s")
+    write_results_csv(table, "sweep_results.csv")
@@ -0,0 +1,106 @@
+import time
+
+from flights_model import build_flights_model
+
+'''
+# Rolling horizon
+# The fleet balance ties every day to the next, so long horizons make one large MIP. Instead a window
+# of days is solved at a time: the flights of its first days are committed, the planes at each airport
+# at the end of those days become the starting fleet of the next window, and the window slides forward.
+'''
+
+def solve_rolling_horizon(network, demands_matrix, revenues_matrix, table_index, costs, window=7, overlap=2,
+                          plane_capacity=211, time_limit=None, initial_fleet=None):
+    """
+    Solves the flights model window by window.
+
+    Each window covers `window` days and the next window starts `window - overlap` days later, so the
+    last `overlap` days of a window are only used to look ahead and are solved again. The starting fleet
+    of the first window is initial_fleet (planes by city), or free as in the full model when it is None.
+    time_limit is in seconds per window.
+
+    Returns a dict with the profit of the committed plan, the committed flights n and passengers X
+    by (arc, day), the planes Z at each airport by (city, day) and one row per window with its days,
+    status, build time and solve time. The profit is None when a window has no solution.
+    """
+    num_days = len(demands_matrix)
+    step = window - overlap
+    if step < 1:
+        raise ValueError(f"the overlap ({overlap}) must be smaller than the window ({window})")
+
+    plan = {'profit': 0, 'n': {}, 'X': {}, 'Z': {}, 'windows': []}
+    fleet = initial_fleet  # planes at each airport at the start of the window
+    start = 0
+    while start < num_days:
+        end = min(start + window, num_days)
+        commit_end = num_days if end == num_days else start + step
+
+        build_start = time.perf_counter()
+        model, X, n, Z = build_flights_model(network, demands_matrix[start:end], revenues_matrix, table_index,
+                                             costs, plane_capacity)
+        model.Params.OutputFlag = 0
+        if time_limit is not None:
+            model.Params.TimeLimit = time_limit
+        if fleet is not None:
+            for c in network['cities']:
+                Z[c, 0].LB = Z[c, 0].UB = fleet[c]
+        model.update()
+        build_time = time.perf_counter() - build_start
+
+        model.optimize()
+        plan['windows'].append({"Start": start, "End": end, "Committed": commit_end - start, "Status": model.Status,
+                                "Build Time": build_time, "Solve Time": model.Runtime})
+        if model.SolCount == 0:
+            plan['profit'] = None
+            model.dispose()
+            return plan
+
+        # Commit the first days of the window - their flights are final
+        for day_num in range(commit_end - start):
+            day_vars = [X[arc, day_num] for arc in network['arc_set']] + [n[arc, day_num] for arc in network['arc_set']]
+            plan['profit'] += sum(coeff * value for coeff, value in
+                                  zip(model.getAttr("Obj", day_vars), model.getAttr("X", day_vars)))
+            for arc in network['arc_set']:
+                plan['X'][arc, start + day_num] = round(X[arc, day_num].X)
+                plan['n'][arc, start + day_num] = round(n[arc, day_num].X)
+            for c in network['cities']:
+                plan['Z'][c, start + day_num] = round(Z[c, day_num].X)
+        fleet = {c: round(Z[c, commit_end - start].X) for c in network['cities']}
+        model.dispose()
+        start = commit_end
+
+    for c in network['cities']:
+        plan['Z'][c, num_days] = fleet[c]
+    return plan
+
+
+if __name__ == "__main__":
+    from network import build_network
+    from cost_tables import CostTables
+    from synthetic_instances import generate_instance
+
+    # Optimality loss against the full model, on instances small enough to solve both ways
+    print(f"{'airports':>8} {'days':>5} {'window':>6} {'overlap':>7} {'full profit':>13} {'rolling profit':>14} "
+          f"{'loss':>7} {'full (s)':>9} {'rolling (s)':>11}")
+    for num_airports, num_days in [(4, 14), (5, 7)]:
+        instance = generate_instance(num_airports, 1, num_days)
+        network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+        costs = CostTables(network, instance['distances'], instance['fuel_prices'],
+                           instance['landing_fees'], instance['aif_rates'], instance['city_names'])
+        data = (network, instance['demands_matrix'], instance['revenues_matrix'], instance['table_index'], costs)
+
+        start = time.perf_counter()
+        model = build_flights_model(*data)[0]
+        model.Params.OutputFlag = 0
+        model.optimize()
+        full_time = time.perf_counter() - start
+        full_profit = model.ObjVal
+        model.dispose()
+
+        for window, overlap in [(2, 0), (3, 1), (5, 2)]:
+            start = time.perf_counter()
+            plan = solve_rolling_horizon(*data, window=window, overlap=overlap)
+            rolling_time = time.perf_counter() - start
+            loss = (full_profit - plan['profit']) / abs(full_profit)
+            print(f"{num_airports:>8} {num_days:>5} {window:>6} {overlap:>7} {full_profit:>13.1f} "
+                  f"{plan['profit']:>14.1f} {loss:>6.2%} {full_time:>9.2f} {rolling_time:>11.2f}")
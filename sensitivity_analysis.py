@@ -1,69 +1,299 @@
+import time
+
 import gurobipy as gp
 from gurobipy import GRB
+from passenger_demands import (build_model, arc_set, network, demands_matrix, revenues_matrix, table_index,
+                               fuel_prices, cost_tables, calculate_fuel_cost, get_landing_fee, get_aif)
+from solve_instrumentation import instrumented_optimize
+
+FLIGHTS_MODEL, X, n, Z, build_time = build_model()  # the model of passenger_demands.py
+
+
+def get_profit_constraints(model):
+    """
+    Returns the profit constraints of the model by (arc, day).
+    """
+    model.update()
+    profit_constrs = {}
+    for constr in model.getConstrs():
+        name = constr.ConstrName
+        if name.startswith("profit_"):
+            arc, day_num = name[len("profit_"):].rsplit("_", 1)
+            profit_constrs[arc, int(day_num)] = constr
+    return profit_constrs
+
 
-def sensitivity_analysis_fuel_costs(model, fuel_price_range):
+def update_arc_costs(model, profit_constrs, arcs):
+    """
+    Updates the costs of the given arcs (from cost_tables), in the objective and in their profit constraints.
+    The arcs and days pruned from the model (no demand) are skipped.
+    """
+    update_vars = []
+    update_obj = []
+    for arc in arcs:
+        depart, arrive = network['arc_leg'][arc]
+        ticket_price = revenues_matrix[table_index[depart]][table_index[arrive]]
+        flight_cost = calculate_fuel_cost(arc) + get_landing_fee(arc)
+        aif = get_aif(arc)
+        for day_num in range(len(demands_matrix)):
+            if (arc, day_num) not in n:
+                continue
+            update_vars += [n[arc, day_num], X[arc, day_num]]
+            update_obj += [-flight_cost, ticket_price - aif]
+            model.chgCoeff(profit_constrs[arc, day_num], n[arc, day_num], flight_cost)
+            model.chgCoeff(profit_constrs[arc, day_num], X[arc, day_num], aif - ticket_price)
+    model.setAttr("Obj", update_vars, update_obj)
+
+
+def sensitivity_analysis_fuel_costs(model, fuel_price_range, incremental=False, multi_scenario=False, recorder=None):
+    """
+    Re-solves the model for every fuel price in fuel_price_range (city -> list of prices).
+
+    By default the objective is rebuilt and the model solved from scratch for every price. With
+    incremental=True only the coefficients of the flights leaving the city are updated, and each
+    solve starts from the previous incumbent. With multi_scenario=True every price is a scenario of
+    a single solve (see sensitivity_multi_scenario). Build Time and Solve Time are reported in seconds.
+    A recorder (solve_instrumentation.SolveRecorder) records every solve, labelled by city and fuel price.
+    """
+    if multi_scenario:
+        return sensitivity_multi_scenario(model, fuel_price_range, recorder)
 
     results = {}
+    profit_constrs = get_profit_constraints(model)
+    all_vars = model.getVars()
 
     for city, price_list in fuel_price_range.items():
         results[city] = []
+        base_price = fuel_prices[city]
 
         for price in price_list:
+            start = time.perf_counter()
+
             # Update fuel price for the city
             fuel_prices[city] = price
+            changed_arcs = [arc_set[k] for k in cost_tables.refresh()]  # arcs leaving the city
 
-            # Recalculate fuel costs in the objective function
-            obj_fn = 0
-            for day_num in range(0, 5):
-                for arc in arc_set:
-                    depart = arc.split("-")[0][0]
-                    arrive = arc.split("-")[1][0]
+            if incremental:
+                update_arc_costs(model, profit_constrs, changed_arcs)
+                if model.SolCount > 0:
+                    model.setAttr("Start", all_vars, model.getAttr("X", all_vars))
+            else:
+                # Recalculate fuel costs in the objective function
+                obj_fn = 0
+                for day_num in range(len(demands_matrix)):
+                    for arc in arc_set:
+                        depart = arc.split("-")[0][0]
+                        arrive = arc.split("-")[1][0]
+
+                        if arrive != "t" and (arc, day_num) in n:  # Only consider valid arcs with costs
+                            revenue = revenues_matrix[table_index[depart]][table_index[arrive]] * X[arc, day_num]
+                            fuel_cost = calculate_fuel_cost(arc) * n[arc, day_num]  # Recalculate fuel cost
+                            landing_cost = get_landing_fee(arc) * n[arc, day_num]  # Landing cost per flight
+                            aif_cost = get_aif(arc) * X[arc, day_num]  # AIF per passenger
+                            cost = fuel_cost + landing_cost + aif_cost  # Total cost
+                            obj_fn += revenue - cost
 
-                    if arrive != "t":  # Only consider valid arcs with costs
-                        revenue = revenues_matrix[table_index[depart]][table_index[arrive]] * X[arc, day_num]
-                        fuel_cost = calculate_fuel_cost(arc) * n[arc, day_num]  # Recalculate fuel cost
-                        landing_cost = get_landing_fee(arc) * n[arc, day_num]  # Landing cost per flight
-                        aif_cost = get_aif(arc) * X[arc, day_num]  # AIF per passenger
-                        cost = fuel_cost + landing_cost + aif_cost  # Total cost
-                        obj_fn += revenue - cost
+                # Update the model objective and the costs in the profit constraints
+                model.setObjective(obj_fn, GRB.MAXIMIZE)
+                update_arc_costs(model, profit_constrs, network['arc_leg'])
+                model.reset()  # discard the previous solution
 
-            # Update the model objective
-            model.setObjective(obj_fn, GRB.MAXIMIZE)
+            model.update()
+            build_time = time.perf_counter() - start
 
             # Optimize the model with updated fuel prices
-            model.optimize()
+            if recorder is not None:
+                recorder.phase("build", build_time, city=city, fuel_price=price)
+            instrumented_optimize(model, recorder, city=city, fuel_price=price)
 
             # Check if the model solved successfully
             if model.status == GRB.OPTIMAL:
-                results[city].append({
-                    "Fuel Price": price,
-                    "Profit": model.ObjVal
-                })
+                profit = model.ObjVal
             else:
-                results[city].append({
-                    "Fuel Price": price,
-                    "Profit": None  
-                })
+                profit = None
+            results[city].append({
+                "Fuel Price": price,
+                "Profit": profit,
+                "Build Time": build_time,
+                "Solve Time": model.Runtime,
+            })
+
+        # Back to the base price before moving to the next city
+        fuel_prices[city] = base_price
+        update_arc_costs(model, profit_constrs, [arc_set[k] for k in cost_tables.refresh()])
+
+    return results
+
+
+def sensitivity_multi_scenario(model, fuel_price_range, recorder=None):
+    """
+    Solves every fuel price in fuel_price_range as a scenario of one multi-scenario model.
+
+    Only the objective can differ between Gurobi scenarios, so the fuel costs in the profit constraints
+    stay at the base prices (as in the original objective-only sweep). Returns the same structure as
+    sensitivity_analysis_fuel_costs. Build Time is the time spent setting up each scenario and Solve
+    Time is the single solve's time divided by the number of scenarios.
+    """
+    scenarios = [(city, price) for city, price_list in fuel_price_range.items() for price in price_list]
+    model.NumScenarios = len(scenarios)
+    build_times = []
+
+    for s, (city, price) in enumerate(scenarios):
+        start = time.perf_counter()
+        base_price = fuel_prices[city]
+        fuel_prices[city] = price
+        changed_arcs = [arc_set[k] for k in cost_tables.refresh()]  # arcs leaving the city
 
+        model.Params.ScenarioNumber = s
+        scenario_vars = []
+        scenario_obj = []
+        for arc in changed_arcs:
+            flight_cost = calculate_fuel_cost(arc) + get_landing_fee(arc)
+            for day_num in range(len(demands_matrix)):
+                if (arc, day_num) not in n:
+                    continue
+                scenario_vars.append(n[arc, day_num])
+                scenario_obj.append(-flight_cost)
+        model.setAttr("ScenNObj", scenario_vars, scenario_obj)
+
+        fuel_prices[city] = base_price
+        cost_tables.refresh()
+        build_times.append(time.perf_counter() - start)
+
+    if recorder is not None:
+        recorder.phase("build", sum(build_times), scenarios=len(scenarios))
+    instrumented_optimize(model, recorder, scenarios=len(scenarios))
+
+    results = {}
+    for s, (city, price) in enumerate(scenarios):
+        model.Params.ScenarioNumber = s
+        profit = model.ScenNObjVal if model.SolCount > 0 else None
+        if profit is not None and abs(profit) >= GRB.INFINITY:
+            profit = None  # no solution for this scenario
+        results.setdefault(city, []).append({
+            "Fuel Price": price,
+            "Profit": profit,
+            "Build Time": build_times[s],
+            "Solve Time": model.Runtime / len(scenarios),
+        })
+
+    model.NumScenarios = 0
+    model.update()  # the model is back to a single scenario for its next reader
+    return results
+
+
+def cost_ranging(model, fixed_mip=False):
+    """
+    Sensitivity of the profit to every fuel price, landing fee and AIF rate from a single solve.
+
+    Solves the LP relaxation of the model, or with fixed_mip=True the MIP and then the LP with the
+    integer variables fixed at their optimal values. Returns, by cost table and city:
+    Value - the current fuel price, landing fee or AIF rate
+    Low, Up - how far the value can move before the optimal plan changes, from the objective ranging
+              (SAObjLow/SAObjUp) of every flight arc it applies to. Each arc is ranged on its own and the
+              profit constraints are taken as fixed, so this is a guide rather than a guarantee. The
+              arcs' ranges often reach below zero (or have no lower end), so Low is clipped at 0, the
+              lowest cost there is: a Low of 0 means that no lower cost changes the plan. Up is inf when
+              no arc limits an increase. With fixed_mip=True every variable is fixed and the ranges are
+              [0, inf].
+    Marginal Profit - change in profit per unit increase of the value, from the solution and the duals of
+              the profit constraints
+    and under 'reduced_costs', by (arc, day) of every flight arc, the reduced costs (RC) of its flights n
+    and passengers X. They are < 0 for a column at zero, which enters the plan once its profit coefficient
+    increases by more than -RC, > 0 for a column at its upper bound and 0 for the others.
+    """
+    profit_constrs = get_profit_constraints(model)
+    if fixed_mip:
+        model.optimize()
+        lp = model.fixed()
+    else:
+        lp = model.relax()
+    lp.Params.OutputFlag = 0
+    lp.optimize()
+    if lp.Status != GRB.OPTIMAL:
+        return None
+
+    lp_vars = lp.getVars()
+    lp_constrs = lp.getConstrs()
+    flight_arcs = list(network['arc_leg'])
+    days = range(len(demands_matrix))
+    keys = [(arc, day_num) for arc in flight_arcs for day_num in days if (arc, day_num) in n]  # not pruned
+    n_vars = [lp_vars[n[key].index] for key in keys]
+    x_vars = [lp_vars[X[key].index] for key in keys]
+    profit_rows = [lp_constrs[profit_constrs[key].index] for key in keys]
+    n_value, n_low, n_up, n_rc = (lp.getAttr(attr, n_vars) for attr in ("X", "SAObjLow", "SAObjUp", "RC"))
+    x_value, x_low, x_up, x_rc = (lp.getAttr(attr, x_vars) for attr in ("X", "SAObjLow", "SAObjUp", "RC"))
+    profit_dual = lp.getAttr("Pi", profit_rows)
+
+    results = {}
+    for table in ('fuel_prices', 'landing_fees', 'aif_rates'):
+        results[table] = {}
+        for c in network['cities']:
+            value = cost_tables.current_value((table, c))
+            results[table][c] = {"Value": value, "Low": -float('inf'), "Up": float('inf'), "Marginal Profit": 0}
+
+    for k, (arc, day_num) in enumerate(keys):
+        depart, arrive = network['arc_leg'][arc]
+        a = network['arc_id'][arc]
+        fuel_per_price = float(cost_tables.distance[a]) * cost_tables.fuel_consumption_per_km  # fuel cost per unit price
+        fuel, landing = float(cost_tables.fuel[a]), float(cost_tables.landing[a])
+        ticket_price = revenues_matrix[table_index[depart]][table_index[arrive]]
+        # Objective coefficient of n is -(fuel + landing), of X it is ticket price - AIF
+        # d profit / d coefficient a_ij of a constraint is -dual_i * value_j
+        fuel_range = results['fuel_prices'][depart]
+        landing_range = results['landing_fees'][arrive]
+        aif_range = results['aif_rates'][depart]
+        if fuel_per_price > 0:
+            fuel_range["Low"] = max(fuel_range["Low"], (-n_up[k] - landing) / fuel_per_price)
+            fuel_range["Up"] = min(fuel_range["Up"], (-n_low[k] - landing) / fuel_per_price)
+            fuel_range["Marginal Profit"] -= fuel_per_price * n_value[k] * (1 + profit_dual[k])
+        landing_range["Low"] = max(landing_range["Low"], (-n_up[k] - fuel) / cost_tables.mtow_tons)
+        landing_range["Up"] = min(landing_range["Up"], (-n_low[k] - fuel) / cost_tables.mtow_tons)
+        landing_range["Marginal Profit"] -= cost_tables.mtow_tons * n_value[k] * (1 + profit_dual[k])
+        aif_range["Low"] = max(aif_range["Low"], ticket_price - x_up[k])
+        aif_range["Up"] = min(aif_range["Up"], ticket_price - x_low[k])
+        aif_range["Marginal Profit"] -= x_value[k] * (1 + profit_dual[k])
+
+    for table_ranges in results.values():
+        for r in table_ranges.values():
+            r["Low"] = max(r["Low"], 0.0)
+    results['reduced_costs'] = {key: {"n": n_rc[k], "X": x_rc[k]} for k, key in enumerate(keys)}
+
+    lp.dispose()
     return results
 
 
-# Range of fuel prices for sensitivity analysis
-fuel_price_range = {
-    'H': [1.00, 1.10, 1.28, 1.50],  # Example fuel price variations for Halifax
-    'M': [1.00, 1.10, 1.17, 1.50],  # Example for Montreal
-    'T': [1.00, 1.10, 1.29, 1.50],  # Example for Toronto
-    'W': [1.00, 1.10, 1.19, 1.50],  # Example for Winnipeg
-    'V': [1.00, 1.10, 1.30, 1.50],  # Example for Vancouver
-}
-
-# Conduct sensitivity analysis
-fuel_sensitivity_results = sensitivity_analysis_fuel_costs(FLIGHTS_MODEL, fuel_price_range)
-
-# Output the results
-for city, results in fuel_sensitivity_results.items():
-    print(f"\nSensitivity Analysis for {city} (Fuel Prices):")
-    for result in results:
-        fuel_price = result["Fuel Price"]
-        profit = result["Profit"]
-        print(f"Fuel Price: {fuel_price:.2f}, Profit: {profit if profit is not None else 'Infeasible'}")
+if __name__ == "__main__":
+    # Range of fuel prices for sensitivity analysis
+    fuel_price_range = {
+        'H': [1.00, 1.10, 1.28, 1.50],  # Example fuel price variations for Halifax
+        'M': [1.00, 1.10, 1.17, 1.50],  # Example for Montreal
+        'T': [1.00, 1.10, 1.29, 1.50],  # Example for Toronto
+        'W': [1.00, 1.10, 1.19, 1.50],  # Example for Winnipeg
+        'V': [1.00, 1.10, 1.30, 1.50],  # Example for Vancouver
+    }
+
+    # Ranges and marginal profits of every cost from a single LP solve
+    cost_ranges = cost_ranging(FLIGHTS_MODEL)
+    reduced_costs = cost_ranges.pop('reduced_costs')
+    for table, table_ranges in cost_ranges.items():
+        print(f"\nRanging of {table} (LP relaxation):")
+        for city, r in table_ranges.items():
+            print(f"{city}: {r['Value']:.2f} in [{r['Low']:.2f}, {r['Up']:.2f}], "
+                  f"Marginal Profit: {r['Marginal Profit']:.1f} per unit")
+    print("\nFlights closest to entering the plan (LP relaxation):")
+    unflown = sorted((-rc["n"], arc, day_num) for (arc, day_num), rc in reduced_costs.items() if rc["n"] < -1e-6)
+    for increase, arc, day_num in unflown[:5]:
+        print(f"Arc {arc}, Day {day_num}: flown once its cost per flight drops by {increase:.2f}")
+
+    # Conduct sensitivity analysis, updating the model in place between prices
+    fuel_sensitivity_results = sensitivity_analysis_fuel_costs(FLIGHTS_MODEL, fuel_price_range, incremental=True)
+
+    # Output the results
+    for city, results in fuel_sensitivity_results.items():
+        print(f"\nSensitivity Analysis for {city} (Fuel Prices):")
+        for result in results:
+            fuel_price = result["Fuel Price"]
+            profit = result["Profit"]
+            print(f"Fuel Price: {fuel_price:.2f}, Profit: {profit if profit is not None else 'Infeasible'}, "
+                  f"Build: {result['Build Time']:.3f}s, Solve: {result['Solve Time']:.3f}s")
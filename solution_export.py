@@ -0,0 +1,109 @@
+import csv
+
+import numpy as np
+
+'''
+# Solution export
+# The passengers and flights of every arc and day are read from the solver in one call, and the
+# flight legs flown are returned as a columnar table (a dict of numpy arrays, one per column) that
+# can be written to CSV or Parquet.
+'''
+
+table_columns = ['arc', 'origin', 'destination', 'via_hub', 'day', 'passengers', 'flights', 'revenue', 'cost']
+
+
+def solution_arrays(X, n, network, num_days, values):
+    """
+    Returns the passengers and flights of a solved model as arrays of shape (arcs, days), indexed by network['arc_id'].
+
+    X and n are the variables of build_flights_model (tupledicts, added arc by arc and day by day) or of
+    build_flights_model_matrix (MVars). values holds the value of every variable of the model, in model
+    order, e.g. model.getAttr("X", model.getVars()). The arcs and days missing from a pruned model are zero.
+    """
+    values = np.asarray(values)
+    num_arcs = len(network['arc_set'])
+    if hasattr(X, 'shape'):  # MVars
+        x_start, n_start = X[0, 0].item().index, n[0, 0].item().index
+        # Both add the variables of X and of n as one block each, arc by arc and day by day
+        return (values[x_start:x_start + num_arcs * num_days].reshape(num_arcs, num_days),
+                values[n_start:n_start + num_arcs * num_days].reshape(num_arcs, num_days))
+    arc_id = network['arc_id']
+    arrays = []
+    for variables in (X, n):
+        array = np.zeros((num_arcs, num_days))
+        if variables:
+            arcs, days = zip(*variables.keys())
+            array[[arc_id[arc] for arc in arcs], list(days)] = values[[v.index for v in variables.values()]]
+        arrays.append(array)
+    return arrays[0], arrays[1]
+
+
+def named_solution_arrays(values, network, num_days):
+    """
+    Returns the passengers and flights of a solution of build_flights_model given by variable name (e.g.
+    from model_cache.solve_cached) as arrays of shape (arcs, days), indexed by network['arc_id'].
+
+    The variables missing from values (e.g. pruned) are zero.
+    """
+    num_arcs = len(network['arc_set'])
+    passengers, flights = np.zeros((num_arcs, num_days)), np.zeros((num_arcs, num_days))
+    for arc, k in network['arc_id'].items():
+        for day_num in range(num_days):
+            passengers[k, day_num] = values.get(f"x[{arc},{day_num}]", 0)
+            flights[k, day_num] = values.get(f"n[{arc},{day_num}]", 0)
+    return passengers, flights
+
+
+def solution_table(network, passengers, flights, revenues_matrix, table_index, costs):
+    """
+    Returns the flight legs with passengers or flights, by arc and day, as a dict of columns (numpy arrays).
+
+    origin and destination are the airports of the leg, and via_hub is the hub of a connection ("" for a
+    direct flight). revenue is the ticket revenue of the passengers on the leg, and cost the fuel and
+    landing cost of the flights plus the AIF of the passengers.
+    """
+    legs = network['arc_leg']
+    flight_ids = np.array([network['arc_id'][arc] for arc in legs], dtype=np.int64)
+    arcs = np.array(list(legs), dtype=object)
+    origin = np.array([depart for depart, arrive in legs.values()], dtype=object)
+    destination = np.array([arrive for depart, arrive in legs.values()], dtype=object)
+    # "ij-h*" flies to the hub and "h*-j" from the hub, direct flights "ij-j" have no hub
+    via_hub = np.array([arrive if arc.endswith("*") else depart if arc.split("-")[0].endswith("*") else ""
+                        for arc, (depart, arrive) in legs.items()], dtype=object)
+    ticket_price = np.array([revenues_matrix[table_index[depart]][table_index[arrive]]
+                             for depart, arrive in legs.values()], dtype=float)
+
+    leg_passengers = np.round(passengers[flight_ids])
+    leg_flights = np.round(flights[flight_ids])
+    leg, day = np.nonzero((leg_passengers > 0) | (leg_flights > 0))
+    row_passengers = leg_passengers[leg, day]
+    row_flights = leg_flights[leg, day]
+    k = flight_ids[leg]
+    return {
+        'arc': arcs[leg],
+        'origin': origin[leg],
+        'destination': destination[leg],
+        'via_hub': via_hub[leg],
+        'day': day,
+        'passengers': row_passengers.astype(np.int64),
+        'flights': row_flights.astype(np.int64),
+        'revenue': ticket_price[leg] * row_passengers,
+        'cost': (costs.fuel[k] + costs.landing[k]) * row_flights + costs.aif[k] * row_passengers,
+    }
+
+
+def write_table(table, path):
+    """
+    Writes a table from solution_table to a Parquet file (path ending in .parquet, needs pyarrow) or a CSV file.
+    """
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.table({name: column.tolist() if column.dtype == object else column
+                                 for name, column in table.items()}), path)
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(table_columns)
+        writer.writerows(zip(*(table[name].tolist() for name in table_columns)))
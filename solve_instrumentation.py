@@ -0,0 +1,130 @@
+import json
+import math
+import time
+import uuid
+
+from gurobipy import GRB
+
+'''
+# Solve instrumentation
+# A SolveRecorder writes JSON lines describing each solve: the phase timings (read and build as
+# reported by the caller, then presolve, root LP and branch-and-bound from a Gurobi callback), the
+# incumbent / bound / gap trajectory and the node throughput, and a summary at the end of the solve.
+# Without a recorder instrumented_optimize is a plain model.optimize(), with no callback.
+'''
+
+def mip_gap(bound, objective):
+    """
+    Returns the relative gap between an objective and its bound, as Gurobi computes MIPGap: math.inf for an
+    objective of 0 (unless the bound is 0 too), so that it is never within a target gap.
+    """
+    if bound == objective:
+        return 0.0
+    if objective == 0:
+        return math.inf
+    return abs(bound - objective) / abs(objective)
+
+
+class SolveRecorder:
+    """
+    Writes solve events as JSON lines to path (appending), or to an open text stream.
+
+    Every line has the event type, the wall clock time (ts), the id of the recorder (run) and the
+    labels of the current solve. Progress lines are written when the incumbent or the bound change,
+    and at most every `interval` seconds otherwise.
+    """
+
+    def __init__(self, path=None, stream=None, interval=1.0, **labels):
+        self.stream = stream if stream is not None else open(path, "a")
+        self.interval = interval
+        self.run = uuid.uuid4().hex[:12]
+        self.labels = labels
+
+    def emit(self, event, **fields):
+        line = {'event': event, 'ts': time.time(), 'run': self.run, **self.labels, **fields}
+        self.stream.write(json.dumps(line) + "\n")
+        self.stream.flush()
+
+    def phase(self, name, seconds, **labels):
+        """
+        Records the time of a phase outside the solver, e.g. reading the data or building the model.
+        """
+        self.emit('phase', phase=name, seconds=seconds, **labels)
+
+    def start_solve(self, labels):
+        self.solve_labels = labels
+        self.presolve_end = None  # solver time when the first LP or MIP callback came
+        self.root_end = None  # solver time when branching started
+        self.last_progress = None
+        self.last_emit = -float('inf')
+
+    def callback(self, model, where):
+        """
+        Gurobi callback, passed to model.optimize by instrumented_optimize.
+        """
+        if where in (GRB.Callback.POLLING, GRB.Callback.PRESOLVE, GRB.Callback.MESSAGE):
+            return
+        runtime = model.cbGet(GRB.Callback.RUNTIME)
+        if self.presolve_end is None:
+            self.presolve_end = runtime
+            self.emit('phase', phase='presolve', seconds=runtime, **self.solve_labels)
+        if where != GRB.Callback.MIP:
+            return
+
+        incumbent = model.cbGet(GRB.Callback.MIP_OBJBST)
+        bound = model.cbGet(GRB.Callback.MIP_OBJBND)
+        nodes = model.cbGet(GRB.Callback.MIP_NODCNT)
+        if self.root_end is None and nodes > 0:
+            self.root_end = runtime
+            self.emit('phase', phase='root', seconds=runtime - self.presolve_end, **self.solve_labels)
+
+        progress = (incumbent, bound)
+        if progress == self.last_progress and runtime - self.last_emit < self.interval:
+            return
+        self.last_progress = progress
+        self.last_emit = runtime
+        has_incumbent = abs(incumbent) < GRB.INFINITY
+        gap = mip_gap(bound, incumbent) if has_incumbent else None
+        self.emit('progress', runtime=runtime, incumbent=incumbent if has_incumbent else None, bound=bound,
+                  gap=gap, nodes=nodes, nodes_per_s=nodes / runtime if runtime > 0 else None,
+                  open_nodes=model.cbGet(GRB.Callback.MIP_NODLFT), **self.solve_labels)
+
+    def end_solve(self, model):
+        runtime = model.Runtime
+        if model.IsMIP:
+            if self.root_end is None:  # solved at the root
+                self.root_end = runtime
+                self.emit('phase', phase='root', seconds=runtime - (self.presolve_end or 0), **self.solve_labels)
+            self.emit('phase', phase='branch_and_bound', seconds=runtime - self.root_end, **self.solve_labels)
+        self.emit('solve', status=model.Status, runtime=runtime,
+                  objective=model.ObjVal if model.SolCount > 0 else None,
+                  bound=model.ObjBound if model.IsMIP else None,
+                  gap=model.MIPGap if model.IsMIP and model.SolCount > 0 else None,
+                  nodes=model.NodeCount if model.IsMIP else 0,
+                  nodes_per_s=model.NodeCount / runtime if model.IsMIP and runtime > 0 else None,
+                  iterations=model.IterCount, variables=model.NumVars, constraints=model.NumConstrs,
+                  **self.solve_labels)
+
+    def close(self):
+        self.stream.close()
+
+
+def instrumented_optimize(model, recorder=None, callback=None, **labels):
+    """
+    Optimizes the model, recording the solve with recorder (a SolveRecorder) when one is given.
+
+    callback is another Gurobi callback, called after the recorder's. labels (e.g. city="T",
+    fuel_price=1.2) are added to every line of this solve.
+    """
+    if recorder is None:
+        model.optimize(callback)
+        return
+    recorder.start_solve(labels)
+    if callback is None:
+        model.optimize(recorder.callback)
+    else:
+        def both_callbacks(model, where):
+            recorder.callback(model, where)
+            callback(model, where)
+        model.optimize(both_callbacks)
+    recorder.end_solve(model)
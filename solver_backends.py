@@ -0,0 +1,136 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from flights_model import build_gurobi_model
+
+'''
+# Solver backends
+# Each backend solves a problem from flights_model.build_flights_problem and returns the same result:
+# a dict with the status ('optimal', 'time_limit', 'infeasible', 'unbounded' or 'other'), the profit
+# (None without a solution), the solution as arrays X, n (arcs x days, or legs x days with shared legs)
+# and Z (cities x days + 1), the relative MIP gap, and the build and solve times in seconds.
+# gurobi needs gurobipy and a license; highs uses scipy.optimize.milp and needs neither.
+'''
+
+def split_solution(problem, values):
+    """
+    Returns the arrays X, n and Z of a solution vector (None for each without a solution). n is (legs, days)
+    for a problem with shared legs, and X (scenarios, arcs, days) for a problem with demand scenarios.
+
+    The solution of a pruned problem (build_flights_problem with prune=True) is first put back in place, the pruned
+    variables being zero.
+    """
+    if values is None:
+        return None, None, None
+    if 'columns' in problem:
+        full_values = np.zeros(problem['num_vars'])
+        full_values[problem['columns']] = values
+        values = full_values
+    num_arcs, num_days = problem['num_arcs'], problem['num_days']
+    num_flights = problem.get('num_legs', num_arcs)  # n is by leg for a problem with shared_legs
+    x_shape = (num_arcs, num_days)
+    if 'num_scenarios' in problem:  # X of every scenario, stochastic_demands.build_stochastic_problem
+        x_shape = (problem['num_scenarios'],) + x_shape
+    num_x = int(np.prod(x_shape))
+    num_n = num_flights * num_days
+    values = np.round(values)
+    return (values[:num_x].reshape(x_shape), values[num_x:num_x + num_n].reshape(num_flights, num_days),
+            values[num_x + num_n:].reshape(problem['num_cities'], num_days + 1))
+
+
+def arc_flights(problem, network, X, n):
+    """
+    Returns the flights n of a solution by arc (arcs, days), as for a problem without shared legs.
+
+    With shared legs the flights of each leg are put on its arc carrying the most passengers that day, so
+    that every flight (and its cost) appears once.
+    """
+    if n is None or 'legs' not in problem:
+        return n
+    arc_id = network['arc_id']
+    leg_arcs = {}
+    for arc, leg in network['arc_leg'].items():
+        leg_arcs.setdefault(leg, []).append(arc_id[arc])
+    flights = np.zeros((problem['num_arcs'], problem['num_days']))
+    days = np.arange(problem['num_days'])
+    for k, leg in enumerate(problem['legs']):
+        ids = np.array(leg_arcs[leg], dtype=np.int64)
+        flights[ids[X[ids].argmax(axis=0)], days] = n[k]
+    return flights
+
+
+def solve_gurobi(problem, time_limit=None, mip_gap=None, threads=None, output=False):
+    """
+    Solves the problem with Gurobi.
+    """
+    from gurobipy import GRB
+
+    start = time.perf_counter()
+    model, all_vars = build_gurobi_model(problem)
+    model.Params.OutputFlag = int(output)
+    if time_limit is not None:
+        model.Params.TimeLimit = time_limit
+    if mip_gap is not None:
+        model.Params.MIPGap = mip_gap
+    if threads is not None:
+        model.Params.Threads = threads
+    model.update()
+    build_time = time.perf_counter() - start
+
+    model.optimize()
+    status = {GRB.OPTIMAL: 'optimal', GRB.TIME_LIMIT: 'time_limit', GRB.INFEASIBLE: 'infeasible',
+              GRB.UNBOUNDED: 'unbounded'}.get(model.Status, 'other')
+    values = all_vars.X if model.SolCount > 0 else None
+    X, n, Z = split_solution(problem, values)
+    result = {'status': status, 'profit': model.ObjVal if values is not None else None, 'X': X, 'n': n, 'Z': Z,
+              'gap': model.MIPGap if values is not None else None,
+              'build_time': build_time, 'solve_time': model.Runtime}
+    model.dispose()
+    return result
+
+
+def solve_highs(problem, time_limit=None, mip_gap=None, threads=None, output=False):
+    """
+    Solves the problem with HiGHS through scipy.optimize.milp. HiGHS runs the MIP on one thread,
+    so threads is ignored.
+    """
+    start = time.perf_counter()
+    A = sp.vstack([rows for rows, sense, rhs in problem['rows']], format='csr')
+    lower = []
+    upper = []
+    for rows, sense, rhs in problem['rows']:
+        lower.append(rhs if sense in ('=', '>') else np.full(len(rhs), -np.inf))
+        upper.append(rhs if sense in ('=', '<') else np.full(len(rhs), np.inf))
+    constraints = LinearConstraint(A, np.concatenate(lower), np.concatenate(upper))
+    options = {'disp': output}
+    if time_limit is not None:
+        options['time_limit'] = time_limit
+    if mip_gap is not None:
+        options['mip_rel_gap'] = mip_gap
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    solution = milp(-problem['obj'], constraints=constraints, integrality=np.ones(len(problem['obj'])),
+                    bounds=Bounds(0, np.inf), options=options)  # milp minimizes
+    solve_time = time.perf_counter() - start
+
+    status = {0: 'optimal', 1: 'time_limit', 2: 'infeasible', 3: 'unbounded'}.get(solution.status, 'other')
+    X, n, Z = split_solution(problem, solution.x)
+    return {'status': status, 'profit': -solution.fun if solution.x is not None else None, 'X': X, 'n': n, 'Z': Z,
+            'gap': getattr(solution, 'mip_gap', None) if solution.x is not None else None,
+            'build_time': build_time, 'solve_time': solve_time}
+
+
+backends = {'gurobi': solve_gurobi, 'highs': solve_highs}
+
+
+def solve_problem(problem, backend='gurobi', **options):
+    """
+    Solves the problem with the named backend. Options are time_limit (s), mip_gap, threads and output.
+    """
+    if backend not in backends:
+        raise ValueError(f"unknown solver backend {backend!r}, expected one of {sorted(backends)}")
+    return backends[backend](problem, **options)
@@ -0,0 +1,204 @@
+import numpy as np
+import scipy.sparse as sp
+
+from flights_model import add_fleet_rows, add_rows, build_incidence_matrices
+
+'''
+# Stochastic demands
+# Demand scenarios are sampled in batch around the daily demands, and planned for with a two-stage model:
+# the flights n and the planes Z are decided first, for every scenario, and the passengers X of each
+# scenario are routed once its demands are known. The extensive form (every scenario's X in one model)
+# is built with sparse block matrices, in the format of flights_model.build_flights_problem, and solved
+# with solver_backends.solve_problem. Scenarios can be reduced to a few representatives by k-means.
+'''
+
+distributions = ['poisson', 'normal', 'lognormal', 'gamma_poisson']
+
+
+def sample_demands(demands_matrix, num_scenarios, distribution='poisson', cv=0.2, common_cv=0.0, seed=0):
+    """
+    Returns num_scenarios samples of the demands, an integer array (scenarios, days, cities, cities).
+
+    Each demand is drawn around its value in demands_matrix, its mean, from one of distributions:
+    poisson, normal or lognormal with coefficient of variation cv (rounded, at least 0), or gamma_poisson,
+    a Poisson with a gamma-distributed mean of coefficient of variation cv (a plain Poisson for cv 0). With common_cv > 0 the means of
+    a scenario's day are first multiplied by a common lognormal factor, for demands that move together.
+    """
+    if distribution not in distributions:
+        raise ValueError(f"unknown distribution {distribution!r}, expected one of {distributions}")
+    rng = np.random.default_rng(seed)
+    mean = np.broadcast_to(np.asarray(demands_matrix, dtype=float), (num_scenarios,) + np.shape(demands_matrix))
+
+    def lognormal_factor(size, factor_cv):
+        # Mean 1 and the given coefficient of variation
+        sigma = np.sqrt(np.log1p(factor_cv ** 2))
+        return rng.lognormal(-sigma ** 2 / 2, sigma, size)
+
+    if common_cv > 0:
+        mean = mean * lognormal_factor(mean.shape[:2] + (1, 1), common_cv)
+    if distribution == 'poisson':
+        samples = rng.poisson(mean)
+    elif distribution == 'normal':
+        samples = np.maximum(np.rint(rng.normal(mean, cv * mean)), 0)
+    elif distribution == 'lognormal':
+        samples = np.rint(mean * lognormal_factor(mean.shape, cv))
+    elif cv == 0:  # a gamma mean of no variance
+        samples = rng.poisson(mean)
+    else:
+        samples = rng.poisson(rng.gamma(1 / cv ** 2, mean * cv ** 2))
+    return samples.astype(np.int64)
+
+
+def reduce_scenarios(scenarios, num_representatives, probabilities=None, max_iterations=100, seed=0):
+    """
+    Returns num_representatives of the scenarios and their probabilities, by k-means on the demands.
+
+    Each representative is the scenario closest to the center of its cluster, with the probability of
+    the cluster. probabilities are those of the scenarios (equal if None).
+    """
+    num_scenarios = len(scenarios)
+    points = scenarios.reshape(num_scenarios, -1).astype(float)
+    weights = np.full(num_scenarios, 1 / num_scenarios) if probabilities is None else np.asarray(probabilities)
+    if num_representatives >= num_scenarios:
+        return scenarios, weights
+
+    rng = np.random.default_rng(seed)
+    centers = points[rng.choice(num_scenarios, num_representatives, replace=False)]
+    squared_norms = (points ** 2).sum(axis=1)
+    for _ in range(max_iterations):
+        distances = squared_norms[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+        cluster = distances.argmin(axis=1)
+        cluster_weights = np.bincount(cluster, weights=weights, minlength=num_representatives)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, cluster, points * weights[:, None])
+        nonempty = cluster_weights > 0
+        new_centers = centers.copy()
+        new_centers[nonempty] = sums[nonempty] / cluster_weights[nonempty, None]
+        if np.allclose(new_centers, centers):
+            break
+        centers = new_centers
+
+    distances = squared_norms[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    cluster = distances.argmin(axis=1)
+    cluster_weights = np.bincount(cluster, weights=weights, minlength=num_representatives)
+    representatives = []
+    for k in np.flatnonzero(cluster_weights > 0):
+        members = np.flatnonzero(cluster == k)
+        representatives.append(members[distances[members, k].argmin()])
+    return scenarios[representatives], cluster_weights[cluster_weights > 0] / weights.sum()
+
+
+def build_stochastic_problem(network, scenarios, probabilities, revenues_matrix, table_index, costs,
+                             plane_capacity=211):
+    """
+    Returns the extensive form of the two-stage model over the demand scenarios, as a problem of
+    build_flights_problem with the same constraints and, in addition, num_scenarios and probabilities.
+
+    The variables are X for each scenario (scenario * num_arcs * num_days + arc * num_days + day), then n and
+    Z as in build_flights_problem. Every scenario routes its own passengers X on the same flights n, and the
+    profit constraint of each flight arc holds on average over the scenarios (a flight may lose money in a
+    scenario with few passengers). The objective is the expected profit.
+    """
+    scenarios = np.asarray(scenarios)
+    probabilities = np.asarray(probabilities, dtype=float)
+    num_scenarios, num_days = scenarios.shape[:2]
+    arc_id = network['arc_id']
+    cities = network['cities']
+    num_arcs = len(network['arc_set'])
+    days_eye = sp.identity(num_days, format='csr')
+    scenarios_eye = sp.identity(num_scenarios, format='csr')
+
+    # Coefficients of the flight arcs
+    flight_ids = np.array([arc_id[arc] for arc in network['arc_leg']], dtype=np.int64)
+    ticket_price = np.array([revenues_matrix[table_index[depart]][table_index[arrive]]
+                             for (depart, arrive) in network['arc_leg'].values()], dtype=float)
+    flight_cost = costs.fuel[flight_ids] + costs.landing[flight_ids]  # per flight
+    aif = costs.aif[flight_ids]  # per passenger
+
+    num_x = num_scenarios * num_arcs * num_days
+    num_n = num_arcs * num_days
+    num_z = len(cities) * (num_days + 1)
+
+    # Objective - the expected profit
+    x_obj = np.zeros((num_arcs, num_days))
+    n_obj = np.zeros((num_arcs, num_days))
+    x_obj[flight_ids, :] = (ticket_price - aif)[:, None]
+    n_obj[flight_ids, :] = -flight_cost[:, None]
+    problem = {'obj': np.concatenate([np.outer(probabilities, x_obj.reshape(-1)).reshape(-1), n_obj.reshape(-1),
+                                      np.zeros(num_z)]),
+               'rows': [], 'num_arcs': num_arcs, 'num_days': num_days, 'num_cities': len(cities),
+               'num_scenarios': num_scenarios, 'probabilities': probabilities}
+
+    node_arc, layover, fleet_out, fleet_in = build_incidence_matrices(network)
+
+    sizes = (num_x, num_n, num_z)
+
+    # Flow conservation constraints of every scenario - supply nodes send their demand, the sink the day's total
+    node_id = {v: k for k, v in enumerate(network['node_set'])}
+    supply = [(node_id[v], table_index[i], table_index[j]) for v, (i, j) in network['supply_nodes'].items()]
+    supply_rows, origins, destinations = (np.array(column, dtype=np.int64) for column in zip(*supply))
+    node_demand = np.zeros((num_scenarios, len(node_id), num_days))
+    node_demand[:, supply_rows, :] = -scenarios[:, :, origins, destinations].transpose(0, 2, 1)
+    node_demand[:, node_id['t'], :] = scenarios.sum(axis=(2, 3))
+    add_rows(problem, sizes, [sp.kron(scenarios_eye, sp.kron(node_arc, days_eye), format='csr'), None, None], '=',
+             node_demand.reshape(-1))
+
+    # Flow conservation - ensure those on layovers make their destination, in every scenario
+    if layover.shape[0] > 0:
+        add_rows(problem, sizes, [sp.kron(scenarios_eye, sp.kron(layover, days_eye), format='csr'), None, None], '=',
+                 np.zeros(num_scenarios * layover.shape[0] * num_days))
+
+    # Capacity of the flights in every scenario, and profit of the flights on average
+    flight_vars = (flight_ids[:, None] * num_days + np.arange(num_days)).reshape(-1)
+    num_rows = len(flight_vars)
+    select = sp.csr_matrix((np.ones(num_rows), (np.arange(num_rows), flight_vars)), shape=(num_rows, num_n))
+    add_rows(problem, sizes, [sp.kron(scenarios_eye, select, format='csr'),
+                              sp.kron(np.ones((num_scenarios, 1)), -plane_capacity * select, format='csr'), None], '<',
+             np.zeros(num_scenarios * num_rows))
+    add_rows(problem, sizes,
+             [sp.kron(probabilities[None, :], -sp.diags(np.repeat(ticket_price - aif, num_days)) @ select, format='csr'),
+              sp.diags(np.repeat(flight_cost, num_days)) @ select, None], '<', np.zeros(num_rows))
+
+    # Enough planes - Z[c, day] covers the departures, and Z[c, day + 1] is what is left plus arrivals
+    add_fleet_rows(problem, sizes, fleet_out, fleet_in, num_days)
+
+    return problem
+
+
+if __name__ == "__main__":
+    import time
+
+    from base_tables import load_instance
+    from cost_tables import CostTables
+    from flights_model import build_flights_problem
+    from network import build_network
+    from solver_backends import solve_problem
+
+    instance = load_instance()
+    network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+    costs = CostTables(network, instance['distances'], instance['fuel_prices'], instance['landing_fees'],
+                       instance['aif_rates'], instance['city_names'])
+    demands_matrix = instance['demands_matrix']
+    data = (instance['revenues_matrix'], instance['table_index'], costs, 211)
+    deterministic = solve_problem(build_flights_problem(network, demands_matrix, *data), 'highs')
+    print(f"Deterministic demands: profit {deterministic['profit']:.1f}, {int(deterministic['n'].sum())} flights")
+
+    start = time.perf_counter()
+    scenarios = sample_demands(demands_matrix, 1000, 'gamma_poisson', cv=0.3, common_cv=0.1)
+    sample_time = time.perf_counter() - start
+    start = time.perf_counter()
+    problem = build_stochastic_problem(network, scenarios, np.full(1000, 1 / 1000), *data)
+    build_time = time.perf_counter() - start
+    num_rows = sum(A.shape[0] for A, sense, rhs in problem['rows'])
+    print(f"1000 scenarios: sampled in {sample_time:.3f}s, extensive form of {len(problem['obj'])} variables and "
+          f"{num_rows} constraints built in {build_time:.2f}s")
+
+    for num_representatives in [1, 5, 20]:
+        start = time.perf_counter()
+        representatives, probabilities = reduce_scenarios(scenarios, num_representatives)
+        problem = build_stochastic_problem(network, representatives, probabilities, *data)
+        reduce_time = time.perf_counter() - start
+        result = solve_problem(problem, 'highs', time_limit=120)
+        print(f"{num_representatives:>3} representatives: {result['status']}, expected profit {result['profit']:.1f}, "
+              f"{int(result['n'].sum())} flights, reduced and built in {reduce_time:.2f}s, "
+              f"solved in {result['solve_time']:.2f}s")
@@ -0,0 +1,90 @@
+import math
+import random
+
+'''
+# Synthetic instances
+# Random airports, distances, costs, demands and revenues of any size, in the same
+# format as the data used by passenger_demands.py
+'''
+
+def generate_instance(num_airports, num_hubs, num_days, max_direct_km=1500, seed=0, demand_density=1.0):
+    """
+    Generates a random instance with the given number of airports, hubs and days.
+
+    Airports are placed at random in a 5000 km x 2000 km region. Hubs have routes to every
+    airport, other airports only have routes to airports at most max_direct_km away. Each pair
+    of airports has demand on a day with probability demand_density.
+    """
+    rng = random.Random(seed)
+
+    width = len(str(num_airports - 1))
+    airports = ['A' + str(k).zfill(width) for k in range(num_airports)]
+    hubs = airports[:num_hubs]
+    location = {a: (rng.uniform(0, 5000), rng.uniform(0, 2000)) for a in airports}
+
+    # Distance between airports in km, one entry per route (either direction)
+    distances = {}
+    for k, i in enumerate(airports):
+        for j in airports[k + 1:]:
+            distance = round(math.dist(location[i], location[j]))
+            if i in hubs or j in hubs or distance <= max_direct_km:
+                distances[(i, j)] = max(distance, 1)
+
+    # Costs at each airport, in the same ranges as the real data
+    fuel_prices = {a: round(rng.uniform(1.10, 1.35), 2) for a in airports}
+    city_names = {a: a for a in airports}
+    landing_fees = {city_names[a]: round(rng.uniform(7.0, 19.0), 2) for a in airports}
+    aif_rates = {city_names[a]: rng.randint(20, 35) for a in airports}
+
+    # Daily demands (hubs see more passengers) and ticket revenues proportional to distance
+    demands_matrix = []
+    for day_num in range(num_days):
+        day_demands_matrix = []
+        for i in airports:
+            row = []
+            for j in airports:
+                if i == j or (demand_density < 1 and rng.random() >= demand_density):
+                    row.append(0)
+                else:
+                    scale = 4 if (i in hubs or j in hubs) else 1
+                    row.append(rng.randint(0, 200 * scale))
+            day_demands_matrix.append(row)
+        demands_matrix.append(day_demands_matrix)
+
+    revenues_matrix = []
+    for i in airports:
+        row = []
+        for j in airports:
+            if i == j:
+                row.append(0)
+            else:
+                row.append(round(100 + 0.08 * math.dist(location[i], location[j])))
+        revenues_matrix.append(row)
+
+    return {
+        'airports': airports,
+        'hubs': hubs,
+        'distances': distances,
+        'fuel_prices': fuel_prices,
+        'city_names': city_names,
+        'landing_fees': landing_fees,
+        'aif_rates': aif_rates,
+        'table_index': {a: k for k, a in enumerate(airports)},
+        'demands_matrix': demands_matrix,
+        'total_daily_demands': [sum(sum(row) for row in day) for day in demands_matrix],
+        'revenues_matrix': revenues_matrix,
+    }
+
+
+def write_instance_files(instance, demands_path, revenues_path):
+    """
+    Writes the demands and ticket revenues of an instance in the text format of demands.txt and ticket_revenues.txt.
+    """
+    with open(demands_path, "w") as f:
+        for day_demands_matrix in instance['demands_matrix']:
+            for row in day_demands_matrix:
+                f.write(",".join(str(value) for value in row) + "\n")
+            f.write("end\n")
+    with open(revenues_path, "w") as f:
+        for row in instance['revenues_matrix']:
+            f.write(",".join(str(value) for value in row) + "\n")
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# The modules are at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def instance():
+    """
+    A small synthetic instance: the network, demands, revenues, table index and cost tables.
+    """
+    return _instance()
+
+
+@pytest.fixture(scope="session")
+def sparse_instance():
+    """
+    The same as instance, with demand for only some of the pairs each day.
+    """
+    return _instance(demand_density=0.4)
+
+
+def _instance(**kwargs):
+    from network import build_network
+    from cost_tables import CostTables
+    from synthetic_instances import generate_instance
+
+    instance = generate_instance(5, 1, 2, **kwargs)
+    network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+    costs = CostTables(network, instance['distances'], instance['fuel_prices'], instance['landing_fees'],
+                       instance['aif_rates'], instance['city_names'])
+    return network, instance['demands_matrix'], instance['revenues_matrix'], instance['table_index'], costs
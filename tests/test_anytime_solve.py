@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+gp = pytest.importorskip("gurobipy")
+from gurobipy import GRB
+
+from anytime_solve import solve_anytime
+from solve_instrumentation import mip_gap
+
+
+def test_mip_gap():
+    assert mip_gap(110, 100) == pytest.approx(0.1)
+    assert mip_gap(-90, -100) == pytest.approx(0.1)
+    assert mip_gap(0, 0) == 0
+    assert mip_gap(8, 0) == math.inf
+    assert not mip_gap(8, 0) <= 0.01  # never within a target gap
+
+
+def test_gap_of_a_zero_incumbent():
+    model = gp.Model()
+    model.Params.OutputFlag = 0
+    x = model.addVars(3, vtype=GRB.BINARY)
+    model.setObjective(5 * x[0] + 4 * x[1] + 3 * x[2], GRB.MAXIMIZE)
+    model.addConstr(2 * x[0] + 3 * x[1] + x[2] <= 4.5)
+    model.addConstr(3 * x[0] + 2 * x[1] + 2 * x[2] <= 4.5)
+    for v in x.values():
+        v.Start = 0
+    # Stop at the root with the start as the only solution, below a finite bound
+    for name, value in [('NodeLimit', 0), ('Heuristics', 0), ('Presolve', 0), ('Cuts', 0)]:
+        model.setParam(name, value)
+    result = solve_anytime(model, target_gap=0.01)
+    assert result['objective'] == 0
+    assert math.isfinite(result['bound']) and result['bound'] > 0
+    assert result['gap'] == math.inf == model.MIPGap
+    assert result['pool'][0]['gap'] == math.inf
+
+
+def test_infeasible_or_unbounded():
+    model = gp.Model()
+    model.Params.OutputFlag = 0
+    x = model.addVar(vtype=GRB.INTEGER)
+    y = model.addVar(vtype=GRB.INTEGER, lb=-GRB.INFINITY)
+    model.setObjective(x + y, GRB.MAXIMIZE)
+    model.addConstr(x >= 3)
+    model.addConstr(x <= 1)
+    assert solve_anytime(model)['status'] == 'infeasible_or_unbounded'  # presolve cannot tell which
+    model.Params.DualReductions = 0
+    result = solve_anytime(model)
+    assert result['status'] == 'infeasible'
+    assert result['objective'] is None and result['pool'] == []
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("gurobipy")
+from column_generation import solve_column_generation
+from cost_tables import CostTables
+from network import build_leg_network
+from synthetic_instances import generate_instance
+
+
+@pytest.fixture(scope="module")
+def legs_instance():
+    instance = generate_instance(5, 2, 2)
+    legs = build_leg_network(instance['airports'], instance['distances'])
+    costs = CostTables(legs, instance['distances'], instance['fuel_prices'], instance['landing_fees'],
+                       instance['aif_rates'], instance['city_names'])
+    return instance, legs, costs
+
+
+@pytest.mark.parametrize("hubs_only", [True, False])
+def test_itineraries_flown(legs_instance, hubs_only):
+    instance, legs, costs = legs_instance
+    connections = instance['hubs'] if hubs_only else None
+    result = solve_column_generation(legs, instance['demands_matrix'], instance['revenues_matrix'],
+                                     instance['table_index'], costs, connections=connections)
+    assert result['iterations'][-1]["Columns Added"] == 0  # no itinerary left to price in
+    assert result['profit'] <= result['lp_bound'] * (1 + 1e-9) and result['gap'] >= 0
+
+    assert result['itineraries']
+    flown = {}
+    for airports, day_num, passengers in result['itineraries']:
+        assert 2 <= len(airports) <= 3  # at most max_legs legs
+        assert all(f"{i}-{j}" in legs['arc_leg'] for i, j in zip(airports[:-1], airports[1:]))
+        if hubs_only:
+            assert set(airports[1:-1]) <= set(instance['hubs'])
+        key = (airports[0], airports[-1], day_num)
+        flown[key] = flown.get(key, 0) + passengers
+    table_index = instance['table_index']
+    for (origin, destination, day_num), passengers in flown.items():
+        assert passengers <= instance['demands_matrix'][day_num][table_index[origin]][table_index[destination]]
+
+
+def test_more_connections_raise_the_bound(legs_instance):
+    instance, legs, costs = legs_instance
+    data = (legs, instance['demands_matrix'], instance['revenues_matrix'], instance['table_index'], costs)
+    hubs_bound = solve_column_generation(*data, connections=instance['hubs'])['lp_bound']
+    direct_bound = solve_column_generation(*data, max_legs=1)['lp_bound']
+    assert direct_bound <= hubs_bound * (1 + 1e-9)
+    assert hubs_bound <= solve_column_generation(*data)['lp_bound'] * (1 + 1e-9)
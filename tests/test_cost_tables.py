@@ -0,0 +1,39 @@
+import numpy as np
+
+import base_tables
+from cost_tables import CostTables
+from network import build_network
+
+
+def make_tables():
+    network = build_network(base_tables.airports, base_tables.hubs, base_tables.distances)
+    tables = (dict(base_tables.fuel_prices), dict(base_tables.landing_fees), dict(base_tables.aif_rates))
+    return network, tables, CostTables(network, base_tables.distances, *tables, base_tables.city_names)
+
+
+def test_coefficients():
+    network, (fuel_prices, landing_fees, aif_rates), costs = make_tables()
+    k = network['arc_id']['HM-M']
+    assert costs.fuel[k] == 804 * costs.fuel_consumption_per_km * fuel_prices['H']
+    assert costs.landing[k] == landing_fees['Montreal'] * costs.mtow_tons
+    assert costs.aif[k] == aif_rates['Halifax']
+    sink = network['arc_id']['H-t']
+    assert costs.fuel[sink] == costs.landing[sink] == costs.aif[sink] == 0
+
+
+def test_refresh_recomputes_the_arcs_that_changed():
+    network, (fuel_prices, landing_fees, aif_rates), costs = make_tables()
+    assert len(costs.refresh()) == 0
+
+    fuel_prices['T'] = 2.0
+    landing_fees['Halifax'] = 20.0
+    changed = costs.refresh()
+    expected = {network['arc_id'][arc] for arc, (depart, arrive) in network['arc_leg'].items()
+                if depart == 'T' or arrive == 'H'}  # fuel by departure, landing fees by arrival
+    assert set(changed.tolist()) == expected
+    assert len(costs.refresh()) == 0  # already up to date
+
+    # The same arrays as tables built from scratch with the new values
+    fresh = CostTables(network, base_tables.distances, fuel_prices, landing_fees, aif_rates, base_tables.city_names)
+    for name in ('fuel', 'landing', 'aif'):
+        np.testing.assert_array_equal(getattr(costs, name), getattr(fresh, name))
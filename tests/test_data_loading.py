@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from data_loading import (convert_demands_to_npy, convert_revenues_to_npy, iter_demand_days, load_demands,
+                          load_npy, load_revenues)
+
+demands_text = "0,5,7\n1,0,2\n3,4,0\nend\n0,1,1\n2,0,2\n3,3,0\nend\n"
+revenues_text = "0,100,200\n110,0,120\n210,130,0\n"
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_iter_demand_days(tmp_path):
+    days = list(iter_demand_days(write(tmp_path / "demands.txt", demands_text)))
+    assert days == [[[0, 5, 7], [1, 0, 2], [3, 4, 0]], [[0, 1, 1], [2, 0, 2], [3, 3, 0]]]
+
+
+@pytest.mark.parametrize("text", ["0,5\n1,0\nend\n0,1,1\n", "0,x,7\n1,0,2\n3,4,0\nend\n", "0,5,7\n1,0,2\nend\n",
+                                  "0,5,7\n1,0,2\n3,4,0\n"])
+def test_malformed_demands(tmp_path, text):
+    with pytest.raises(ValueError):
+        load_demands(write(tmp_path / "demands.txt", text), num_cities=3)
+
+
+def test_npy_round_trip(tmp_path):
+    airports = ['H', 'M', 'T']
+    demands_path = str(tmp_path / "demands.npy")
+    revenues_path = str(tmp_path / "revenues.npy")
+    convert_demands_to_npy(write(tmp_path / "demands.txt", demands_text), demands_path, airports)
+    convert_revenues_to_npy(write(tmp_path / "revenues.txt", revenues_text), revenues_path, airports)
+
+    demands_matrix, totals = load_demands(demands_path, 3, airports)
+    text_demands, text_totals = load_demands(str(tmp_path / "demands.txt"), 3)
+    assert np.array_equal(demands_matrix, text_demands)
+    assert totals == text_totals
+    assert load_revenues(revenues_path, 3, airports) == load_revenues(str(tmp_path / "revenues.txt"), 3)
+
+
+def test_npy_airport_order_is_checked(tmp_path):
+    npy_path = str(tmp_path / "demands.npy")
+    convert_demands_to_npy(write(tmp_path / "demands.txt", demands_text), npy_path, ['H', 'M', 'T'])
+    with pytest.raises(ValueError):
+        load_npy(npy_path, 3, airports=['M', 'H', 'T'])  # same airports, other order
+    with pytest.raises(ValueError):
+        load_demands(npy_path, 3, airports=['H', 'M', 'V'])
+    assert load_npy(npy_path, 3, airports=['H', 'M', 'T'])[1] == ['H', 'M', 'T']
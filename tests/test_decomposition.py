@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("gurobipy")
+from decomposition import fleet_feasible_profit, solve_lagrangian
+from flights_model import build_flights_model
+
+
+def full_profit(instance, initial_fleet=None):
+    model, X, n, Z = build_flights_model(*instance)
+    model.Params.OutputFlag = 0
+    for c, planes in (initial_fleet or {}).items():
+        Z[c, 0].LB = Z[c, 0].UB = planes
+    model.optimize()
+    profit = model.ObjVal
+    model.dispose()
+    return profit
+
+
+def test_fleet_feasible_profit():
+    days = [{'Profit': 10, 'Leaving': {'A': 2, 'B': 0}, 'Arriving': {'A': 0, 'B': 2}},
+            {'Profit': 5, 'Leaving': {'A': 1, 'B': 2}, 'Arriving': {'A': 2, 'B': 1}}]
+    assert fleet_feasible_profit(days, ['A', 'B']) == 15
+    assert fleet_feasible_profit(days, ['A', 'B'], {'A': 3, 'B': 0}) == 15
+    # The planes arriving at A on day 1 only leave on day 2
+    assert fleet_feasible_profit(days, ['A', 'B'], {'A': 2, 'B': 1}) is None
+
+
+def test_free_fleet_converges_at_once(instance):
+    result = solve_lagrangian(*instance, num_workers=2)
+    assert result['converged'] and len(result['iterations']) == 1
+    assert result['profit'] == pytest.approx(full_profit(instance), rel=1e-6)
+
+
+def test_fixed_fleet_bounds_the_optimum(instance):
+    initial_fleet = {c: 1 for c in instance[0]['cities']}
+    result = solve_lagrangian(*instance, initial_fleet=initial_fleet, max_iterations=10, num_workers=2)
+    profit = full_profit(instance, initial_fleet)
+    assert result['profit'] <= profit * (1 + 1e-9) and result['upper_bound'] >= profit * (1 - 1e-9)
+    assert all(row['Bound'] >= result['upper_bound'] for row in result['iterations'])
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from flights_model import build_flights_problem
+from solver_backends import arc_flights, solve_problem
+
+
+def test_matrix_problem_matches_gurobipy_model(instance):
+    pytest.importorskip("gurobipy")
+    from flights_model import build_flights_model
+
+    model, X, n, Z = build_flights_model(*instance)
+    model.Params.OutputFlag = 0
+    model.optimize()
+    result = solve_problem(build_flights_problem(*instance), 'highs', mip_gap=1e-9)
+    assert result['profit'] == pytest.approx(model.ObjVal, rel=1e-6)
+
+
+@pytest.mark.parametrize("shared_legs", [False, True])
+def test_pruned_problem(sparse_instance, shared_legs):
+    problem = build_flights_problem(*sparse_instance, shared_legs=shared_legs)
+    pruned = build_flights_problem(*sparse_instance, shared_legs=shared_legs, prune=True)
+    columns = pruned['columns']
+    assert pruned['num_vars'] == len(problem['obj']) > len(columns)
+    np.testing.assert_array_equal(pruned['obj'], problem['obj'][columns])
+    for sense in ('<', '=', '>'):  # the rows of the full problem over the columns kept, the empty ones left out
+        A = sp.vstack([A for A, row_sense, rhs in problem['rows'] if row_sense == sense], format='csr')[:, columns]
+        rhs = np.concatenate([rhs for A, row_sense, rhs in problem['rows'] if row_sense == sense])
+        nonempty = np.diff(A.indptr) > 0
+        pruned_A = sp.vstack([A for A, row_sense, rhs in pruned['rows'] if row_sense == sense], format='csr')
+        assert (pruned_A != A[nonempty]).nnz == 0
+        np.testing.assert_array_equal(np.concatenate([rhs for A, row_sense, rhs in pruned['rows']
+                                                      if row_sense == sense]), rhs[nonempty])
+
+    full_result = solve_problem(problem, 'highs', mip_gap=1e-9)
+    pruned_result = solve_problem(pruned, 'highs', mip_gap=1e-9)
+    assert pruned_result['profit'] == pytest.approx(full_result['profit'], rel=1e-6)
+    assert pruned_result['n'].shape == full_result['n'].shape
+
+
+def test_pruned_model(sparse_instance):
+    pytest.importorskip("gurobipy")
+    from flights_model import build_flights_model
+    from mip_start import greedy_solution, set_start
+    from model_tightening import compute_bounds, tighten_model
+    from solution_export import solution_arrays
+
+    network, demands_matrix, revenues_matrix, table_index, costs = sparse_instance
+    x_ub = compute_bounds(network, demands_matrix, table_index)[0]
+    results = []
+    for prune in (False, True):
+        model, X, n, Z = build_flights_model(*sparse_instance, prune=prune)
+        model.Params.OutputFlag = 0
+        tighten_model(model, X, n, Z, network, demands_matrix, table_index)
+        set_start(model, X, n, Z, network, greedy_solution(*sparse_instance))
+        model.optimize()
+        passengers, flights = solution_arrays(X, n, network, len(demands_matrix), model.getAttr("X", model.getVars()))
+        results.append((model.ObjVal, model.NumVars, model.NumConstrs, passengers, flights))
+        model.dispose()
+    (profit, num_vars, num_constrs, passengers, flights), (pruned_profit, pruned_vars, pruned_constrs, *arrays) = results
+    assert set(X) == {(arc, day_num) for arc, k in network['arc_id'].items() for day_num in range(len(demands_matrix))
+                      if x_ub[k, day_num] > 0}
+    assert set(n) == {key for key in X if key[0] in network['arc_leg']}
+    assert pruned_profit == pytest.approx(profit, rel=1e-6)
+    assert pruned_vars < num_vars and pruned_constrs < num_constrs
+    for pruned_array in arrays:
+        assert np.all(pruned_array[x_ub == 0] == 0)
+
+
+def test_shared_legs_use_the_fleet(instance):
+    network = instance[0]
+    problem = build_flights_problem(*instance, shared_legs=True)
+    result = solve_problem(problem, 'highs', mip_gap=1e-9)
+    city_id = {c: k for k, c in enumerate(network['cities'])}
+    balance = np.zeros_like(result['Z'][:, 1:])
+    for k, (depart, arrive) in enumerate(problem['legs']):  # the second legs of connections included
+        balance[city_id[depart]] -= result['n'][k]
+        balance[city_id[arrive]] += result['n'][k]
+    np.testing.assert_allclose(result['Z'][:, :-1] + balance, result['Z'][:, 1:])
+
+
+def test_arc_flights(instance):
+    network = instance[0]
+    problem = build_flights_problem(*instance, shared_legs=True)
+    result = solve_problem(problem, 'highs', mip_gap=1e-9)
+    flights = arc_flights(problem, network, result['X'], result['n'])
+    assert flights.shape == (problem['num_arcs'], problem['num_days'])
+    for k, leg in enumerate(problem['legs']):
+        ids = [network['arc_id'][arc] for arc, arc_leg in network['arc_leg'].items() if arc_leg == leg]
+        np.testing.assert_allclose(flights[ids].sum(axis=0), result['n'][k])
+        assert np.all((flights[ids] > 0).sum(axis=0) <= 1)  # on one arc a day
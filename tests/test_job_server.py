@@ -0,0 +1,58 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+import base_tables
+import job_server
+from job_server import JobServer
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+demands_path = os.path.join(repo, "demands.txt")
+revenues_path = os.path.join(repo, "ticket_revenues.txt")
+
+
+base = {name: getattr(base_tables, name) for name in ('airports', 'hubs', 'distances', 'fuel_prices', 'landing_fees',
+                                                      'aif_rates', 'city_names', 'table_index')}
+
+
+@pytest.fixture
+def server():
+    # handle answers requests it rejects without the worker pool of JobServer.start
+    return JobServer(base)
+
+
+@pytest.mark.parametrize("message", [[], "x", 1, None,
+                                     {'op': 'submit', 'job': []}, {'op': 'submit', 'job': "x"},
+                                     {'op': 'submit', 'job': 1}, {'op': 'submit', 'job': {'demands': 1}},
+                                     {'op': 'submit', 'job': {'demands': "demands.txt", 'unknown': 1}},
+                                     {'op': 'status', 'id': []}, {'op': 'result', 'id': "1"}, {'op': 'cancel'},
+                                     {'op': 'stop'}])
+def test_invalid_requests_get_an_error_reply(server, message):
+    reply = asyncio.run(server.handle(message))
+    assert reply['ok'] is False
+    assert isinstance(reply['error'], str)
+
+
+@pytest.mark.parametrize("changes", [{'plane_capacity': "abc"}, {'plane_capacity': 0}, {'plane_capacity': True},
+                                     {'time_budget': "1"}, {'time_budget': -1}, {'target_gap': [0.01]},
+                                     {'fuel_prices': []}, {'fuel_prices': {'X': 1.2}}, {'fuel_prices': {'H': "1.2"}},
+                                     {'aif_rates': {'Halifax': None}}, {'landing_fees': {'H': 11.0}}])
+def test_invalid_job_values_are_rejected(server, changes):
+    job = dict({'demands': demands_path, 'revenues': revenues_path}, **changes)
+    reply = asyncio.run(server.handle({'op': 'submit', 'job': job}))
+    assert reply['ok'] is False
+
+
+def test_worker_recovers_from_a_failed_build():
+    pytest.importorskip("gurobipy")
+    job_server._init_worker(base, 1)
+    job = {'demands': demands_path, 'revenues': revenues_path, 'time_budget': 60}
+    cancel = threading.Event()
+    first = job_server._run_job(job, cancel)
+    with pytest.raises(TypeError):  # a capacity submit would reject, given to the worker directly
+        job_server._run_job(dict(job, plane_capacity="abc"), cancel)
+    assert job_server._worker['model'] is None and job_server._worker['model_key'] is None
+    again = job_server._run_job(job, cancel)
+    assert again['profit'] == pytest.approx(first['profit'])
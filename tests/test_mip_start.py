@@ -0,0 +1,36 @@
+import pytest
+
+gp = pytest.importorskip("gurobipy")
+from gurobipy import GRB
+
+from flights_model import build_flights_model, build_flights_model_matrix
+from mip_start import greedy_solution, set_start
+
+
+@pytest.mark.parametrize("build, kwargs", [(build_flights_model, {}), (build_flights_model, {'prune': True}),
+                                           (build_flights_model_matrix, {})])
+@pytest.mark.parametrize("fixture", ["instance", "sparse_instance"])
+def test_greedy_solution_is_feasible(request, fixture, build, kwargs):
+    data = request.getfixturevalue(fixture)
+    network = data[0]
+    solution = greedy_solution(*data)
+    assert solution['profit'] > 0
+
+    model, X, n, Z = build(*data, **kwargs)
+    model.Params.OutputFlag = 0
+    model.optimize()
+    optimum = model.ObjVal
+    assert solution['profit'] <= optimum + 1e-6 * abs(optimum)
+
+    # Fixed to the start, the model is feasible with the profit of the greedy solution
+    set_start(model, X, n, Z, network, solution)
+    model.update()
+    variables = model.getVars()
+    starts = model.getAttr("Start", variables)
+    assert GRB.UNDEFINED not in starts  # every variable given a value
+    model.setAttr("LB", variables, starts)
+    model.setAttr("UB", variables, starts)
+    model.optimize()
+    assert model.Status == GRB.OPTIMAL
+    assert model.ObjVal == pytest.approx(solution['profit'], rel=1e-6)
+    model.dispose()
@@ -0,0 +1,58 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("gurobipy")
+from flights_model import build_flights_model
+from model_cache import ModelCache, input_key, solve_cached
+from solution_export import named_solution_arrays, solution_arrays
+
+
+def test_input_key(instance):
+    network, demands_matrix, revenues_matrix, table_index, costs = instance
+    key, structure, signature = input_key("flights_model", network, demands_matrix, revenues_matrix, costs, 211)
+    assert input_key("flights_model", network, demands_matrix, revenues_matrix, costs, 211)[:2] == (key, structure)
+
+    # Other demands: the same structure, another key
+    demands = np.array(demands_matrix)
+    demands[0, 0, 1] += 1
+    other_key, other_structure, other_signature = input_key("flights_model", network, demands, revenues_matrix,
+                                                            costs, 211)
+    assert other_structure == structure and other_key != key
+    assert np.count_nonzero(other_signature != signature) == 1
+
+    # Another plane capacity or formulation
+    assert input_key("flights_model", network, demands_matrix, revenues_matrix, costs, 200)[0] != key
+    assert input_key("flights_model_tightened", network, demands_matrix, revenues_matrix, costs, 211)[1] != structure
+
+
+def test_solve_cached(instance, tmp_path):
+    network, demands_matrix, revenues_matrix, table_index, costs = instance
+    key, structure, signature = input_key("flights_model", network, demands_matrix, revenues_matrix, costs, 211)
+    cache = ModelCache(str(tmp_path))
+    built = []
+
+    def build():
+        model, X, n, Z = build_flights_model(*instance)
+        model.Params.OutputFlag = 0
+        built.append((model, X, n))
+        return model
+
+    profit, values, cached = solve_cached(build, key, structure, signature, cache)
+    assert not cached and len(built) == 1
+    assert sorted(os.listdir(tmp_path)) == sorted([key + ".npy", key + ".sol", "index.json"])
+    with open(tmp_path / "index.json") as f:
+        assert json.load(f)[key]["profit"] == profit
+
+    # A hit neither builds nor solves the model, in this cache or one reading the same directory
+    for reader in (cache, ModelCache(str(tmp_path))):
+        cached_profit, cached_values, cached = solve_cached(build, key, structure, signature, reader)
+        assert cached and len(built) == 1
+        assert cached_profit == profit
+    model, X, n = built[0]
+    num_days = len(demands_matrix)
+    for array, cached_array in zip(solution_arrays(X, n, network, num_days, model.getAttr("X", model.getVars())),
+                                   named_solution_arrays(cached_values, network, num_days)):
+        np.testing.assert_allclose(cached_array, array)
@@ -0,0 +1,25 @@
+import numpy as np
+
+from flights_model import build_flights_problem
+from model_tightening import compute_bounds
+from solver_backends import solve_problem
+
+
+def test_bounds_of_the_supply_and_sink_arcs(instance):
+    network, demands_matrix, revenues_matrix, table_index, costs = instance
+    x_ub, n_ub, z_ub = compute_bounds(network, demands_matrix, table_index)
+    demands = np.asarray(demands_matrix)
+    for v, (i, j) in network['supply_nodes'].items():
+        np.testing.assert_array_equal(x_ub[network['arc_id'][v + '-t']], demands[:, table_index[i], table_index[j]])
+    for c in network['cities']:
+        np.testing.assert_array_equal(x_ub[network['arc_id'][c + '-t']], demands[:, :, table_index[c]].sum(axis=1))
+    assert z_ub.shape == (len(network['cities']), len(demands_matrix) + 1)
+
+
+def test_optimal_plan_is_within_the_bounds(instance):
+    network, demands_matrix, revenues_matrix, table_index, costs = instance
+    x_ub, n_ub, z_ub = compute_bounds(network, demands_matrix, table_index)
+    result = solve_problem(build_flights_problem(*instance), 'highs', mip_gap=1e-9)
+    assert np.all(result['X'] <= x_ub)
+    assert np.all(result['n'] <= n_ub)
+    assert not np.any(n_ub[[network['arc_id'][arc] for arc in network['arc_set'] if arc.endswith('-t')]])
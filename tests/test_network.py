@@ -0,0 +1,46 @@
+import pytest
+
+import base_tables
+from network import build_arc_index, build_digraph, build_network
+
+
+def test_arc_index():
+    cities, arc_set, node_set = build_digraph()
+    out_arcs, in_arcs = build_arc_index(arc_set, node_set)
+    for v in node_set:  # the arcs the old loop found by splitting every arc, sink arcs included
+        assert out_arcs[v] == [arc for arc in arc_set if arc.split("-")[0] == v]
+        assert in_arcs[v] == [arc for arc in arc_set if arc.split("-")[1] == v]
+    assert len(in_arcs['t']) == sum(arc.endswith('-t') for arc in arc_set) > 0
+
+
+def test_build_network():
+    network = build_network(base_tables.airports, base_tables.hubs, base_tables.distances)
+    airports = base_tables.airports
+    assert len(network['supply_nodes']) == len(airports) * (len(airports) - 1)
+    assert set(network['node_set']) == set(airports) | {'T*', 'M*', 't'} | set(network['supply_nodes'])
+
+    for arc, k in network['arc_id'].items():
+        assert network['arc_set'][k] == arc
+        tail, head = arc.split("-")
+        assert arc in network['out_arcs'][tail] and arc in network['in_arcs'][head]
+    assert sum(map(len, network['out_arcs'].values())) == len(network['arc_set'])
+
+    # H-M has a route, H-V connects through both hubs
+    assert network['arc_leg']['HM-M'] == ('H', 'M')
+    assert network['arc_leg']['HV-T*'] == ('H', 'T') and network['arc_leg']['T*-V'] == ('T', 'V')
+    assert 'HV-M*' in network['layover_arcs']['M*-V']
+    assert 'HV-V' not in network['arc_id']
+
+
+def test_network_matches_the_digraph():
+    cities, arc_set, node_set = build_digraph()
+    network = build_network(cities, ['T', 'M'], base_tables.distances)
+    assert sorted(network['arc_set']) == sorted(arc_set)  # sink arcs "i-t" and "ij-t" included
+    assert sorted(network['node_set']) == sorted(node_set)
+
+
+@pytest.mark.parametrize("airports, hubs", [(['A', 'BB'], []), (['A', 't'], []), (['A', 'B*'], []),
+                                            (['A', 'B'], ['C'])])
+def test_invalid_airports(airports, hubs):
+    with pytest.raises(ValueError):
+        build_network(airports, hubs, {})
@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pytest
+
+import base_tables
+from base_tables import airports, fuel_prices, landing_fees, aif_rates, city_names
+from parallel_sweeps import run_sweep, scenario_grid
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+base_costs = (fuel_prices,
+              {c: landing_fees[city_names[c]] for c in airports},
+              {c: aif_rates[city_names[c]] for c in airports})
+
+
+def test_scenario_grid():
+    scenarios = scenario_grid(airports, base_costs, fuel_price_range={'M': [1.0, 1.5]},
+                              aif_rate_range={'H': [0.0, 1.0, 2.0]})
+    assert scenarios.shape == (6, 3 * len(airports))
+    m, h = airports.index('M'), 2 * len(airports) + airports.index('H')
+    assert sorted(zip(scenarios[:, m], scenarios[:, h])) == [(a, b) for a in [1.0, 1.5] for b in [0.0, 1.0, 2.0]]
+    others = [k for k in range(scenarios.shape[1]) if k not in (m, h)]
+    base_row = [table[c] for table in base_costs for c in airports]
+    np.testing.assert_allclose(scenarios[:, others], np.array([base_row] * 6)[:, others])
+
+
+@pytest.fixture
+def in_repo(monkeypatch):
+    pytest.importorskip("gurobipy")
+    monkeypatch.chdir(repo)  # the spawned workers read demands.txt and ticket_revenues.txt
+
+
+def test_run_sweep(in_repo):
+    scenarios = scenario_grid(airports, base_costs, fuel_price_range={'M': [1.0, 1.5]})
+    table = run_sweep(scenarios, airports, num_workers=1)
+    assert [row['scenario'] for row in table] == [0, 1]
+    assert [row['fuel_prices_M'] for row in table] == [1.0, 1.5]
+    assert all(row['status'] == 2 for row in table)  # GRB.OPTIMAL
+    assert table[0]['profit'] >= table[1]['profit']  # dearer fuel in Montreal
+
+
+def test_run_sweep_checks_the_city_order(in_repo):
+    scenarios = scenario_grid(airports, base_costs)
+    with pytest.raises(ValueError):
+        run_sweep(scenarios, list(reversed(base_tables.airports)), num_workers=1)
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("gurobipy")
+from cost_tables import CostTables
+from flights_model import build_flights_model
+from network import build_network
+from rolling_horizon import solve_rolling_horizon
+from synthetic_instances import generate_instance
+
+
+@pytest.fixture(scope="module")
+def data():
+    instance = generate_instance(4, 1, 5)
+    network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+    costs = CostTables(network, instance['distances'], instance['fuel_prices'], instance['landing_fees'],
+                       instance['aif_rates'], instance['city_names'])
+    return network, instance['demands_matrix'], instance['revenues_matrix'], instance['table_index'], costs
+
+
+def full_profit(data):
+    model = build_flights_model(*data)[0]
+    model.Params.OutputFlag = 0
+    model.optimize()
+    profit = model.ObjVal
+    model.dispose()
+    return profit
+
+
+def test_one_window_is_the_full_model(data):
+    plan = solve_rolling_horizon(*data, window=len(data[1]))
+    assert len(plan['windows']) == 1
+    assert plan['profit'] == pytest.approx(full_profit(data), rel=1e-6)
+
+
+@pytest.mark.parametrize("window, overlap", [(1, 0), (2, 1), (3, 1)])
+def test_committed_plan_is_flyable(data, window, overlap):
+    network, demands_matrix = data[:2]
+    num_days = len(demands_matrix)
+    plan = solve_rolling_horizon(*data, window=window, overlap=overlap)
+    assert [day_num for row in plan['windows'] for day_num in range(row['Start'], row['Start'] + row['Committed'])] \
+        == list(range(num_days))  # every day committed once
+    assert plan['profit'] <= full_profit(data) * (1 + 1e-9)
+    for day_num in range(num_days):
+        leaving = {c: 0 for c in network['cities']}
+        arriving = {c: 0 for c in network['cities']}
+        for arc, (depart, arrive) in network['arc_leg'].items():
+            if arc not in network['layover_arcs']:  # not counted against the fleet
+                leaving[depart] += plan['n'][arc, day_num]
+                arriving[arrive] += plan['n'][arc, day_num]
+        for c in network['cities']:
+            assert leaving[c] <= plan['Z'][c, day_num]
+            assert plan['Z'][c, day_num] + arriving[c] - leaving[c] == plan['Z'][c, day_num + 1]
+
+
+def test_overlap_must_be_smaller_than_the_window(data):
+    with pytest.raises(ValueError):
+        solve_rolling_horizon(*data, window=2, overlap=2)
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+pytest.importorskip("gurobipy")
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def sa():
+    """
+    The sensitivity_analysis module, with the model of the bundled instance.
+    """
+    cwd = os.getcwd()
+    os.chdir(repo)  # passenger_demands reads demands.txt and ticket_revenues.txt
+    try:
+        import sensitivity_analysis
+    finally:
+        os.chdir(cwd)
+    sensitivity_analysis.FLIGHTS_MODEL.Params.OutputFlag = 0
+    return sensitivity_analysis
+
+
+def test_cost_ranging(sa):
+    results = sa.cost_ranging(sa.FLIGHTS_MODEL)
+    reduced_costs = results.pop('reduced_costs')
+    assert set(results) == {'fuel_prices', 'landing_fees', 'aif_rates'}
+    for table_ranges in results.values():
+        assert set(table_ranges) == set(sa.network['cities'])
+        for r in table_ranges.values():
+            assert 0 <= r["Low"] <= r["Value"] + 1e-9 and r["Value"] <= r["Up"] + 1e-9
+            assert r["Marginal Profit"] <= 1e-6  # a dearer cost never helps
+
+    keys = [(arc, day_num) for arc, day_num in sa.n if arc in sa.network['arc_leg']]
+    assert sorted(reduced_costs) == sorted(keys)
+    lp = sa.FLIGHTS_MODEL.relax()
+    lp.Params.OutputFlag = 0
+    lp.optimize()
+    for (arc, day_num), rc in reduced_costs.items():
+        n_value = lp.getVarByName(sa.n[arc, day_num].VarName).X
+        if rc["n"] < -1e-6:  # flights not worth flying
+            assert n_value == pytest.approx(0, abs=1e-6)
+        elif n_value > 1e-6 and rc["n"] < 1e-6:
+            assert rc["n"] == pytest.approx(0, abs=1e-6)
+    assert any(rc["n"] < -1 for rc in reduced_costs.values())
+    lp.dispose()
+
+
+def test_incremental_sweep_matches_the_rebuilt_one(sa):
+    price_range = {'M': [1.0, 1.5], 'V': [1.2]}
+    base_prices = dict(sa.fuel_prices)
+    rebuilt = sa.sensitivity_analysis_fuel_costs(sa.FLIGHTS_MODEL, price_range)
+    incremental = sa.sensitivity_analysis_fuel_costs(sa.FLIGHTS_MODEL, price_range, incremental=True)
+    for city, prices in price_range.items():
+        assert [row["Fuel Price"] for row in incremental[city]] == prices
+        for row, incremental_row in zip(rebuilt[city], incremental[city]):
+            assert incremental_row["Profit"] == pytest.approx(row["Profit"], rel=1e-6)
+    assert incremental['M'][0]["Profit"] > incremental['M'][1]["Profit"]
+    assert sa.fuel_prices == base_prices
+    assert len(sa.cost_tables.refresh()) == 0
+
+
+def test_multi_scenario_sweep(sa):
+    base_price = sa.fuel_prices['T']
+    price_range = {'T': [1.0, base_price, 1.5]}
+    results = sa.sensitivity_analysis_fuel_costs(sa.FLIGHTS_MODEL, price_range, multi_scenario=True)
+    assert sa.FLIGHTS_MODEL.NumScenarios == 0 and sa.fuel_prices['T'] == base_price
+    profits = [row["Profit"] for row in results['T']]
+    assert [row["Fuel Price"] for row in results['T']] == price_range['T']
+    assert profits[0] >= profits[1] >= profits[2]
+
+    sa.FLIGHTS_MODEL.optimize()  # the scenario at the base price is the model itself
+    assert profits[1] == pytest.approx(sa.FLIGHTS_MODEL.ObjVal, rel=1e-3)
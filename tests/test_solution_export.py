@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from network import build_network
+from cost_tables import CostTables
+from solution_export import solution_table
+from synthetic_instances import generate_instance
+
+
+def test_via_hub_with_multi_character_codes():
+    instance = generate_instance(12, 2, 1)
+    network = build_network(instance['airports'], instance['hubs'], instance['distances'])
+    costs = CostTables(network, instance['distances'], instance['fuel_prices'], instance['landing_fees'],
+                       instance['aif_rates'], instance['city_names'])
+    num_arcs = len(network['arc_set'])
+    passengers = np.ones((num_arcs, 1))
+    flights = np.ones((num_arcs, 1))
+    table = solution_table(network, passengers, flights, instance['revenues_matrix'], instance['table_index'], costs)
+
+    for arc, hub, origin, destination in zip(table['arc'], table['via_hub'], table['origin'], table['destination']):
+        tail, head = arc.split("-")
+        if head.endswith("*"):  # to the hub
+            assert hub == head[:-1] == destination
+        elif tail.endswith("*"):  # from the hub
+            assert hub == tail[:-1] == origin
+        else:
+            assert hub == ""
+    assert set(table['via_hub']) == {"", "A00", "A01"}
+
+
+def test_solution_table_columns(instance):
+    from flights_model import build_flights_problem
+    from solver_backends import solve_problem
+
+    network, demands_matrix, revenues_matrix, table_index, costs = instance
+    problem = build_flights_problem(*instance)
+    result = solve_problem(problem, 'highs', mip_gap=1e-9)
+    table = solution_table(network, result['X'], result['n'], revenues_matrix, table_index, costs)
+
+    assert np.all((table['passengers'] > 0) | (table['flights'] > 0))
+    assert table['flights'].sum() == result['n'].sum()  # sink arcs have no flights
+    assert table['revenue'].sum() - table['cost'].sum() == pytest.approx(result['profit'], rel=1e-9)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from flights_model import build_flights_problem
+from solver_backends import solve_problem, split_solution
+
+
+def test_split_solution(instance):
+    network, demands_matrix = instance[:2]
+    problem = build_flights_problem(*instance)
+    num_arcs, num_days, num_cities = problem['num_arcs'], problem['num_days'], problem['num_cities']
+    X, n, Z = split_solution(problem, np.arange(len(problem['obj']), dtype=float))
+    assert X.shape == n.shape == (num_arcs, num_days) and Z.shape == (num_cities, num_days + 1)
+    k = network['arc_id'][network['arc_set'][3]]
+    assert X[k, 1] == k * num_days + 1  # arc by arc, then day
+    assert n[k, 1] == num_arcs * num_days + k * num_days + 1
+    assert Z[-1, -1] == len(problem['obj']) - 1
+    assert split_solution(problem, None) == (None, None, None)
+
+
+def test_split_solution_of_a_pruned_problem(sparse_instance):
+    problem = build_flights_problem(*sparse_instance, prune=True)
+    values = np.zeros(problem['num_vars'])
+    values[problem['columns']] = 1 + np.arange(len(problem['columns']))
+    X, n, Z = split_solution(problem, values[problem['columns']])
+    np.testing.assert_array_equal(np.concatenate([X.ravel(), n.ravel(), Z.ravel()]), values)
+
+
+def test_backends_agree(instance):
+    pytest.importorskip("gurobipy")
+    problem = build_flights_problem(*instance)
+    highs = solve_problem(problem, 'highs', mip_gap=1e-9)
+    gurobi = solve_problem(problem, 'gurobi', mip_gap=1e-9)
+    assert highs['status'] == gurobi['status'] == 'optimal'
+    assert highs['profit'] == pytest.approx(gurobi['profit'], rel=1e-6)
+
+
+def test_unknown_backend(instance):
+    with pytest.raises(ValueError):
+        solve_problem(build_flights_problem(*instance), 'cplex')
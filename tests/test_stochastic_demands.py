@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from flights_model import build_flights_problem
+from solver_backends import solve_problem
+from stochastic_demands import build_stochastic_problem, distributions, reduce_scenarios, sample_demands
+
+
+@pytest.mark.parametrize("distribution", distributions)
+def test_sample_demands(instance, distribution):
+    demands_matrix = np.asarray(instance[1])
+    samples = sample_demands(demands_matrix, 2000, distribution, cv=0.2)
+    assert samples.shape == (2000,) + demands_matrix.shape and samples.dtype == np.int64
+    assert np.all(samples >= 0)
+    np.testing.assert_allclose(samples.mean(axis=0), demands_matrix, rtol=0.05, atol=2)
+
+
+@pytest.mark.parametrize("distribution", distributions)
+def test_sample_demands_without_variation(instance, distribution):
+    demands_matrix = np.asarray(instance[1])
+    samples = sample_demands(demands_matrix, 3, distribution, cv=0)
+    if distribution in ('normal', 'lognormal'):
+        assert np.all(samples == demands_matrix)
+    else:  # the Poisson noise remains
+        assert samples.shape == (3,) + demands_matrix.shape
+
+
+def test_unknown_distribution(instance):
+    with pytest.raises(ValueError):
+        sample_demands(instance[1], 1, 'uniform')
+
+
+def test_reduce_scenarios(instance):
+    scenarios = sample_demands(instance[1], 50, 'gamma_poisson', cv=0.3)
+    representatives, probabilities = reduce_scenarios(scenarios, 5)
+    assert len(representatives) == len(probabilities) <= 5
+    assert probabilities.sum() == pytest.approx(1)
+    assert all(any(np.array_equal(r, s) for s in scenarios) for r in representatives)
+    same, equal = reduce_scenarios(scenarios, 50)
+    assert same is scenarios and np.allclose(equal, 1 / 50)
+
+
+def test_one_scenario_is_the_deterministic_model(instance):
+    network, demands_matrix, revenues_matrix, table_index, costs = instance
+    deterministic = solve_problem(build_flights_problem(*instance), 'highs', mip_gap=1e-9)
+    problem = build_stochastic_problem(network, np.asarray(demands_matrix)[None], [1.0], revenues_matrix,
+                                       table_index, costs)
+    result = solve_problem(problem, 'highs', mip_gap=1e-9)
+    assert result['profit'] == pytest.approx(deterministic['profit'], rel=1e-6)
+    assert result['X'].shape == (1,) + deterministic['X'].shape